@@ -1,15 +1,11 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from accounts.models.user import Permission
+from accounts.services.provisioning import DEFAULT_PERMISSIONS, provision_permissions
 
 class Command(BaseCommand):
     help = 'Cria as permissões iniciais simplificadas para o sistema'
 
-    DEFAULT_PERMISSIONS = [
-        {'name': 'Gerenciar usuários', 'codename': 'users_manage'},
-        {'name': 'Gerenciar empresas', 'codename': 'companies_manage'},   
-    ]
-
     def add_arguments(self, parser):
         parser.add_argument(
             '--reset',
@@ -22,25 +18,21 @@ class Command(BaseCommand):
         
         self.stdout.write('🚀 Iniciando criação de permissões...')
         
-        created_count = 0
-        existing_count = 0
-        
         with transaction.atomic():
             if reset:
                 deleted_count, _ = Permission.objects.all().delete()
                 self.stdout.write(self.style.WARNING(f'🗑️  {deleted_count} permissões removidas'))
             
-            for perm_data in self.DEFAULT_PERMISSIONS:
-                permission, created = Permission.objects.get_or_create(
-                    codename=perm_data['codename'],
-                    defaults={'name': perm_data['name']}
-                )
-                
-                if created:
-                    created_count += 1
-                    self.stdout.write(f'✅ CRIADA: {perm_data["name"]}')
-                else:
-                    existing_count += 1
-                    self.stdout.write(f'🔵 EXISTIA: {perm_data["name"]}')
+            # A posição no bitset é fixa: permissões existentes mantêm a
+            # sua e as novas recebem as próximas livres
+            created_count = provision_permissions()
+
+        bits = dict(
+            Permission.objects.filter(codename__in=[perm['codename'] for perm in DEFAULT_PERMISSIONS])
+            .values_list('codename', 'bit')
+        )
+        for perm_data in DEFAULT_PERMISSIONS:
+            self.stdout.write(f'✅ {perm_data["name"]} (bit {bits.get(perm_data["codename"])})')
         
-        self.stdout.write(self.style.SUCCESS(f'\n🎉 Concluído! {created_count} novas, {existing_count} existentes'))
\ No newline at end of file
+        existing_count = len(DEFAULT_PERMISSIONS) - created_count
+        self.stdout.write(self.style.SUCCESS(f'\n🎉 Concluído! {created_count} novas, {existing_count} existentes'))
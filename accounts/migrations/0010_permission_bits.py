@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:35
+
+from django.db import migrations, models
+
+
+def compile_permission_bits(apps, schema_editor):
+    # Posições na ordem de criação das permissões e bits dos vínculos existentes
+    Permission = apps.get_model('accounts', 'Permission')
+    Membership = apps.get_model('accounts', 'Membership')
+    for bit, permission in enumerate(Permission.objects.order_by('pk')):
+        permission.bit = bit
+        permission.save(update_fields=['bit'])
+
+    role_bits = {'owner': 1 << 61, 'admin': 1 << 60}
+    memberships = []
+    for membership in Membership.objects.prefetch_related('permissions').iterator(chunk_size=1000):
+        bits = role_bits.get(membership.role, 0)
+        for permission in membership.permissions.all():
+            bits |= 1 << permission.bit
+        membership.permission_bits = bits
+        memberships.append(membership)
+    Membership.objects.bulk_update(memberships, ['permission_bits'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_delete_address'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membership',
+            name='permission_bits',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='permission',
+            name='bit',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Bit'),
+        ),
+        migrations.RunPython(compile_permission_bits, migrations.RunPython.noop),
+    ]
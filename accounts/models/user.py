@@ -22,6 +22,15 @@ class User(AbstractUser):
         return self.email
 
 
+# Bits 0-59 do `Membership.permission_bits` são as permissões (`Permission.bit`);
+# os bits de papel ficam acima deles
+MAX_PERMISSION_BITS = 60
+PERMISSION_MASK = (1 << MAX_PERMISSION_BITS) - 1
+ADMIN_BIT = 1 << 60
+OWNER_BIT = 1 << 61
+FULL_ACCESS = ADMIN_BIT | OWNER_BIT
+
+
 class Membership(CompanyBaseModel):
     """Associação de usuário a empresa, com permissões."""
     class Role(models.TextChoices):
@@ -29,11 +38,15 @@ class Membership(CompanyBaseModel):
         ADMIN = 'admin', 'Administrador'
         MEMBER = 'member', 'Membro'
 
+    ROLE_BITS = {Role.OWNER: OWNER_BIT, Role.ADMIN: ADMIN_BIT}
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='memberships')
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='memberships_company')
     permissions = models.ManyToManyField('Permission', blank=True, related_name='memberships_permissions')
     role = models.CharField(max_length=10, choices=Role.choices, default=Role.MEMBER)
     key = models.CharField(max_length=50, unique=True, verbose_name='Chave de acesso')
+    # Papel e permissões compilados (ver `compile_permissions`)
+    permission_bits = models.BigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -43,8 +56,28 @@ class Membership(CompanyBaseModel):
     def save(self, *args, **kwargs):
         if not self.key:
             self.key = uuid.uuid4().hex
+        self.permission_bits = (self.permission_bits & PERMISSION_MASK) | self.ROLE_BITS.get(self.role, 0)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'role' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'permission_bits'}
         super().save(*args, **kwargs)
 
+    def compile_permissions(self):
+        """Recalcula os bits das permissões a partir do M2M e grava só a coluna."""
+        bits = 0
+        for bit in self.permissions.exclude(bit=None).values_list('bit', flat=True):
+            bits |= 1 << bit
+        self.permission_bits = bits | self.ROLE_BITS.get(self.role, 0)
+        Membership.objects.filter(pk=self.pk).update(permission_bits=self.permission_bits)
+        return self.permission_bits
+
+    def has_perm(self, codename):
+        """Proprietários e administradores têm todas as permissões. Não consulta o banco."""
+        if self.permission_bits & FULL_ACCESS:
+            return True
+        bit = Permission.get_bits().get(codename)
+        return bit is not None and bool(self.permission_bits >> bit & 1)
+
     def __str__(self):
         return f"{self.user.username} @ {self.company.legal_name} ({self.role})"
     
@@ -52,6 +85,8 @@ class Permission(models.Model):
     """Permissões específicas atribuídas a um usuário dentro de uma empresa."""
     name = models.CharField(max_length=100, verbose_name='Nome da Permissão')
     codename = models.CharField(max_length=100, unique=True, verbose_name='Código da Permissão')
+    # Posição fixa no `Membership.permission_bits`, atribuída pelo `create_permissions`
+    bit = models.PositiveSmallIntegerField(unique=True, null=True, blank=True, editable=False, verbose_name='Bit')
 
     class Meta:
         verbose_name = 'Permissão'
@@ -59,4 +94,24 @@ class Permission(models.Model):
         ordering = ['name']
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            self.bit = Permission.next_bit()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def next_bit(cls):
+        """Posição seguinte à maior em uso."""
+        last = cls.objects.aggregate(last=models.Max('bit'))['last']
+        bit = 0 if last is None else last + 1
+        if bit >= MAX_PERMISSION_BITS:
+            raise ValueError(f'Limite de {MAX_PERMISSION_BITS} permissões atingido.')
+        return bit
+
+    @classmethod
+    def get_bits(cls):
+        """`{codename: bit}` do processo, recarregado quando as permissões mudam."""
+        from accounts.permissions import get_permission_bits
+        return get_permission_bits()
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Verificação de permissões sem consultas.
+
+Cada `Permission` tem uma posição fixa (`bit`) e cada `Membership` guarda
+o papel e as permissões compilados em um inteiro (`permission_bits`),
+recalculado quando as permissões do vínculo mudam. A verificação é um AND
+de bits sobre o vínculo já carregado em `request.tenant`; o mapa
+codename -> bit fica na memória do processo e é recarregado quando o
+`create_permissions` ou o admin alteram as permissões.
+"""
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+
+VERSION_KEY = 'accounts.permission:version'
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache.set(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+
+
+_bits = None
+
+
+def get_permission_bits():
+    """`{codename: bit}` do processo, recarregado quando a versão muda."""
+    global _bits
+    from accounts.models.user import Permission
+
+    version = get_version()
+    if _bits is None or _bits[0] != version:
+        _bits = (version, dict(Permission.objects.exclude(bit=None).values_list('codename', 'bit')))
+    return _bits[1]
+
+
+def has_perm(request, codename):
+    """Permissão do usuário na empresa ativa (superusuários sempre podem)."""
+    if request.user.is_superuser:
+        return True
+    tenant = getattr(request, 'tenant', None)
+    return tenant is not None and tenant.has_perm(codename)
+
+
+def permission_required(*codenames):
+    """Decorator para views de função: exige todas as permissões informadas."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not all(has_perm(request, codename) for codename in codenames):
+                raise PermissionDenied
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PermissionRequiredMixin:
+    """
+    Mixin para class-based views: exige as permissões de
+    `permission_required` (um codename ou uma tupla).
+    """
+    permission_required = ()
+
+    def get_permission_required(self):
+        if isinstance(self.permission_required, str):
+            return (self.permission_required,)
+        return tuple(self.permission_required)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not all(has_perm(request, codename) for codename in self.get_permission_required()):
+            raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,148 @@
+"""
+Provisionamento dos dados iniciais das empresas.
+
+Unidades de medida, categorias iniciais e o catálogo de permissões são
+gravados com `bulk_create(ignore_conflicts=True)`: uma consulta para saber o
+que já existe e um INSERT por lote, independentemente de quantas empresas
+são provisionadas. Rodar de novo não duplica nada, porque as restrições
+únicas descartam o que já existe (inclusive em cadastros concorrentes).
+"""
+from itertools import islice
+
+from accounts import permissions
+from accounts.models.user import MAX_PERMISSION_BITS, Permission
+from core.cache import bump_tenant_version
+from core.counters import model_label, recount_all
+from inventory.models.category import Category
+from inventory.models.units import Unit
+
+
+BATCH_SIZE = 1000
+
+# Empresas por consulta ao verificar o que já existe
+COMPANY_CHUNK = 500
+
+DEFAULT_UNITS = [
+    {'name': 'Quilograma', 'abbreviation': 'kg'},
+    {'name': 'Grama', 'abbreviation': 'g'},
+    {'name': 'Litro', 'abbreviation': 'L'},
+    {'name': 'Mililitro', 'abbreviation': 'ml'},
+    {'name': 'Unidade', 'abbreviation': 'un'},
+    {'name': 'Peça', 'abbreviation': 'pc'},
+    {'name': 'Caixa', 'abbreviation': 'cx'},
+    {'name': 'Pacote', 'abbreviation': 'pct'},
+    {'name': 'Metro', 'abbreviation': 'm'},
+    {'name': 'Centímetro', 'abbreviation': 'cm'},
+    {'name': 'Milímetro', 'abbreviation': 'mm'},
+    {'name': 'Tonelada', 'abbreviation': 't'},
+    {'name': 'Hectolitro', 'abbreviation': 'hl'},
+    {'name': 'Decilitro', 'abbreviation': 'dl'},
+    {'name': 'Centilitro', 'abbreviation': 'cl'},
+    {'name': 'Par', 'abbreviation': 'par'},
+    {'name': 'Dúzia', 'abbreviation': 'dz'},
+    {'name': 'Saco', 'abbreviation': 'sc'},
+    {'name': 'Barril', 'abbreviation': 'barril'},
+    {'name': 'Rolo', 'abbreviation': 'rolo'},
+    {'name': 'Fardo', 'abbreviation': 'fardo'},
+    {'name': 'Pallet', 'abbreviation': 'pallet'},
+    {'name': 'Conjunto', 'abbreviation': 'conj'},
+    {'name': 'Kit', 'abbreviation': 'kit'},
+    {'name': 'Hora', 'abbreviation': 'h'},
+    {'name': 'Minuto', 'abbreviation': 'min'},
+    {'name': 'Segundo', 'abbreviation': 's'},
+]
+
+DEFAULT_CATEGORIES = [
+    {'name': 'Geral', 'slug': 'geral', 'description': 'Produtos sem categoria específica.'},
+    {'name': 'Mercadorias para Revenda', 'slug': 'revenda', 'description': 'Produtos comprados para revenda.'},
+    {'name': 'Matéria-prima', 'slug': 'materia-prima', 'description': 'Insumos usados na produção.'},
+    {'name': 'Uso e Consumo', 'slug': 'uso-e-consumo', 'description': 'Materiais consumidos pela própria empresa.'},
+]
+
+DEFAULT_PERMISSIONS = [
+    {'name': 'Gerenciar usuários', 'codename': 'users_manage'},
+    {'name': 'Gerenciar empresas', 'codename': 'companies_manage'},
+]
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _provision(model, key, defaults, company_ids, batch_size):
+    """
+    Cria para cada empresa os `defaults` cujo `key` ainda não existe nela.
+    Devolve `{empresa: linhas criadas}`.
+    """
+    # O texto de busca é o mesmo em todas as empresas
+    search_texts = {data[key]: model(**data).build_search_text() for data in defaults}
+    created = {}
+    for chunk in batched(company_ids, COMPANY_CHUNK):
+        existing = set(
+            model.objects.filter(company_id__in=chunk, **{f'{key}__in': [data[key] for data in defaults]})
+            .values_list('company_id', key)
+        )
+        objects = []
+        for company_id in chunk:
+            for data in defaults:
+                if (company_id, data[key]) in existing:
+                    continue
+                objects.append(model(company_id=company_id, search_text=search_texts[data[key]], **data))
+                created[company_id] = created.get(company_id, 0) + 1
+        for batch in batched(objects, batch_size):
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+    return created
+
+
+def provision_units(company_ids, batch_size=BATCH_SIZE):
+    return _provision(Unit, 'abbreviation', DEFAULT_UNITS, company_ids, batch_size)
+
+
+def provision_categories(company_ids, batch_size=BATCH_SIZE):
+    return _provision(Category, 'slug', DEFAULT_CATEGORIES, company_ids, batch_size)
+
+
+def provision_permissions():
+    """Cria as permissões que faltam no catálogo, cada uma com o próximo bit livre."""
+    existing = set(Permission.objects.values_list('codename', flat=True))
+    missing = [data for data in DEFAULT_PERMISSIONS if data['codename'] not in existing]
+    if not missing:
+        return 0
+
+    first = Permission.next_bit()
+    if first + len(missing) > MAX_PERMISSION_BITS:
+        raise ValueError(f'Limite de {MAX_PERMISSION_BITS} permissões atingido.')
+    Permission.objects.bulk_create(
+        [Permission(bit=first + offset, **data) for offset, data in enumerate(missing)],
+        ignore_conflicts=True,
+    )
+    permissions.bump_version()
+    return len(missing)
+
+
+def provision_companies(company_ids, batch_size=BATCH_SIZE):
+    """
+    Provisiona unidades, categorias e permissões das empresas. O
+    bulk_create não dispara os sinais, então contadores e versões de cache
+    das empresas alteradas são atualizados aqui, uma vez por modelo.
+    """
+    company_ids = list(company_ids)
+    result = {'permissions': provision_permissions()}
+    for name, model, provision in (
+        ('units', Unit, provision_units),
+        ('categories', Category, provision_categories),
+    ):
+        created = provision(company_ids, batch_size)
+        result[name] = sum(created.values())
+        if created:
+            recount_all(model, list(created))
+            for company_id in created:
+                bump_tenant_version(company_id, model_label(model))
+    return result
+
+
+def provision_company(company):
+    """Dados iniciais de uma empresa recém-criada (roda na transação do cadastro)."""
+    return provision_companies([company.pk])
@@ -0,0 +1,73 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from accounts import permissions
+from accounts.models.company import Company
+from accounts.models.user import Membership, Permission
+from accounts.tenant import bump_membership_version
+from core.cache import bump_tenant_version
+
+
+def _changed_memberships(instance, action, reverse, pk_set):
+    """Vínculos afetados por uma alteração no M2M de permissões."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            return [instance]
+        return []
+    # Alterado a partir da permissão (permission.memberships_permissions)
+    if action in ('post_add', 'post_remove'):
+        return list(Membership.objects.filter(pk__in=pk_set))
+    if action == 'pre_clear':
+        return list(instance.memberships_permissions.all())
+    return []
+
+
+@receiver(m2m_changed, sender=Membership.permissions.through)
+def compile_permissions_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recompila os bits (ex.: `permissions.set(...)` no `UserMembershipForm`) e invalida o contexto."""
+    if reverse and action == 'pre_clear':
+        # Os vínculos só são conhecidos antes do clear; recompila depois
+        instance._clearing_memberships = _changed_memberships(instance, action, reverse, pk_set)
+        return
+    if reverse and action == 'post_clear':
+        memberships = getattr(instance, '_clearing_memberships', [])
+    else:
+        memberships = _changed_memberships(instance, action, reverse, pk_set)
+    for membership in memberships:
+        membership.compile_permissions()
+        bump_membership_version(membership.user_id)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_tenant_on_membership_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_membership_version(instance.user_id)
+
+
+@receiver(post_save, sender=Permission)
+def reload_permission_bits_on_save(sender, instance, raw=False, **kwargs):
+    permissions.bump_version()
+
+
+@receiver(post_delete, sender=Permission)
+def clear_permission_bit_on_delete(sender, instance, **kwargs):
+    """Zera o bit da permissão removida nos vínculos, para que a posição possa ser reutilizada."""
+    permissions.bump_version()
+    if instance.bit is None:
+        return
+    mask = 1 << instance.bit
+    memberships = Membership.objects.annotate(masked=F('permission_bits').bitand(mask)).filter(masked__gt=0)
+    user_ids = set(memberships.values_list('user_id', flat=True))
+    Membership.objects.filter(user_id__in=user_ids).update(permission_bits=F('permission_bits').bitand(~mask))
+    for user_id in user_ids:
+        bump_membership_version(user_id)
+
+
+@receiver(post_save, sender=Company)
+def invalidate_tenant_on_company_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_tenant_version(instance.pk, 'accounts.company')
@@ -0,0 +1,173 @@
+"""
+Contexto da empresa ativa por requisição.
+
+O `TenantMiddleware` resolve uma vez, para o usuário autenticado, a empresa
+ativa e o vínculo (`Membership`) com ela, com o papel e as permissões já
+compilados em bits, e expõe o resultado em `request.tenant`. Tudo vem de
+uma consulta ou, na maior parte das requisições, de um cache curto cuja
+chave inclui a versão do vínculo do usuário e a versão da empresa; as duas
+são incrementadas pelos sinais de `accounts.signals`.
+
+No servidor ASGI o middleware roda em modo assíncrono e resolve o usuário
+e o contexto com o ORM e o cache assíncronos (`aget_tenant`), sem ocupar
+uma thread.
+"""
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models.company import Company
+from accounts.models.user import Membership
+from accounts.permissions import get_permission_bits
+from core.cache import aget_tenant_version, bump_tenant_version, get_tenant_version
+
+
+TENANT_CACHE_TIMEOUT = getattr(settings, 'TENANT_CACHE_TIMEOUT', 60)
+
+
+@dataclass(frozen=True)
+class Tenant:
+    company: object
+    membership: object = None
+
+    @property
+    def company_id(self):
+        return self.company.pk
+
+    @property
+    def role(self):
+        return self.membership.role if self.membership else None
+
+    @property
+    def permissions(self):
+        """Codenames das permissões do vínculo (sem contar o papel)."""
+        if self.membership is None:
+            return frozenset()
+        return frozenset(
+            codename for codename, bit in get_permission_bits().items()
+            if self.membership.permission_bits >> bit & 1
+        )
+
+    def has_perm(self, codename):
+        return self.membership is not None and self.membership.has_perm(codename)
+
+
+# Versões por usuário usam o mesmo esquema de `core.cache`, com o usuário
+# no lugar da empresa
+def _user_namespace(user_id):
+    return f'accounts.membership.user{user_id}'
+
+
+def get_membership_version(user_id):
+    return get_tenant_version(0, _user_namespace(user_id))
+
+
+def bump_membership_version(user_id):
+    """Invalida o contexto em cache do usuário (vínculo, papel ou permissões mudaram)."""
+    return bump_tenant_version(0, _user_namespace(user_id))
+
+
+def _cache_key(user):
+    return 'tenant:context:{}:{}:v{}:c{}'.format(
+        user.pk,
+        user.company_active_id,
+        get_membership_version(user.pk),
+        get_tenant_version(user.company_active_id, 'accounts.company'),
+    )
+
+
+async def _acache_key(user):
+    return 'tenant:context:{}:{}:v{}:c{}'.format(
+        user.pk,
+        user.company_active_id,
+        await aget_tenant_version(0, _user_namespace(user.pk)),
+        await aget_tenant_version(user.company_active_id, 'accounts.company'),
+    )
+
+
+def load_tenant(user):
+    """Empresa ativa e vínculo ativo (com as permissões compiladas) em uma consulta."""
+    membership = (
+        Membership.objects
+        .filter(user=user, company_id=user.company_active_id, is_active=True)
+        .select_related('company')
+        .first()
+    )
+    if membership is None:
+        return Tenant(company=user.company_active)
+    return Tenant(company=membership.company, membership=membership)
+
+
+def get_tenant(user):
+    """Contexto da empresa ativa do usuário, ou `None` sem empresa ativa."""
+    if not user.is_authenticated or not user.company_active_id:
+        return None
+    key = _cache_key(user)
+    tenant = cache.get(key)
+    if tenant is None:
+        tenant = load_tenant(user)
+        cache.set(key, tenant, TENANT_CACHE_TIMEOUT)
+    return tenant
+
+
+async def aload_tenant(user):
+    """Versão assíncrona de `load_tenant`."""
+    membership = await (
+        Membership.objects
+        .filter(user=user, company_id=user.company_active_id, is_active=True)
+        .select_related('company')
+        .afirst()
+    )
+    if membership is None:
+        # `user.company_active` consultaria o banco de forma síncrona
+        return Tenant(company=await Company.objects.aget(pk=user.company_active_id))
+    return Tenant(company=membership.company, membership=membership)
+
+
+async def aget_tenant(user):
+    """Versão assíncrona de `get_tenant`."""
+    if not user.is_authenticated or not user.company_active_id:
+        return None
+    key = await _acache_key(user)
+    tenant = await cache.aget(key)
+    if tenant is None:
+        tenant = await aload_tenant(user)
+        await cache.aset(key, tenant, TENANT_CACHE_TIMEOUT)
+    return tenant
+
+
+class TenantMiddleware:
+    """
+    Define `request.tenant` (ver `Tenant`) e preenche
+    `request.user.company_active` com a empresa já carregada, para que as
+    views que o leem não façam outra consulta.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tenant = get_tenant(request.user)
+        request.tenant = tenant
+        if tenant is not None:
+            request.user.company_active = tenant.company
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # `request.user` é preguiçoso e, se lido pelas views assíncronas,
+        # consultaria o banco de forma síncrona: fica o usuário já resolvido
+        request.user = await request.auser()
+        tenant = await aget_tenant(request.user)
+        request.tenant = tenant
+        if tenant is not None:
+            request.user.company_active = tenant.company
+        return await self.get_response(request)
@@ -1,3 +1,266 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.views import View
+
+from accounts.permissions import PermissionRequiredMixin, get_permission_bits, permission_required
+
+from accounts.models.company import Company
+from accounts.models.user import Membership, Permission, User
+from accounts.services.provisioning import (
+    DEFAULT_CATEGORIES,
+    DEFAULT_PERMISSIONS,
+    DEFAULT_UNITS,
+    provision_companies,
+)
+from accounts.tenant import aget_tenant, get_tenant
+from core.models.counters import RowCounter
+from configuration.forms.users import UserMembershipForm
+from core.tests import create_tenant
+from inventory.models.category import Category
+from inventory.models.units import Unit
+
+
+class TenantTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant(role=Membership.Role.MEMBER)
+        self.membership = Membership.objects.get(user=self.user, company=self.company)
+        self.permission = Permission.objects.create(name='Gerenciar usuários', codename='users_manage')
+
+    def test_resolved_once_and_cached(self):
+        with self.assertNumQueries(1):
+            tenant = get_tenant(self.user)
+        self.assertEqual((tenant.company, tenant.membership, tenant.role), (self.company, self.membership, 'member'))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_tenant(self.user), tenant)
+
+    def test_without_user_or_active_company(self):
+        self.assertIsNone(get_tenant(AnonymousUser()))
+        self.user.company_active = None
+        self.assertIsNone(get_tenant(self.user))
+
+    def test_permission_change_invalidates(self):
+        self.assertFalse(get_tenant(self.user).has_perm('users_manage'))
+        self.membership.permissions.add(self.permission)
+        tenant = get_tenant(self.user)
+        self.assertTrue(tenant.has_perm('users_manage'))
+        self.assertEqual(tenant.permissions, {'users_manage'})
+
+    def test_role_and_company_changes_invalidate(self):
+        get_tenant(self.user)
+        self.membership.role = Membership.Role.ADMIN
+        self.membership.save()
+        self.assertTrue(get_tenant(self.user).has_perm('users_manage'))
+
+        self.company.legal_name = 'Empresa Renomeada'
+        self.company.save()
+        self.assertEqual(get_tenant(self.user).company.legal_name, 'Empresa Renomeada')
+
+    def test_inactive_membership_keeps_company(self):
+        self.membership.is_active = False
+        self.membership.save()
+        tenant = get_tenant(self.user)
+        self.assertEqual(tenant.company, self.company)
+        self.assertIsNone(tenant.membership)
+        self.assertIsNone(tenant.role)
+        self.assertFalse(tenant.has_perm('users_manage'))
+
+    def test_other_users_are_isolated(self):
+        _, other = create_tenant(name='Outra', email='outra@teste.com')
+        get_tenant(self.user)
+        get_tenant(other)
+        Membership.objects.get(user=other).permissions.add(self.permission)
+        with self.assertNumQueries(0):
+            get_tenant(self.user)
+
+    def test_middleware_sets_request_tenant(self):
+        self.client.force_login(self.user)
+        request = self.client.get(reverse('configuration:home')).wsgi_request
+        self.assertEqual(request.tenant, get_tenant(self.user))
+        self.assertIs(request.user.company_active, request.tenant.company)
+
+    async def test_async_resolution(self):
+        tenant = await aget_tenant(self.user)
+        self.assertEqual((tenant.company, tenant.membership), (self.company, self.membership))
+
+        # UPDATE sem sinal não invalida; o save sim
+        await Membership.objects.filter(pk=self.membership.pk).aupdate(is_active=False)
+        self.assertIsNotNone((await aget_tenant(self.user)).membership)
+        self.membership.is_active = False
+        await self.membership.asave()
+        tenant = await aget_tenant(self.user)
+        self.assertIsNone(tenant.membership)
+        self.assertEqual(tenant.company, self.company)
+
+
+class ProvisioningTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def counters(self, company):
+        return dict(RowCounter.objects.filter(company=company).values_list('model_label', 'count'))
+
+    def test_second_run_creates_nothing(self):
+        company, _ = create_tenant()
+        first = provision_companies([company.pk])
+        self.assertEqual(first, {
+            'permissions': len(DEFAULT_PERMISSIONS),
+            'units': len(DEFAULT_UNITS),
+            'categories': len(DEFAULT_CATEGORIES),
+        })
+        bits = dict(Permission.objects.values_list('codename', 'bit'))
+
+        self.assertEqual(provision_companies([company.pk]), {'permissions': 0, 'units': 0, 'categories': 0})
+        self.assertEqual(Unit.objects.filter(company=company).count(), len(DEFAULT_UNITS))
+        self.assertEqual(Category.objects.filter(company=company).count(), len(DEFAULT_CATEGORIES))
+        self.assertEqual(dict(Permission.objects.values_list('codename', 'bit')), bits)
+        self.assertEqual(self.counters(company), {
+            'inventory.unit': len(DEFAULT_UNITS),
+            'inventory.category': len(DEFAULT_CATEGORIES),
+        })
+
+    def test_fills_only_missing_rows(self):
+        company, _ = create_tenant()
+        Unit.objects.create(company=company, name='Quilo', abbreviation='kg')
+        result = provision_companies([company.pk])
+        self.assertEqual(result['units'], len(DEFAULT_UNITS) - 1)
+        self.assertEqual(Unit.objects.get(company=company, abbreviation='kg').name, 'Quilo')
+        self.assertEqual(self.counters(company)['inventory.unit'], len(DEFAULT_UNITS))
+
+    def test_signup_provisions_new_company(self):
+        user = User.objects.create_user(username='novo@teste.com', email='novo@teste.com')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('accounts:company_create'),
+            {'legal_name': 'Empresa Nova', 'phone': '11999999999'},
+        )
+        self.assertRedirects(response, reverse('configuration:home'), fetch_redirect_response=False)
+
+        company = Company.objects.get(legal_name='Empresa Nova')
+        user.refresh_from_db()
+        self.assertEqual(user.company_active, company)
+        self.assertTrue(Membership.objects.filter(user=user, company=company, role=Membership.Role.OWNER).exists())
+        self.assertEqual(
+            set(Unit.objects.filter(company=company).values_list('abbreviation', flat=True)),
+            {data['abbreviation'] for data in DEFAULT_UNITS},
+        )
+        self.assertEqual(
+            set(Category.objects.filter(company=company).values_list('slug', flat=True)),
+            {data['slug'] for data in DEFAULT_CATEGORIES},
+        )
+        self.assertEqual(
+            set(Permission.objects.values_list('codename', flat=True)),
+            {data['codename'] for data in DEFAULT_PERMISSIONS},
+        )
+        self.assertEqual(self.counters(company)['inventory.unit'], len(DEFAULT_UNITS))
+
+        # Um segundo cadastro reaproveita o catálogo de permissões
+        other = User.objects.create_user(username='outro@teste.com', email='outro@teste.com')
+        self.client.force_login(other)
+        self.client.post(reverse('accounts:company_create'), {'legal_name': 'Outra Empresa', 'phone': '11988888888'})
+        self.assertEqual(Permission.objects.count(), len(DEFAULT_PERMISSIONS))
+        self.assertEqual(Unit.objects.filter(company__legal_name='Outra Empresa').count(), len(DEFAULT_UNITS))
+
+
+class UsersManageView(PermissionRequiredMixin, View):
+    permission_required = 'users_manage'
+
+    def get(self, request):
+        return HttpResponse('ok')
+
+
+@permission_required('users_manage', 'companies_manage')
+def manage_everything(request):
+    return HttpResponse('ok')
+
+
+class PermissionBitsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        call_command('create_permissions', stdout=StringIO())
+        self.users_manage = Permission.objects.get(codename='users_manage')
+        self.companies_manage = Permission.objects.get(codename='companies_manage')
+        self.company, self.owner = create_tenant()
+
+    def member_form(self, instance=None, **data):
+        data = {
+            'name': 'Maria Souza', 'email': 'maria@teste.com', 'role': Membership.Role.MEMBER,
+            'password': 'segredo1', 'password_confirm': 'segredo1', 'company': self.company.pk, **data,
+        }
+        return UserMembershipForm(data, instance=instance, company_obj=self.company)
+
+    def test_create_permissions_keeps_bits(self):
+        bits = dict(Permission.objects.values_list('codename', 'bit'))
+        self.assertEqual(sorted(bits.values()), [0, 1])
+        call_command('create_permissions', stdout=StringIO())
+        self.assertEqual(dict(Permission.objects.values_list('codename', 'bit')), bits)
+
+    def test_recreated_permission_gets_a_new_bit(self):
+        lowest = min((self.users_manage, self.companies_manage), key=lambda permission: permission.bit)
+        highest = max((self.users_manage, self.companies_manage), key=lambda permission: permission.bit)
+        lowest.delete()
+        call_command('create_permissions', stdout=StringIO())
+        self.assertEqual(Permission.objects.get(codename=highest.codename).bit, highest.bit)
+        self.assertEqual(Permission.objects.get(codename=lowest.codename).bit, highest.bit + 1)
+
+    def test_form_save_compiles_bits(self):
+        form = self.member_form(permissions=[self.users_manage.pk])
+        self.assertTrue(form.is_valid(), form.errors)
+        membership = form.save()
+        membership.refresh_from_db()
+        self.assertEqual(membership.permission_bits, 1 << self.users_manage.bit)
+        self.assertTrue(membership.has_perm('users_manage'))
+
+        membership = Membership.objects.get(pk=membership.pk)
+        form = self.member_form(instance=membership, permissions=[self.companies_manage.pk])
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        membership.refresh_from_db()
+        self.assertEqual(membership.permission_bits, 1 << self.companies_manage.bit)
+        self.assertFalse(membership.has_perm('users_manage'))
+        self.assertTrue(membership.has_perm('companies_manage'))
+
+    def test_deleting_permission_clears_its_bit(self):
+        _, user = create_tenant(name='Outra', email='membro@teste.com', role=Membership.Role.MEMBER)
+        membership = Membership.objects.get(user=user)
+        membership.permissions.set([self.users_manage, self.companies_manage])
+        self.assertTrue(get_tenant(user).has_perm('users_manage'))
+
+        bit = self.users_manage.bit
+        self.users_manage.delete()
+        membership.refresh_from_db()
+        self.assertEqual(membership.permission_bits, 1 << self.companies_manage.bit)
+        self.assertFalse(get_tenant(user).has_perm('users_manage'))
+
+        # Uma permissão criada depois não herda o bit antigo nos vínculos
+        recreated = Permission.objects.create(name='Gerenciar usuários', codename='users_manage', bit=bit)
+        membership.refresh_from_db()
+        self.assertFalse(membership.permission_bits >> recreated.bit & 1)
+
+    def test_views_check_permissions_without_queries(self):
+        _, user = create_tenant(name='Outra', email='membro@teste.com', role=Membership.Role.MEMBER)
+        Membership.objects.get(user=user).permissions.set([self.users_manage])
+        factory = RequestFactory()
+        requests = {}
+        for key, current in (('owner', self.owner), ('member', user)):
+            requests[key] = factory.get('/')
+            requests[key].user = current
+            requests[key].tenant = get_tenant(current)
+        get_permission_bits()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(UsersManageView.as_view()(requests['member']).status_code, 200)
+            self.assertEqual(UsersManageView.as_view()(requests['owner']).status_code, 200)
+            self.assertEqual(manage_everything(requests['owner']).status_code, 200)
+            with self.assertRaises(PermissionDenied):
+                manage_everything(requests['member'])
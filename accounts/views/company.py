@@ -1,9 +1,11 @@
+from django.db import transaction
 from django.urls import reverse_lazy
 from django.views.generic import FormView
 
 from accounts.models.company import Company, Establishment
 from accounts.forms import CompanySetupForm
 from accounts.models.user import Membership
+from accounts.services.provisioning import provision_company
 
 class CompanyCreateView(FormView):
     """
@@ -13,6 +15,7 @@ class CompanyCreateView(FormView):
     template_name = 'account/company_create.html'
     success_url = reverse_lazy('configuration:home')
 
+    @transaction.atomic
     def form_valid(self, form):
         user = self.request.user
 
@@ -37,5 +40,8 @@ class CompanyCreateView(FormView):
         )
 
         member.save()
-        
+
+        # Unidades, categorias iniciais e permissões
+        provision_company(company)
+
         return super().form_valid(form)
@@ -0,0 +1,132 @@
+"""
+Indicadores do dashboard.
+
+Os KPIs de uma empresa são calculados em uma única consulta (subconsultas
+sobre os contadores incrementais, a valorização do estoque e os produtos)
+e guardados no cache junto com as versões dos modelos de que dependem.
+Quando algum desses modelos muda, a próxima visita recebe os valores
+antigos na hora e dispara o recálculo em segundo plano
+(stale-while-revalidate), então a página inicial nunca espera pelo banco,
+exceto no primeiro acesso da empresa.
+"""
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.models import Company
+from core.cache import get_tenant_version
+from core.counters import model_label
+from core.models.counters import RowCounter
+from inventory.models.product import Product
+from inventory.models.valuation import InventoryValuation
+from partners.models.customers import Customer
+from partners.models.suppliers import Supplier
+
+
+# Produtos ativos com saldo até este valor contam como "estoque baixo"
+LOW_STOCK_THRESHOLD = getattr(settings, 'LOW_STOCK_THRESHOLD', 5)
+
+# Namespaces cuja mudança invalida os KPIs (ver `core.signals`)
+DEPENDENCIES = ('inventory.product', 'inventory.stockmovement', 'partners.customer', 'partners.supplier')
+
+# Tempo máximo de um recálculo em segundo plano antes de outro poder começar
+REFRESH_LOCK_TIMEOUT = 60
+
+
+@dataclass(frozen=True)
+class DashboardKPIs:
+    products: int
+    customers: int
+    suppliers: int
+    low_stock: int
+    stock_value: Decimal
+    computed_at: datetime
+
+
+def _active_count(model):
+    # Contador incremental da empresa; sem contador, a contagem exata
+    counter = RowCounter.objects.filter(company=OuterRef('pk'), model_label=model_label(model)).values('count')[:1]
+    exact = (
+        model._default_manager.filter(company=OuterRef('pk'), is_active=True)
+        .order_by().values('company').annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(
+        Subquery(counter, output_field=IntegerField()),
+        Subquery(exact, output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def compute_kpis(company_id):
+    """Calcula os KPIs da empresa em uma consulta."""
+    low_stock = (
+        Product.objects.filter(company=OuterRef('pk'), is_active=True, stock_quantity__lte=LOW_STOCK_THRESHOLD)
+        .order_by().values('company').annotate(total=Count('pk')).values('total')
+    )
+    stock_value = (
+        InventoryValuation.objects.filter(company=OuterRef('pk'))
+        .order_by().values('company').annotate(total=Sum('total_cost')).values('total')
+    )
+    money = DecimalField(max_digits=18, decimal_places=2)
+    row = Company.objects.filter(pk=company_id).values(
+        kpi_products=_active_count(Product),
+        kpi_customers=_active_count(Customer),
+        kpi_suppliers=_active_count(Supplier),
+        kpi_low_stock=Coalesce(Subquery(low_stock, output_field=IntegerField()), Value(0)),
+        kpi_stock_value=Coalesce(Subquery(stock_value, output_field=money), Value(Decimal('0.00')), output_field=money),
+    ).first() or {}
+    return DashboardKPIs(
+        products=row.get('kpi_products', 0),
+        customers=row.get('kpi_customers', 0),
+        suppliers=row.get('kpi_suppliers', 0),
+        low_stock=row.get('kpi_low_stock', 0),
+        stock_value=Decimal(row.get('kpi_stock_value', 0)).quantize(Decimal('0.01')),
+        computed_at=timezone.now(),
+    )
+
+
+def _cache_key(company_id):
+    return f'tenant:{company_id}:dashboard:kpis'
+
+
+def _versions(company_id):
+    return tuple(get_tenant_version(company_id, namespace) for namespace in DEPENDENCIES)
+
+
+def refresh_kpis(company_id, versions=None):
+    """Recalcula e grava os KPIs no cache com as versões lidas antes do cálculo."""
+    versions = versions or _versions(company_id)
+    kpis = compute_kpis(company_id)
+    cache.set(_cache_key(company_id), {'versions': versions, 'kpis': asdict(kpis)}, timeout=None)
+    return kpis
+
+
+def _refresh_in_background(company_id, versions):
+    try:
+        refresh_kpis(company_id, versions)
+    finally:
+        cache.delete(f'{_cache_key(company_id)}:refreshing')
+        connections.close_all()
+
+
+def get_kpis(company_id):
+    """
+    KPIs da empresa a partir do cache. Valores desatualizados são servidos
+    enquanto uma única thread por empresa os recalcula.
+    """
+    versions = _versions(company_id)
+    entry = cache.get(_cache_key(company_id))
+    if entry is None:
+        return refresh_kpis(company_id, versions)
+
+    if entry['versions'] != versions and cache.add(f'{_cache_key(company_id)}:refreshing', True, REFRESH_LOCK_TIMEOUT):
+        threading.Thread(target=_refresh_in_background, args=(company_id, versions), daemon=True).start()
+    return DashboardKPIs(**entry['kpis'])
@@ -1,3 +1,100 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models.user import Membership
+from configuration.services import dashboard
+from core.models.counters import RowCounter
+from core.tests import create_tenant, prime_counters
+from inventory.models.product import Product
+from inventory.models.stock import StockMovement
+from inventory.services.stock import post_movements
+from partners.models.customers import Customer
+from partners.models.suppliers import Supplier
+
+
+class UserViewsAccessTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, _ = create_tenant()
+        _, self.member = create_tenant(name='Outra', email='membro@teste.com')
+        self.member.company_active = self.company
+        self.member.save()
+        Membership.objects.create(user=self.member, company=self.company, role=Membership.Role.MEMBER)
+        self.client.force_login(self.member)
+
+    def test_member_without_permissions_keeps_access(self):
+        # As permissões compiladas em bits não restringem as telas existentes
+        for url in (
+            reverse('configuration:user_list'),
+            reverse('configuration:user_create'),
+            reverse('configuration:company_update', kwargs={'pk': self.company.pk}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class DashboardKPITests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+        products = [
+            Product.objects.create(company=self.company, name=f'Produto {index}', sale_price=10, cost_price=2)
+            for index in range(3)
+        ]
+        post_movements(self.company.pk, [
+            StockMovement(product_id=products[0].pk, kind=StockMovement.Kind.IN, quantity=10),
+            StockMovement(product_id=products[1].pk, kind=StockMovement.Kind.IN, quantity=3),
+        ])
+        Customer.objects.create(company=self.company, name='Cliente', cpf_cnpj='1')
+        Customer.objects.create(company=self.company, name='Inativo', cpf_cnpj='2', is_active=False)
+        Supplier.objects.create(company=self.company, name='Fornecedor', cpf_cnpj='3')
+        other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        Product.objects.create(company=other_company, name='Outro', sale_price=1)
+
+    def assertKPIs(self, kpis, products, customers, suppliers, low_stock, stock_value):
+        self.assertEqual(
+            (kpis.products, kpis.customers, kpis.suppliers, kpis.low_stock, kpis.stock_value),
+            (products, customers, suppliers, low_stock, Decimal(stock_value)),
+        )
+
+    def test_compute_without_counters(self):
+        self.assertFalse(RowCounter.objects.exists())
+        self.assertKPIs(dashboard.compute_kpis(self.company.pk), 3, 1, 1, 2, '26.00')
+
+    def test_compute_reads_counters(self):
+        prime_counters(self.company)
+        RowCounter.objects.filter(company=self.company, model_label='inventory.product').update(count=99)
+        with self.assertNumQueries(1):
+            self.assertEqual(dashboard.compute_kpis(self.company.pk).products, 99)
+
+    def test_serves_stale_values_while_refreshing(self):
+        first = dashboard.get_kpis(self.company.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard.get_kpis(self.company.pk), first)
+
+        Customer.objects.create(company=self.company, name='Novo', cpf_cnpj='4')
+        with mock.patch.object(dashboard.threading, 'Thread') as thread:
+            with self.assertNumQueries(0):
+                self.assertEqual(dashboard.get_kpis(self.company.pk).customers, 1)
+            # Só um recálculo por empresa enquanto a trava existir
+            dashboard.get_kpis(self.company.pk)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+        with mock.patch.object(dashboard.connections, 'close_all'):
+            dashboard._refresh_in_background(*thread.call_args.kwargs['args'])
+        self.assertEqual(dashboard.get_kpis(self.company.pk).customers, 2)
+        self.assertIsNone(cache.get(f'{dashboard._cache_key(self.company.pk)}:refreshing'))
 
-# Create your tests here.
+    def test_home_shows_kpis(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('configuration:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'R$ 26,00')
+        self.assertContains(response, '2 com estoque baixo')
@@ -2,6 +2,13 @@ from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render
 
+from configuration.services.dashboard import get_kpis
+
 
 class HomeView(LoginRequiredMixin, TemplateView):
-    template_name = 'home.html'
\ No newline at end of file
+    template_name = 'home.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['kpis'] = get_kpis(self.request.user.company_active_id)
+        return context
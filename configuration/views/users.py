@@ -1,22 +1,26 @@
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from accounts.models.user import Membership
 from django.urls import reverse_lazy
-from django.shortcuts import render
 from django.shortcuts import redirect
 from configuration.forms.users import UserMembershipForm
+from core.queries import FetchProfileMixin
+from core.rows import RowResponseMixin
 
 
-class UserListView(ListView):
+class UserListView(FetchProfileMixin, ListView):
     """
         View para listar os usuários do sistema.
     """
     model = Membership
     template_name = 'users/list_view.html'
     partial_template_name = 'users/partials/user_table.html'
+    list_select_related = ('user',)
+    list_only = ('role', 'is_active', 'user__first_name', 'user__last_name', 'user__email')
+    query_budget = 6
     
     def get_queryset(self):
         company = self.request.user.company_active
-        queryset = Membership.objects.filter(company=company).select_related('user')
+        queryset = self.apply_fetch_profile(Membership.objects.filter(company=company))
         
         # Aplicar filtros
         status = self.request.GET.get('status', 'all')
@@ -85,15 +89,21 @@ class UserUpdateView(UpdateView):
         return kwargs
 
 
-class UserDeleteView(DeleteView):
+class UserDeleteView(RowResponseMixin, DeleteView):
     """
         View para desativar um usuário existente.
     """
 
     template_name = 'users/includes/delete_view.html'
+    row_template_name = 'users/partials/user_row.html'
+    list_view_class = UserListView
     model = Membership
     success_url = reverse_lazy('configuration:user_list')
 
+    def get_queryset(self):
+        company = self.request.user.company_active
+        return Membership.objects.filter(company=company).select_related('user')
+
     def post(self, request, *args, **kwargs):
         membership = self.get_object()
         if self.request.user.company_active == membership.user.company_active:
@@ -103,24 +113,26 @@ class UserDeleteView(DeleteView):
         membership.save()
         
         if request.headers.get('Hx-Request'):
-            company = self.request.user.company_active
-            queryset = Membership.objects.filter(company=company).select_related('user')
-            return render(request, 'users/partials/user_table.html', {
-                'object_list': queryset,
-            })
+            return self.render_row_response(membership)
             
         return redirect(self.success_url)
 
 
-class UserReactivateView(UpdateView):
+class UserReactivateView(RowResponseMixin, UpdateView):
     """
         View para reativar um usuário existente.
     """
     template_name = 'users/includes/reactivate_view.html'
+    row_template_name = 'users/partials/user_row.html'
+    list_view_class = UserListView
     model = Membership
     fields = []
     success_url = reverse_lazy('configuration:user_list')
 
+    def get_queryset(self):
+        company = self.request.user.company_active
+        return Membership.objects.filter(company=company).select_related('user')
+
     def post(self, request, *args, **kwargs):
         membership = self.get_object()
         if self.request.user.company_active == membership.user.company_active:
@@ -129,13 +141,8 @@ class UserReactivateView(UpdateView):
         membership.is_active = True
         membership.save()
         
-        # Se for requisição HTMX, retorna o partial da tabela
+        # Se for requisição HTMX, retorna só a linha atualizada
         if request.headers.get('Hx-Request'):
-            from django.shortcuts import render
-            company = self.request.user.company_active
-            queryset = Membership.objects.filter(company=company).select_related('user')
-            return render(request, 'users/partials/user_table.html', {
-                'object_list': queryset,
-            })
+            return self.render_row_response(membership)
             
         return redirect(self.success_url)
\ No newline at end of file
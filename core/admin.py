@@ -1,5 +1,18 @@
 from django.contrib import admin
 
 from core.models.address import Address
+from core.models.counters import RowCounter
+from core.models.imports import ImportJob
+from core.models.municipality import Municipality
 
-admin.site.register(Address)
+
+@admin.register(Address)
+class AddressAdmin(admin.ModelAdmin):
+    # Endereços são compartilhados entre cadastros (de qualquer empresa):
+    # o conteúdo só muda pelo `Address.objects.assign`
+    readonly_fields = Address.CONTENT_FIELDS + ('content_hash',)
+
+
+admin.site.register(RowCounter)
+admin.site.register(ImportJob)
+admin.site.register(Municipality)
@@ -0,0 +1,49 @@
+"""
+Variantes assíncronas das views de leitura (listagens, busca e autocomplete).
+
+As buscas digitadas disparam muitas requisições curtas e simultâneas; no
+servidor ASGI as variantes assíncronas esperam o banco sem ocupar um worker.
+O `asgi.py` ativa `ASYNC_VIEWS` e as URLs escolhem a variante com
+`select_view`; no WSGI continuam as views síncronas.
+"""
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+
+
+def select_view(view_class, async_view_class, **initkwargs):
+    """`as_view()` da variante assíncrona quando `ASYNC_VIEWS` está ativo."""
+    if getattr(settings, 'ASYNC_VIEWS', False):
+        view_class = async_view_class
+    return view_class.as_view(**initkwargs)
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """`LoginRequiredMixin` para views com handlers assíncronos."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+
+
+class AsyncListMixin:
+    """
+    GET assíncrono para as ListViews com `KeysetPaginationMixin` e
+    `RowCountMixin`: a página e a contagem vêm do ORM assíncrono e o resto
+    (contexto e template) é o da view síncrona, que com o perfil de carga
+    (`FetchProfileMixin`) já não consulta o banco.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        page_size = self.get_paginate_by(self.object_list)
+        self._async_page = await self.apaginate_queryset(self.object_list, page_size)
+        self._async_row_count = await self.aget_row_count()
+        return self.render_to_response(self.get_context_data())
+
+    def paginate_queryset(self, queryset, page_size):
+        return self._async_page
+
+    def get_row_count(self):
+        return self._async_row_count
@@ -0,0 +1,129 @@
+import hashlib
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Q
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views import View
+
+from core.async_views import AsyncLoginRequiredMixin
+from core.cache import aget_tenant_version, get_tenant_version
+from core.search import normalize_search_text
+
+
+class AutocompleteView(LoginRequiredMixin, View):
+    """
+    Endpoint JSON de autocomplete (formato do Select2) para um modelo da
+    empresa ativa.
+
+    Parâmetros: `term` (ou `q`), `limit` e `offset` (ou `page`, enviado pelo
+    Select2). A busca é por prefixo de palavra na coluna `search_text`,
+    atendida pelo índice trigram da empresa no PostgreSQL.
+
+    A resposta leva um ETag derivado da versão do modelo na empresa:
+    enquanto nenhum registro for alterado, `If-None-Match` responde 304 sem
+    consultar a tabela. Com `max_age = 0` o navegador revalida sempre, então
+    um registro recém-criado aparece na hora.
+    """
+    model = None
+    label_fields = ('name',)
+    ordering = ('name',)
+    default_limit = 20
+    max_limit = 50
+    max_age = 0
+    # Sessão, usuário, vínculo (quando o contexto da empresa não está em
+    # cache, ver `accounts.tenant`) e a página
+    query_budget = 4
+
+    def get_label(self, values):
+        return values[self.label_fields[0]]
+
+    def get_queryset(self):
+        return self.model._default_manager.filter(
+            company_id=self.request.user.company_active_id,
+            is_active=True,
+        )
+
+    def get_term(self):
+        return normalize_search_text(self.request.GET.get('term') or self.request.GET.get('q') or '')
+
+    def get_int_param(self, name, default):
+        try:
+            return max(int(self.request.GET.get(name, default)), 0)
+        except (TypeError, ValueError):
+            return default
+
+    def get_limit(self):
+        return min(self.get_int_param('limit', self.default_limit), self.max_limit) or self.default_limit
+
+    def get_offset(self, limit):
+        if 'offset' in self.request.GET:
+            return self.get_int_param('offset', 0)
+        page = self.get_int_param('page', 1) or 1
+        return (page - 1) * limit
+
+    def filter_term(self, queryset, term):
+        for word in term.split():
+            queryset = queryset.filter(
+                Q(search_text__startswith=word) | Q(search_text__contains=f' {word}')
+            )
+        return queryset
+
+    def make_etag(self, version):
+        digest = hashlib.md5(self.request.GET.urlencode().encode(), usedforsecurity=False).hexdigest()
+        return f'"{version}-{digest}"'
+
+    def get_etag(self):
+        return self.make_etag(get_tenant_version(self.request.user.company_active_id, self.model._meta.label_lower))
+
+    def get_rows_queryset(self, limit):
+        """Valores da página mais um (para saber se há outra)."""
+        offset = self.get_offset(limit)
+        queryset = self.filter_term(self.get_queryset(), self.get_term())
+        return (
+            queryset.order_by(*self.ordering, 'pk')
+            .values('pk', *self.label_fields)[offset:offset + limit + 1]
+        )
+
+    def render_rows(self, rows, limit):
+        return JsonResponse({
+            'results': [
+                {'id': values['pk'], 'text': self.get_label(values)}
+                for values in rows[:limit]
+            ],
+            'pagination': {'more': len(rows) > limit},
+        })
+
+    def finalize_response(self, response, etag):
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, max_age=self.max_age)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            limit = self.get_limit()
+            response = self.render_rows(list(self.get_rows_queryset(limit)), limit)
+        return self.finalize_response(response, etag)
+
+
+class AsyncAutocompleteView(AsyncLoginRequiredMixin, AutocompleteView):
+    """Variante assíncrona do `AutocompleteView` (servidor ASGI, ver `core.async_views`)."""
+
+    async def aget_etag(self):
+        return self.make_etag(
+            await aget_tenant_version(self.request.user.company_active_id, self.model._meta.label_lower)
+        )
+
+    async def get(self, request, *args, **kwargs):
+        etag = await self.aget_etag()
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            limit = self.get_limit()
+            rows = [values async for values in self.get_rows_queryset(limit)]
+            response = self.render_rows(rows, limit)
+        return self.finalize_response(response, etag)
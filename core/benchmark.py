@@ -0,0 +1,37 @@
+import math
+import time
+
+
+def percentile(samples, pct):
+    """Percentil pelo método nearest-rank (samples não precisa estar ordenado)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples):
+    """Resumo em milissegundos de uma lista de durações em segundos."""
+    millis = [sample * 1000 for sample in samples]
+    return {
+        'runs': len(millis),
+        'min': round(min(millis), 3) if millis else 0.0,
+        'p50': round(percentile(millis, 50), 3),
+        'p95': round(percentile(millis, 95), 3),
+        'p99': round(percentile(millis, 99), 3),
+        'max': round(max(millis), 3) if millis else 0.0,
+    }
+
+
+def measure(func, repeat=20, warmup=2):
+    """Executa `func` `warmup + repeat` vezes e resume as latências medidas."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
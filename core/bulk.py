@@ -0,0 +1,113 @@
+import io
+from decimal import Decimal
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max
+
+
+def upsert_by_pk(model, objs, fields):
+    """
+    Grava registros já existentes (com pk e todos os campos carregados) em
+    um único INSERT ... ON CONFLICT (id) DO UPDATE, bem mais rápido que o
+    CASE WHEN gerado pelo `bulk_update` para lotes grandes.
+    """
+    if objs:
+        model._default_manager.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=[model._meta.pk.name],
+            update_fields=fields,
+        )
+
+
+def _now_value(connection):
+    from django.utils import timezone
+    return connection.ops.adapt_datetimefield_value(timezone.now())
+
+
+def insert_rows(model, rows, batch_size=10000, using=DEFAULT_DB_ALIAS):
+    """
+    Insere `rows` (dicts attname -> valor) sem instanciar modelos nem
+    compilar um INSERT por objeto: COPY no PostgreSQL e executemany nos
+    demais bancos. Campos omitidos recebem o default do modelo, como no
+    ORM (e a hora atual nos auto_now). Não dispara sinais nem devolve pks: informe o pk
+    em todas as linhas quando precisar dele depois (ver `reserve_ids`).
+    """
+    connection = connections[using]
+    iterator = iter(rows)
+    batch = list(islice(iterator, batch_size))
+    if not batch:
+        return 0
+
+    pk = model._meta.pk
+    now = _now_value(connection)
+    fields = [field for field in model._meta.concrete_fields if field is not pk or pk.attname in batch[0]]
+    defaults = {}
+    for field in fields:
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            defaults[field.attname] = now
+        else:
+            defaults[field.attname] = field.get_db_prep_save(field.get_default(), connection)
+    attnames = [field.attname for field in fields]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(fields))})"
+
+    total = 0
+    while batch:
+        values = [tuple(row.get(name, defaults[name]) for name in attnames) for row in batch]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                _copy(cursor, table, columns, values)
+            else:
+                cursor.executemany(sql, values)
+        total += len(values)
+        batch = list(islice(iterator, batch_size))
+    return total
+
+
+def _copy_field(value):
+    if value is None:
+        return ''
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy(cursor, table, columns, values):
+    # Textos entre aspas e None sem aspas: o CSV do COPY distingue '' de NULL.
+    # O `csv.QUOTE_NONNUMERIC` não serve: ele grava None como "" (texto vazio).
+    buffer = io.StringIO()
+    for row in values:
+        buffer.write(','.join(_copy_field(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    sql = f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)'
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(sql, buffer)
+    else:
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def reserve_ids(model, count, using=DEFAULT_DB_ALIAS):
+    """
+    `count` ids livres para inserir com `insert_rows` quando os pks são
+    necessários antes da gravação (ex.: chaves estrangeiras do próximo
+    lote). Pensado para cargas sem concorrência; depois da carga, chame
+    `reset_sequences`.
+    """
+    last = model._default_manager.using(using).aggregate(last=Max('pk'))['last'] or 0
+    return range(last + 1, last + 1 + count)
+
+
+def reset_sequences(*models, using=DEFAULT_DB_ALIAS):
+    """Acerta as sequências de pk depois de inserções com ids explícitos."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,211 @@
+"""
+Ações em massa nas listagens (desativar, reativar, alterar um campo).
+
+Cada ação é um único `UPDATE ... WHERE company_id = ... AND id IN (...)`,
+ou, com "todos os resultados", um `id IN (SELECT ...)` com os filtros da
+listagem exibida, sem carregar nem salvar registro por registro. Como o
+UPDATE não dispara os sinais de `save()`, o contador de ativos e a versão de
+cache do modelo são atualizados aqui, uma vez por ação.
+"""
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import EMPTY_VALUES
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseRedirect
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.views.generic import FormView
+
+from core.cache import bump_tenant_version
+from core.counters import adjust_count, model_label
+from core.rows import RowResponseMixin
+
+
+# Acima disso a seleção deve usar "todos os resultados" (subconsulta)
+MAX_BULK_IDS = getattr(settings, 'BULK_ACTION_MAX_IDS', 10000)
+
+
+class IdListField(forms.Field):
+    """
+    Lista de pks separados por vírgula em um único campo (`ids=1,2,3`): um
+    parâmetro por registro esbarraria no DATA_UPLOAD_MAX_NUMBER_FIELDS.
+    """
+    widget = forms.HiddenInput
+
+    def to_python(self, value):
+        if value in EMPTY_VALUES:
+            return []
+        try:
+            return sorted({int(pk) for pk in str(value).split(',') if pk.strip()})
+        except ValueError:
+            raise ValidationError('Seleção inválida.', code='invalid')
+
+
+class BulkActionForm(forms.Form):
+    """
+    Formulário das ações em massa. `action_fields` indica o campo extra
+    exigido por cada ação (ex.: a nova categoria) e `undo_actions`, a ação
+    que desfaz outra (oferecida na mensagem de resultado, fora do menu).
+    """
+    actions = (
+        ('deactivate', 'Desativar'),
+        ('reactivate', 'Reativar'),
+    )
+    action_fields = {}
+    undo_actions = {'deactivate': 'reactivate'}
+
+    action = forms.ChoiceField(label='Ação')
+    ids = IdListField(required=False)
+    all_matching = forms.BooleanField(required=False, label='Aplicar a todos os resultados da busca')
+
+    def __init__(self, *args, company=None, **kwargs):
+        self.company = company
+        super().__init__(*args, **kwargs)
+        self.fields['action'].choices = self.actions
+
+    @property
+    def menu_choices(self):
+        undo_only = set(self.undo_actions.values())
+        return [(value, label) for value, label in self.actions if value not in undo_only]
+
+    @property
+    def action_bound_fields(self):
+        """`(ação, campo)` dos campos extras, exibidos só com a ação escolhida."""
+        return [(action, self[name]) for action, name in self.action_fields.items()]
+
+    def clean_ids(self):
+        ids = self.cleaned_data['ids']
+        if len(ids) > MAX_BULK_IDS:
+            raise ValidationError(
+                f'Selecione no máximo {MAX_BULK_IDS} registros ou use "todos os resultados".',
+                code='max_ids',
+            )
+        return ids
+
+    def clean(self):
+        cleaned_data = super().clean()
+        field = self.action_fields.get(cleaned_data.get('action'))
+        if field and cleaned_data.get(field) in EMPTY_VALUES:
+            self.add_error(field, 'Informe o novo valor para esta ação.')
+        if not cleaned_data.get('all_matching') and not cleaned_data.get('ids') and 'ids' not in self.errors:
+            raise ValidationError('Selecione ao menos um registro.', code='empty')
+        return cleaned_data
+
+
+class BulkActionListMixin:
+    """Expõe o formulário das ações em massa (`bulk_form`) à página da listagem."""
+    bulk_form_class = BulkActionForm
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if not self.request.headers.get('Hx-Request'):
+            context['bulk_form'] = self.bulk_form_class(company=self.request.user.company_active)
+        return context
+
+
+class BulkActionView(RowResponseMixin, FormView):
+    """
+    Executa uma ação de `BulkActionForm` sobre os registros da empresa.
+
+    Na resposta HTMX a página exibida da listagem (`list_view_class`, com a
+    busca e o cursor do cabeçalho HX-Current-URL) é renderizada de novo em
+    `container_element_id`, com a quantidade de registros alterados fora de
+    banda em `result_element_id`.
+    """
+    model = None
+    form_class = None
+    container_element_id = None
+    result_element_id = None
+    result_template_name = 'core/bulk_result.html'
+    http_method_names = ['post']
+    success_messages = {
+        'deactivate': '{count} registro(s) desativado(s).',
+        'reactivate': '{count} registro(s) reativado(s).',
+    }
+
+    def get_form_class(self):
+        return self.form_class or self.list_view_class.bulk_form_class
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['company'] = self.request.user.company_active
+        return kwargs
+
+    def get_action_update(self, action, data):
+        """`(condição das linhas que mudam, valores do UPDATE)` da ação."""
+        if action == 'deactivate':
+            return Q(is_active=True), {'is_active': False}
+        if action == 'reactivate':
+            return Q(is_active=False), {'is_active': True}
+        raise ValueError(f'Ação desconhecida: {action}')
+
+    def get_target_queryset(self, data):
+        queryset = self.model._default_manager.filter(company_id=self.request.user.company_active_id)
+        if data['all_matching']:
+            matching = self.get_list_view().object_list.order_by().values('pk')
+            return queryset.filter(pk__in=matching)
+        return queryset.filter(pk__in=data['ids'])
+
+    def perform_update(self, queryset, values):
+        """Grava as alterações; sobrescreva para manter dados derivados (ex.: agregados)."""
+        return queryset.update(**values)
+
+    def apply_action(self, data):
+        condition, values = self.get_action_update(data['action'], data)
+        for field in self.model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                values.setdefault(field.attname, timezone.now())
+
+        company_id = self.request.user.company_active_id
+        with transaction.atomic():
+            count = self.perform_update(self.get_target_queryset(data).filter(condition), values)
+            if count and 'is_active' in values:
+                adjust_count(company_id, self.model, count if values['is_active'] else -count)
+        if count:
+            bump_tenant_version(company_id, model_label(self.model))
+        return count
+
+    def get_success_message(self, data, count):
+        return self.success_messages[data['action']].format(count=count)
+
+    def form_valid(self, form):
+        data = form.cleaned_data
+        count = self.apply_action(data)
+        if not self.request.headers.get('Hx-Request'):
+            return HttpResponseRedirect(self.get_success_url())
+
+        undo_ids = []
+        if count and not data['all_matching'] and data['action'] in form.undo_actions:
+            undo_ids = data['ids']
+        return self.render_list_response({
+            'message': self.get_success_message(data, count),
+            'undo_action': form.undo_actions.get(data['action']),
+            'undo_ids': undo_ids,
+        })
+
+    def form_invalid(self, form):
+        if not self.request.headers.get('Hx-Request'):
+            return HttpResponseRedirect(self.get_success_url())
+        # Só a mensagem muda: a tabela e a seleção continuam como estão
+        response = HttpResponse(self.render_result({
+            'errors': [error for errors in form.errors.values() for error in errors],
+        }))
+        response['HX-Reswap'] = 'none'
+        return response
+
+    def render_result(self, context):
+        return render_to_string(self.result_template_name, {
+            'result_id': self.result_element_id,
+            'container_id': self.container_element_id,
+            'bulk_url': self.request.path,
+            **context,
+        }, request=self.request)
+
+    def render_list_response(self, context):
+        list_view = self.get_list_view()
+        response = list_view.get(list_view.request)
+        response.render()
+        response.content += self.render_result(context).encode()
+        return response
@@ -0,0 +1,50 @@
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(company_id, namespace):
+    return f'tenant:{company_id}:{namespace}:version'
+
+
+def get_tenant_version(company_id, namespace):
+    """
+    Versão atual de um namespace (ex.: 'inventory.category') da empresa.
+
+    A versão inicial é baseada no relógio para que, se a chave for removida
+    do cache, a nova versão nunca coincida com uma já usada.
+    """
+    key = _version_key(company_id, namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_tenant_version(company_id, namespace):
+    """Versão assíncrona de `get_tenant_version` (views ASGI)."""
+    key = _version_key(company_id, namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns() // 1000, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_tenant_version(company_id, namespace):
+    """Invalida tudo o que foi cacheado com a versão atual do namespace."""
+    key = _version_key(company_id, namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns() // 1000
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def tenant_cache_key(company_id, namespace, *parts):
+    """Chave de cache escopada pela empresa e pela versão do namespace."""
+    version = get_tenant_version(company_id, namespace)
+    suffix = ':'.join(str(part) for part in parts)
+    return f'tenant:{company_id}:{namespace}:v{version}:{suffix}'
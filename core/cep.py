@@ -0,0 +1,183 @@
+"""
+Consulta de CEP em uma base local.
+
+A base é um arquivo binário gerado pelo comando `load_cep` e lido com
+`mmap`: um cabeçalho, os registros de tamanho fixo ordenados pelo CEP e,
+no fim, os textos (logradouro, bairro e cidade) em UTF-8. A busca é por
+bisseção direto no arquivo mapeado, sem carregar a base em memória, e as
+consultas recentes ficam em um cache LRU do processo.
+"""
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_left
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+MAGIC = b'CEP1'
+HEADER = struct.Struct('<4sI')
+# CEP, código IBGE, UF, posição e tamanho dos textos
+RECORD = struct.Struct('<II2sIH')
+SEPARATOR = '\x1f'
+
+
+class CEPAddress(NamedTuple):
+    postal_code: str
+    street: str
+    district: str
+    city_name: str
+    state: str
+    city_ibge_code: str
+
+
+class CEPDatabase:
+    """Base de CEPs mapeada em memória (somente leitura)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} não é uma base de CEP válida.')
+        self.strings_offset = HEADER.size + self.count * RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        # Só o CEP do registro: é o que a bisseção compara
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return struct.unpack_from('<I', self.data, HEADER.size + index * RECORD.size)[0]
+
+    def lookup(self, postal_code):
+        key = int(postal_code)
+        index = bisect_left(self, key)
+        if index == self.count:
+            return None
+        cep, ibge, state, offset, size = RECORD.unpack_from(self.data, HEADER.size + index * RECORD.size)
+        if cep != key:
+            return None
+        start = self.strings_offset + offset
+        street, district, city_name = self.data[start:start + size].decode().split(SEPARATOR)
+        return CEPAddress(
+            postal_code=f'{cep:08d}',
+            street=street,
+            district=district,
+            city_name=city_name,
+            state=state.decode(),
+            city_ibge_code=f'{ibge:07d}' if ibge else '',
+        )
+
+    def close(self):
+        self.data.close()
+
+    @staticmethod
+    def write(path, addresses):
+        """
+        Grava a base a partir de `CEPAddress`es (qualquer ordem; CEPs
+        repetidos ficam com o último). O arquivo é substituído de forma
+        atômica, então processos com a base antiga aberta não são afetados.
+        """
+        records = {int(address.postal_code): address for address in addresses}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        strings = bytearray()
+        with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as file:
+            file.write(HEADER.pack(MAGIC, len(records)))
+            for cep in sorted(records):
+                address = records[cep]
+                text = SEPARATOR.join((address.street, address.district, address.city_name)).encode()
+                file.write(RECORD.pack(
+                    cep,
+                    int(address.city_ibge_code or 0),
+                    address.state.upper().encode()[:2],
+                    len(strings),
+                    len(text),
+                ))
+                strings += text
+            file.write(strings)
+        os.chmod(file.name, 0o644)
+        os.replace(file.name, path)
+        return len(records)
+
+
+def get_database_path():
+    return str(getattr(settings, 'CEP_DATABASE_PATH', os.path.join(settings.BASE_DIR, 'data', 'cep.bin')))
+
+
+_database = None
+
+
+def get_database():
+    """
+    Base aberta do processo; reabre quando o arquivo é substituído pelo
+    `load_cep`, fechando o mapeamento anterior.
+    """
+    global _database
+    path = get_database_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _database is None or _database[0] != (path, mtime):
+        previous = _database
+        _database = ((path, mtime), CEPDatabase(path))
+        _cached_lookup.cache_clear()
+        if previous is not None:
+            previous[1].close()
+    return _database[1]
+
+
+@lru_cache(maxsize=4096)
+def _cached_lookup(postal_code):
+    # A chave é só o CEP (guardar a base na chave a manteria aberta); o
+    # cache é limpo quando a base é trocada
+    return _database[1].lookup(postal_code)
+
+
+def lookup_cep(postal_code):
+    """
+    Endereço do CEP (com ou sem máscara) ou `None` quando o CEP é inválido,
+    não existe na base ou a base não foi carregada.
+    """
+    digits = ''.join(filter(str.isdigit, postal_code or ''))
+    if len(digits) != 8:
+        return None
+    if get_database() is None:
+        return None
+    try:
+        return _cached_lookup(digits)
+    except ValueError:
+        # Base trocada e fechada por outra thread durante a busca
+        if get_database() is None:
+            return None
+        return _cached_lookup(digits)
+
+
+class CEPAutofillMixin:
+    """
+    Para formulários de `Address`: campos de endereço deixados em branco
+    são preenchidos com os dados do CEP antes da validação.
+    """
+    cep_fields = ('street', 'district', 'city_name', 'state', 'city_ibge_code')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.is_bound:
+            return
+        address = lookup_cep(self.data.get(self.add_prefix('postal_code')))
+        if address is None:
+            return
+        data = self.data.copy()
+        for field in self.cep_fields:
+            name = self.add_prefix(field)
+            if not data.get(name):
+                data[name] = getattr(address, field)
+        self.data = data
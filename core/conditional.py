@@ -0,0 +1,100 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from core.cache import aget_tenant_version, get_tenant_version
+
+
+# Tempo dos fragmentos no cache (0 desativa). A chave inclui as versões,
+# então o tempo só limita a memória: nunca há fragmento desatualizado.
+FRAGMENT_CACHE_TIMEOUT = getattr(settings, 'LIST_FRAGMENT_CACHE_TIMEOUT', 60)
+
+class ConditionalListMixin:
+    """
+    GET condicional para os parciais HTMX das listagens.
+
+    O ETag combina a empresa, as versões dos modelos exibidos na tabela
+    (incrementadas a cada gravação, ver `core.signals`) e a URL com os
+    parâmetros. Se o navegador revalida com o mesmo ETag a resposta é 304,
+    sem consultas nem renderização; com `conditional_cache_timeout` o
+    fragmento renderizado também fica no cache e os demais usuários da
+    empresa o recebem pronto. Por isso os parciais não podem ter conteúdo
+    do usuário (ex.: `csrf_token`).
+
+    `conditional_models` lista os rótulos (`app.model`) de outros modelos
+    exibidos na tabela, além de `model`.
+    """
+    conditional_models = ()
+    conditional_cache_timeout = FRAGMENT_CACHE_TIMEOUT
+
+    def is_conditional(self):
+        return self.request.method in ('GET', 'HEAD') and bool(self.request.headers.get('Hx-Request'))
+
+    def get_conditional_labels(self):
+        return (self.model._meta.label_lower, *self.conditional_models)
+
+    def make_list_etag(self, versions):
+        parts = [str(self.request.user.company_active_id), *map(str, versions), self.request.get_full_path()]
+        digest = hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+        return f'"{digest}"'
+
+    def get_list_etag(self):
+        company_id = self.request.user.company_active_id
+        return self.make_list_etag([get_tenant_version(company_id, label) for label in self.get_conditional_labels()])
+
+    async def aget_list_etag(self):
+        company_id = self.request.user.company_active_id
+        return self.make_list_etag([
+            await aget_tenant_version(company_id, label) for label in self.get_conditional_labels()
+        ])
+
+    def get_fragment_key(self, etag):
+        digest = etag.strip('"')
+        return f'tenant:{self.request.user.company_active_id}:fragment:{digest}'
+
+    def get_conditional_response(self, etag, fragment):
+        """Resposta sem passar pela view: 304 ou o fragmento em cache."""
+        if etag in self.request.headers.get('If-None-Match', ''):
+            return HttpResponseNotModified()
+        if fragment is not None:
+            return HttpResponse(fragment)
+        return None
+
+    def finalize_conditional(self, response, etag):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie', 'HX-Request'))
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_conditional():
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.adispatch_conditional(request, *args, **kwargs)
+
+        etag = self.get_list_etag()
+        fragment = cache.get(self.get_fragment_key(etag)) if self.conditional_cache_timeout else None
+        response = self.get_conditional_response(etag, fragment)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if self.conditional_cache_timeout and response.status_code == 200:
+                response.render()
+                cache.set(self.get_fragment_key(etag), response.content, self.conditional_cache_timeout)
+        return self.finalize_conditional(response, etag)
+
+    async def adispatch_conditional(self, request, *args, **kwargs):
+        etag = await self.aget_list_etag()
+        fragment = await cache.aget(self.get_fragment_key(etag)) if self.conditional_cache_timeout else None
+        response = self.get_conditional_response(etag, fragment)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+            if self.conditional_cache_timeout and response.status_code == 200:
+                # Como o handler ASGI faz com as TemplateResponses
+                await sync_to_async(response.render)()
+                await cache.aset(self.get_fragment_key(etag), response.content, self.conditional_cache_timeout)
+        return self.finalize_conditional(response, etag)
@@ -0,0 +1,180 @@
+import json
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Count, F
+
+from core.models.counters import RowCounter
+
+
+# Acima deste número de linhas a contagem filtrada deixa de ser exata e passa
+# a usar a estimativa do planejador (PostgreSQL) ou um limite ("mais de N").
+EXACT_COUNT_CUTOFF = getattr(settings, 'EXACT_COUNT_CUTOFF', 10000)
+
+
+@dataclass(frozen=True)
+class RowCount:
+    """Resultado de uma contagem exibida nas listagens."""
+    value: int
+    approximate: bool = False
+
+    def __str__(self):
+        return f"~{self.value}" if self.approximate else str(self.value)
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def adjust_count(company_id, model, delta):
+    """
+    Soma `delta` ao contador do modelo na empresa em um único UPDATE.
+    Se o contador ainda não existir nada é feito: ele será criado com a
+    contagem exata na primeira leitura.
+    """
+    if not delta or not company_id:
+        return
+    RowCounter.objects.filter(
+        company_id=company_id,
+        model_label=model_label(model),
+    ).update(count=F('count') + delta)
+
+
+def recount(company_id, model):
+    """Recalcula o contador a partir da tabela (reparo de divergências)."""
+    count = model._default_manager.filter(company_id=company_id, is_active=True).count()
+    RowCounter.objects.update_or_create(
+        company_id=company_id,
+        model_label=model_label(model),
+        defaults={'count': count},
+    )
+    return count
+
+
+def recount_all(model, company_ids=None):
+    """Recalcula os contadores de várias empresas com um único GROUP BY."""
+    queryset = model._default_manager.filter(is_active=True)
+    if company_ids is not None:
+        queryset = queryset.filter(company_id__in=company_ids)
+    counts = dict(
+        queryset.order_by().values_list('company_id').annotate(total=Count('pk'))
+    )
+    if company_ids is None:
+        company_ids = model._default_manager.order_by().values_list('company_id', flat=True).distinct()
+
+    label = model_label(model)
+    counters = [
+        RowCounter(company_id=company_id, model_label=label, count=counts.get(company_id, 0))
+        for company_id in company_ids
+    ]
+    RowCounter.objects.bulk_create(
+        counters,
+        update_conflicts=True,
+        unique_fields=['company', 'model_label'],
+        update_fields=['count'],
+    )
+    return len(counters)
+
+
+def get_active_count(company_id, model):
+    """Quantidade de registros ativos do modelo na empresa, sem COUNT(*)."""
+    counter = RowCounter.objects.filter(
+        company_id=company_id,
+        model_label=model_label(model),
+    ).values_list('count', flat=True).first()
+    if counter is not None:
+        return counter
+
+    count = model._default_manager.filter(company_id=company_id, is_active=True).count()
+    try:
+        with transaction.atomic():
+            RowCounter.objects.create(company_id=company_id, model_label=model_label(model), count=count)
+    except IntegrityError:
+        pass
+    return count
+
+
+async def aget_active_count(company_id, model):
+    """Versão assíncrona de `get_active_count`."""
+    counter = await RowCounter.objects.filter(
+        company_id=company_id,
+        model_label=model_label(model),
+    ).values_list('count', flat=True).afirst()
+    if counter is not None:
+        return counter
+    # Primeira leitura: conta e cria o contador em uma transação
+    return await sync_to_async(get_active_count)(company_id, model)
+
+
+def estimate_count(queryset):
+    """Estimativa de linhas do planejador do PostgreSQL (EXPLAIN, sem executar)."""
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_queryset(queryset, cutoff=EXACT_COUNT_CUTOFF):
+    """
+    Conta um queryset filtrado evitando COUNT(*) sobre tabelas grandes.
+
+    No PostgreSQL usa a estimativa do planejador e só faz a contagem exata
+    quando a estimativa fica abaixo de `cutoff`. Nos demais bancos conta
+    no máximo `cutoff + 1` linhas e sinaliza o resultado como aproximado
+    quando o limite é atingido.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        estimate = estimate_count(queryset)
+        if estimate > cutoff:
+            return RowCount(estimate, approximate=True)
+        return RowCount(queryset.count())
+
+    capped = queryset.order_by()[:cutoff + 1].count()
+    if capped > cutoff:
+        return RowCount(cutoff, approximate=True)
+    return RowCount(capped)
+
+
+async def acount_queryset(queryset, cutoff=EXACT_COUNT_CUTOFF):
+    """Versão assíncrona de `count_queryset`."""
+    if connections[queryset.db].vendor == 'postgresql':
+        # EXPLAIN pelo cursor, que não tem API assíncrona
+        return await sync_to_async(count_queryset)(queryset, cutoff)
+
+    capped = await queryset.order_by()[:cutoff + 1].acount()
+    if capped > cutoff:
+        return RowCount(cutoff, approximate=True)
+    return RowCount(capped)
+
+
+class RowCountMixin:
+    """
+    Mixin para ListViews que expõe `row_count` ao template: o contador
+    incremental da empresa quando não há filtros, ou a contagem
+    estimada/limitada do queryset filtrado.
+    """
+    count_filter_params = ('search',)
+
+    def is_filtered(self):
+        return any(self.request.GET.get(param) for param in self.count_filter_params)
+
+    def get_row_count(self):
+        if self.is_filtered():
+            return count_queryset(self.object_list)
+        return RowCount(get_active_count(self.request.user.company_active_id, self.model))
+
+    async def aget_row_count(self):
+        if self.is_filtered():
+            return await acount_queryset(self.object_list)
+        return RowCount(await aget_active_count(self.request.user.company_active_id, self.model))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['row_count'] = self.get_row_count()
+        return context
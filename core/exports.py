@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+# Textos que o Excel/LibreOffice interpretariam como fórmula (injeção de CSV)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def format_export_value(value):
+    """Formata um valor para planilhas em português (vírgula decimal, datas dd/mm/aaaa)."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Sim' if value else 'Não'
+    if isinstance(value, Decimal):
+        return format(value, 'f').replace('.', ',')
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%d/%m/%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(header, rows, flush_every=500):
+    """
+    Gera o CSV (`;`, UTF-8 com BOM para o Excel) em blocos de bytes.
+    Textos que começam com `=`, `+`, `-` ou `@` recebem um `'` na frente
+    para não serem executados como fórmula ao abrir a planilha.
+    As linhas são escritas em um buffer que é esvaziado a cada
+    `flush_every` linhas, então a memória não cresce com o arquivo.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';')
+    writer.writerow(header)
+    yield ('\ufeff' + buffer.getvalue()).encode()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow([format_export_value(value) for value in row])
+        pending += 1
+        if pending >= flush_every:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode()
+
+
+class CSVExportMixin:
+    """
+    Exportação CSV em fluxo para as ListViews.
+
+    Usa o `get_queryset()` da listagem (mesma empresa e mesma busca) e lê as
+    colunas de `export_columns` (`(cabeçalho, lookup)`) com
+    `values_list().iterator()`, que no PostgreSQL usa um cursor no servidor:
+    o primeiro bloco sai imediatamente e a memória do worker fica constante.
+    """
+    export_columns = ()
+    export_filename = 'exportacao'
+    export_chunk_size = 2000
+
+    def get_export_queryset(self):
+        lookups = [lookup for _, lookup in self.export_columns]
+        return self.get_queryset().values_list(*lookups)
+
+    def get(self, request, *args, **kwargs):
+        header = [title for title, _ in self.export_columns]
+        rows = self.get_export_queryset().iterator(chunk_size=self.export_chunk_size)
+        response = StreamingHttpResponse(stream_csv(header, rows), content_type='text/csv; charset=utf-8')
+        filename = f"{self.export_filename}_{timezone.localdate():%Y%m%d}.csv"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
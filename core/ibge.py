@@ -0,0 +1,121 @@
+"""
+Municípios do IBGE em memória.
+
+A tabela `Municipality` é carregada pelo comando `load_municipalities` e
+lida uma vez por processo em um índice com dois dicionários: código ->
+(nome, UF) e (nome normalizado, UF) -> código. Resolver uma cidade ou
+validar um código não consulta o banco; o índice é recarregado quando o
+comando de carga publica uma nova versão no cache.
+"""
+import re
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from core.search import normalize_search_text
+
+
+# Dois primeiros dígitos do código IBGE do município -> UF
+UF_CODES = {
+    '11': 'RO', '12': 'AC', '13': 'AM', '14': 'RR', '15': 'PA', '16': 'AP', '17': 'TO',
+    '21': 'MA', '22': 'PI', '23': 'CE', '24': 'RN', '25': 'PB', '26': 'PE', '27': 'AL',
+    '28': 'SE', '29': 'BA',
+    '31': 'MG', '32': 'ES', '33': 'RJ', '35': 'SP',
+    '41': 'PR', '42': 'SC', '43': 'RS',
+    '50': 'MS', '51': 'MT', '52': 'GO', '53': 'DF',
+}
+STATES = frozenset(UF_CODES.values())
+
+VERSION_KEY = 'core.municipality:version'
+
+
+def normalize_city_name(name):
+    """'Embu-Guaçu' e "Pau d'Arco" -> 'embu guacu', 'pau d arco'."""
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', normalize_search_text(name)).split())
+
+
+class MunicipalityIndex:
+
+    def __init__(self, municipalities):
+        self.by_code = {}
+        self.by_name = {}
+        for ibge_code, name, state in municipalities:
+            self.by_code[ibge_code] = (name, state)
+            self.by_name[(normalize_city_name(name), state)] = ibge_code
+
+    def __len__(self):
+        return len(self.by_code)
+
+    def resolve(self, city_name, state):
+        """Código IBGE da cidade na UF, ou `None`."""
+        return self.by_name.get((normalize_city_name(city_name), (state or '').upper()))
+
+    def get(self, ibge_code):
+        """`(nome, UF)` do código, ou `None`."""
+        return self.by_code.get(ibge_code)
+
+    def validate(self, ibge_code, state):
+        """
+        Confere se o código pertence à UF. Sem a tabela carregada, a UF é
+        conferida pelo prefixo do código.
+        """
+        state = (state or '').upper()
+        if UF_CODES.get(ibge_code[:2]) != state:
+            raise ValidationError(f'O código IBGE {ibge_code} não pertence à UF {state}.')
+        if self.by_code and ibge_code not in self.by_code:
+            raise ValidationError(f'Código IBGE {ibge_code} não encontrado na tabela de municípios.')
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache.set(VERSION_KEY, time.time_ns() // 1000, timeout=None)
+
+
+_index = None
+
+
+def get_index():
+    """Índice do processo, recarregado quando a versão muda."""
+    global _index
+    from core.models.municipality import Municipality
+
+    version = get_version()
+    if _index is None or _index[0] != version:
+        _index = (version, MunicipalityIndex(
+            Municipality.objects.values_list('ibge_code', 'name', 'state').iterator(chunk_size=2000)
+        ))
+    return _index[1]
+
+
+class MunicipalityFormMixin:
+    """
+    Para formulários de `Address`: preenche o código IBGE a partir da
+    cidade e UF quando ele fica em branco e valida a UF do código.
+    """
+
+    def clean(self):
+        cleaned_data = super().clean()
+        state = cleaned_data.get('state')
+        if not state:
+            return cleaned_data
+
+        index = get_index()
+        ibge_code = cleaned_data.get('city_ibge_code')
+        if not ibge_code and cleaned_data.get('city_name'):
+            ibge_code = index.resolve(cleaned_data['city_name'], state)
+            if ibge_code:
+                cleaned_data['city_ibge_code'] = ibge_code
+        if ibge_code:
+            try:
+                index.validate(ibge_code, state)
+            except ValidationError as error:
+                self.add_error('city_ibge_code', error)
+        return cleaned_data
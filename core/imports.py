@@ -0,0 +1,124 @@
+import csv
+import io
+import os
+import tempfile
+
+from django.core.files import File
+
+from core.search import normalize_search_text
+
+
+class ImportFileError(Exception):
+    """Arquivo de importação ilegível ou fora do layout esperado."""
+
+
+def normalize_header(value):
+    return normalize_search_text(str(value or '')).replace(' ', '_')
+
+
+def parse_decimal(value):
+    """Aceita '1.234,56' (formato brasileiro) e '1234.56'."""
+    if isinstance(value, str) and ',' in value:
+        return value.replace('.', '').replace(',', '.')
+    return value
+
+
+def _iter_csv(file, encoding):
+    stream = io.TextIOWrapper(file, encoding=encoding, newline='')
+    sample = stream.read(8192)
+    stream.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        yield from csv.reader(stream, dialect)
+    finally:
+        # Devolve o arquivo ao chamador sem fechá-lo
+        if not stream.closed:
+            stream.detach()
+
+
+def _iter_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('Instale o pacote openpyxl para importar planilhas XLSX.')
+
+    # read_only lê a planilha em fluxo, sem carregar todas as células
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def open_rows(file, filename, aliases=None, encoding='utf-8-sig'):
+    """
+    Abre um arquivo CSV ou XLSX como fluxo de linhas.
+
+    Retorna `(colunas, linhas)`: as colunas são os cabeçalhos normalizados
+    (minúsculas, sem acentos, espaços viram `_`) e traduzidos por `aliases`;
+    `linhas` é um gerador de `(número da linha, dict)` que pula linhas vazias.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        rows = _iter_csv(file, encoding)
+    elif extension in ('.xlsx', '.xlsm'):
+        rows = _iter_xlsx(file)
+    else:
+        raise ImportFileError('Formato não suportado. Envie um arquivo .csv ou .xlsx.')
+
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ImportFileError('O arquivo está vazio.')
+    except UnicodeDecodeError:
+        raise ImportFileError(f'O arquivo não está codificado em {encoding}.')
+
+    aliases = aliases or {}
+    columns = [aliases.get(name, name) for name in map(normalize_header, header)]
+
+    def generate():
+        for number, row in enumerate(rows, start=2):
+            if all(value in (None, '') for value in row):
+                continue
+            yield number, dict(zip(columns, row))
+
+    return columns, generate()
+
+
+class ErrorReport:
+    """
+    Relatório CSV das linhas rejeitadas. As linhas são gravadas em um
+    arquivo temporário conforme os erros aparecem, sem acumular em memória.
+    """
+
+    def __init__(self, columns):
+        self.columns = [column for column in columns if column]
+        self.count = 0
+        self.file = tempfile.TemporaryFile()
+        self.stream = io.TextIOWrapper(self.file, encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.stream, delimiter=';')
+        self.writer.writerow(['linha', 'erros', *self.columns])
+
+    def add(self, number, row, errors):
+        self.writer.writerow([
+            number,
+            ' | '.join(errors),
+            *('' if row.get(column) is None else row.get(column) for column in self.columns),
+        ])
+        self.count += 1
+
+    def rewind(self):
+        """Arquivo binário do relatório, posicionado no início."""
+        self.stream.flush()
+        self.file.seek(0)
+        return self.file
+
+    def save(self, field_file, name):
+        """Grava o relatório em um `FileField` (sem salvar o modelo)."""
+        field_file.save(name, File(self.rewind()), save=False)
+
+    def close(self):
+        self.stream.close()
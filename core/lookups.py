@@ -0,0 +1,107 @@
+from django import forms
+from django.core.cache import cache
+from django.core.validators import EMPTY_VALUES
+
+from core.cache import tenant_cache_key
+
+
+class TenantLookup:
+    """
+    Tabela de referência pequena (categorias, unidades...) de uma empresa,
+    mantida em cache com a versão do modelo. A versão é incrementada a cada
+    save/delete de registros do modelo (ver `core.signals`), então o cache
+    nunca serve dados desatualizados.
+    """
+
+    def __init__(self, model, fields=('name',), label=None, ordering=('name',), timeout=60 * 60):
+        self.model = model
+        self.fields = tuple(fields)
+        self.label = label or (lambda values: values[self.fields[0]])
+        self.ordering = ordering
+        self.timeout = timeout
+
+    @property
+    def namespace(self):
+        return self.model._meta.label_lower
+
+    def rows(self, company_id):
+        """Lista de `(pk, label, valores)` dos registros ativos da empresa."""
+        key = tenant_cache_key(company_id, self.namespace, 'lookup', *self.fields)
+        rows = cache.get(key)
+        if rows is None:
+            queryset = self.model._default_manager.filter(
+                company_id=company_id,
+                is_active=True,
+            ).order_by(*self.ordering).values('pk', *self.fields)
+            rows = [
+                (values.pop('pk'), self.label(values), values)
+                for values in queryset
+            ]
+            cache.set(key, rows, self.timeout)
+        return rows
+
+    def choices(self, company_id):
+        return [(pk, label) for pk, label, _ in self.rows(company_id)]
+
+    def instance(self, company_id, pk, values):
+        """Instância (não consultada) com os valores cacheados."""
+        obj = self.model(pk=pk, company_id=company_id, **values)
+        obj._state.adding = False
+        return obj
+
+
+class LookupChoiceField(forms.ChoiceField):
+    """
+    Campo de escolha de chave estrangeira alimentado por um `TenantLookup`.
+    Renderizar o formulário não consulta o banco; o valor limpo é uma
+    instância do modelo montada a partir do cache.
+    """
+
+    def __init__(self, lookup, company_id=None, empty_label='---------', **kwargs):
+        self.lookup = lookup
+        self.company_id = company_id
+        self.empty_label = empty_label
+        super().__init__(choices=self._get_lookup_choices, **kwargs)
+
+    def _rows(self):
+        if not self.company_id:
+            return []
+        return self.lookup.rows(self.company_id)
+
+    def _get_lookup_choices(self):
+        return [('', self.empty_label)] + [(pk, label) for pk, label, _ in self._rows()]
+
+    def prepare_value(self, value):
+        if hasattr(value, '_meta'):
+            return value.pk
+        return value
+
+    def to_python(self, value):
+        if value in EMPTY_VALUES:
+            return None
+        value = self.prepare_value(value)
+        for pk, _, values in self._rows():
+            if str(pk) == str(value):
+                return self.lookup.instance(self.company_id, pk, values)
+        raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+
+    def validate(self, value):
+        if value is None and self.required:
+            raise forms.ValidationError(self.error_messages['required'], code='required')
+
+    def has_changed(self, initial, data):
+        initial = self.prepare_value(initial)
+        return str(initial if initial is not None else '') != str(data if data is not None else '')
+
+
+class LookupModelFormMixin:
+    """
+    Para ModelForms com `LookupChoiceField`: a chave já foi validada contra o
+    cache da empresa, então a validação do modelo não repete o SELECT de
+    existência do `ForeignKey.validate`.
+    """
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        exclude.update(name for name, field in self.fields.items() if isinstance(field, LookupChoiceField))
+        return exclude
@@ -0,0 +1,215 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.benchmark import percentile
+from core.management.commands.benchmark_http import Command as HTTPBenchmarkCommand
+
+
+# Buscas disparadas a cada tecla: (rota, parâmetro do termo, requisição HTMX)
+KEYSTROKE_ROUTES = [
+    ('inventory:product_list', 'search', True),
+    ('partners:customer_autocomplete', 'term', False),
+    ('partners:supplier_list', 'search', True),
+    ('inventory:category_autocomplete', 'term', False),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara requisições por segundo de um worker WSGI (views síncronas) e de um '
+        'worker ASGI (views assíncronas) sob buscas simultâneas no estilo "digitando"'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='ID da empresa (padrão: a com mais produtos)')
+        parser.add_argument('--term', default='acucar', help='Termo digitado; cada prefixo vira uma requisição')
+        parser.add_argument('--typists', type=int, default=20, help='Usuários digitando ao mesmo tempo')
+        parser.add_argument('--rounds', type=int, default=3, help='Vezes que cada usuário digita o termo')
+        parser.add_argument('--output', help='Grava o resultado em JSON neste arquivo')
+        parser.add_argument('--worker', choices=['wsgi', 'asgi'], help='Uso interno: executa só um dos modos')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(self.run_worker(options)))
+            return
+
+        self.stdout.write(
+            f'🚀 Benchmark WSGI x ASGI: {options["typists"]} usuário(s) digitando "{options["term"]}" '
+            f'{options["rounds"]} vez(es), 1 worker por modo'
+        )
+        results = {}
+        for mode in ('wsgi', 'asgi'):
+            self.stdout.write(f'⏳ {mode.upper()}...')
+            results[mode] = stats = self.spawn_worker(mode, options)
+            self.stdout.write(
+                f'✅ {mode.upper()}: {stats["rps"]} req/s, p50={stats["p50"]}ms p95={stats["p95"]}ms '
+                f'({stats["requests"]} requisições, {stats["errors"]} erro(s))'
+            )
+
+        speedup = results['asgi']['rps'] / results['wsgi']['rps'] if results['wsgi']['rps'] else 0.0
+        self.stdout.write(f'\n📊 ASGI atende {speedup:.2f}x as requisições por segundo do WSGI por worker')
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({'options': {key: options[key] for key in ('term', 'typists', 'rounds')}, 'results': results}, file, indent=2)
+            self.stdout.write(f'💾 Resultado gravado em {options["output"]}')
+        self.stdout.write(self.style.SUCCESS('\n🎉 Concluído!'))
+
+    def spawn_worker(self, mode, options):
+        """Cada modo roda em um processo: as URLs escolhem as views por `ASYNC_VIEWS` ao carregar."""
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_asgi',
+            '--worker', mode,
+            '--term', options['term'],
+            '--typists', str(options['typists']),
+            '--rounds', str(options['rounds']),
+        ]
+        if options['company']:
+            command += ['--company', str(options['company'])]
+        env = {**os.environ, 'ASYNC_VIEWS': '1' if mode == 'asgi' else '0'}
+        process = subprocess.run(command, env=env, capture_output=True, text=True)
+        if process.returncode != 0:
+            raise CommandError(f'❌ Worker {mode} falhou:\n{process.stderr[-2000:]}')
+        return json.loads(process.stdout.strip().splitlines()[-1])
+
+    def run_worker(self, options):
+        membership = HTTPBenchmarkCommand().get_membership(options['company'])
+        client = Client()
+        client.force_login(membership.user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+        term = options['term']
+        typists = []
+        for index in range(options['typists']):
+            route, param, htmx = KEYSTROKE_ROUTES[index % len(KEYSTROKE_ROUTES)]
+            path = reverse(route)
+            typists.append([
+                (path, f'{param}={term[:size]}', htmx)
+                for _ in range(options['rounds'])
+                for size in range(1, len(term) + 1)
+            ])
+
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['*']):
+            if options['worker'] == 'wsgi':
+                latencies, statuses, elapsed = self.run_wsgi(typists, cookie)
+            else:
+                latencies, statuses, elapsed = asyncio.run(self.run_asgi(typists, cookie))
+
+        millis = [latency * 1000 for latency in latencies]
+        return {
+            'requests': len(latencies),
+            'errors': sum(1 for status in statuses if status != 200),
+            'seconds': round(elapsed, 3),
+            'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'p50': round(percentile(millis, 50), 3),
+            'p95': round(percentile(millis, 95), 3),
+        }
+
+    def run_wsgi(self, typists, cookie):
+        # Um worker síncrono atende uma requisição por vez: as teclas dos
+        # usuários entram na fila intercaladas, como chegariam ao servidor.
+        # A latência de cada tecla conta desde a resposta anterior do mesmo
+        # usuário (o tempo na fila inclusive), como no modo ASGI
+        handler = WSGIHandler()
+        queue = [
+            (typist, request)
+            for keystrokes in zip(*typists)
+            for typist, request in enumerate(keystrokes)
+        ]
+        latencies, statuses = [], []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(int(status.split()[0]))
+
+        started = time.perf_counter()
+        last_response = [started] * len(typists)
+        for typist, (path, query, htmx) in queue:
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': query,
+                'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'REMOTE_ADDR': '10.0.0.1',
+                'HTTP_HOST': 'localhost',
+                'HTTP_COOKIE': cookie,
+                'wsgi.input': io.BytesIO(),
+                'wsgi.errors': sys.stderr,
+                'wsgi.url_scheme': 'http',
+            }
+            if htmx:
+                environ['HTTP_HX_REQUEST'] = 'true'
+            response = handler(environ, start_response)
+            b''.join(response)
+            response.close()
+            finished = time.perf_counter()
+            latencies.append(finished - last_response[typist])
+            last_response[typist] = finished
+        return latencies, statuses, time.perf_counter() - started
+
+    async def run_asgi(self, typists, cookie):
+        # Um worker assíncrono: cada usuário espera a resposta antes da
+        # próxima tecla, mas os usuários disputam o mesmo event loop
+        handler = ASGIHandler()
+        latencies, statuses = [], []
+
+        async def request(path, query, htmx):
+            headers = [(b'host', b'localhost'), (b'cookie', cookie.encode())]
+            if htmx:
+                headers.append((b'hx-request', b'true'))
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': query.encode(),
+                'root_path': '',
+                'headers': headers,
+                'client': ('10.0.0.1', 0),
+                'server': ('localhost', 80),
+            }
+            body_sent = asyncio.Event()
+            finished = asyncio.Event()
+
+            async def receive():
+                if not body_sent.is_set():
+                    body_sent.set()
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            request_started = time.perf_counter()
+            await handler(scope, receive, send)
+            finished.set()
+            latencies.append(time.perf_counter() - request_started)
+
+        async def type_keys(keystrokes):
+            for path, query, htmx in keystrokes:
+                await request(path, query, htmx)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(type_keys(keystrokes) for keystrokes in typists))
+        return latencies, statuses, time.perf_counter() - started
@@ -0,0 +1,187 @@
+import json
+import platform
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models.user import Membership
+from core.benchmark import measure
+from core.queries import QueryRecorder
+from inventory.models.product import Product
+from partners.models.customers import Customer
+from partners.models.suppliers import Supplier
+
+
+# (nome, rota, argumentos da rota, querystring, requisição HTMX)
+SCENARIOS = [
+    ('product_list', 'inventory:product_list', None, '', False),
+    ('product_list_search', 'inventory:product_list', None, 'search=acucar', False),
+    ('product_list_htmx', 'inventory:product_list', None, '', True),
+    ('product_list_search_htmx', 'inventory:product_list', None, 'search=acucar', True),
+    ('product_create_form', 'inventory:product_create', None, '', False),
+    ('product_tax_form', 'inventory:product_tax', 'product', '', False),
+    ('customer_list', 'partners:customer_list', None, '', False),
+    ('customer_list_htmx', 'partners:customer_list', None, '', True),
+    ('customer_list_search_htmx', 'partners:customer_list', None, 'search=silva', True),
+    ('customer_basic', 'partners:customer_update', 'customer', '', False),
+    ('customer_advanced', 'partners:customer_advanced', 'customer', '', False),
+    ('customer_address', 'partners:customer_address', 'customer', '', False),
+    ('supplier_list', 'partners:supplier_list', None, '', False),
+    ('supplier_list_htmx', 'partners:supplier_list', None, '', True),
+    ('user_list', 'configuration:user_list', None, '', False),
+]
+
+
+class Command(BaseCommand):
+    help = 'Mede latência (p50/p95), consultas e memória das rotas mais usadas e compara com uma linha de base'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='ID da empresa (padrão: a com mais produtos)')
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--only', action='append', help='Executa só os cenários informados (pode repetir)')
+        parser.add_argument('--output', help='Grava o resultado em JSON neste arquivo')
+        parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=20.0,
+            help='Aumento percentual do p50 considerado regressão (padrão: 20)',
+        )
+        parser.add_argument('--fail-on-regression', action='store_true', help='Termina com erro se houver regressões')
+
+    def handle(self, *args, **options):
+        membership = self.get_membership(options.get('company'))
+        company = membership.company
+        objects = {
+            'product': Product.objects.filter(company=company, is_active=True).order_by('pk').first(),
+            'customer': Customer.objects.filter(company=company, is_active=True).order_by('pk').first(),
+        }
+
+        client = Client()
+        client.force_login(membership.user)
+        scenarios = [scenario for scenario in SCENARIOS if not options['only'] or scenario[0] in options['only']]
+
+        self.stdout.write(f'🚀 Benchmark HTTP: {company.legal_name} ({len(scenarios)} cenários, {options["repeat"]} execuções cada)')
+        results = {}
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['*']):
+            for name, route, obj, query, htmx in scenarios:
+                if obj and objects[obj] is None:
+                    self.stdout.write(self.style.WARNING(f'⚠️ {name}: sem {obj} na empresa, ignorado'))
+                    continue
+                url = reverse(route, kwargs={'pk': objects[obj].pk} if obj else None)
+                if query:
+                    url = f'{url}?{query}'
+                results[name] = self.run_scenario(client, url, htmx, options['repeat'])
+                stats = results[name]
+                self.stdout.write(
+                    f'✅ {name}: p50={stats["p50"]}ms p95={stats["p95"]}ms '
+                    f'consultas={stats["queries"]} memória={stats["memory_kb"]}KB'
+                )
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'company': company.pk,
+                'products': Product.objects.filter(company=company).count(),
+                'customers': Customer.objects.filter(company=company).count(),
+                'suppliers': Supplier.objects.filter(company=company).count(),
+                'repeat': options['repeat'],
+                'database': connection.vendor,
+                'python': platform.python_version(),
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2, ensure_ascii=False)
+            self.stdout.write(f'💾 Resultado gravado em {options["output"]}')
+
+        regressions = []
+        if options['baseline']:
+            regressions = self.compare(options['baseline'], results, options['threshold'])
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'❌ {len(regressions)} regressão(ões): {", ".join(regressions)}')
+        self.stdout.write(self.style.SUCCESS('\n🎉 Concluído!'))
+
+    def run_scenario(self, client, url, htmx, repeat):
+        headers = {'HX-Request': 'true'} if htmx else {}
+
+        def request():
+            response = client.get(url, headers=headers)
+            if response.status_code != 200:
+                raise CommandError(f'❌ {url} respondeu {response.status_code}.')
+            return response
+
+        stats = measure(request, repeat=repeat)
+
+        # Consultas e memória em execuções separadas, para não distorcer os tempos
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = request()
+        tracemalloc.start()
+        try:
+            request()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        stats.update({
+            'queries': recorder.count,
+            'memory_kb': round(peak / 1024, 1),
+            'bytes': len(response.content),
+        })
+        return stats
+
+    def compare(self, path, results, threshold):
+        try:
+            with open(path, encoding='utf-8') as file:
+                baseline = json.load(file)['results']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'❌ Linha de base inválida ({path}): {error}')
+
+        self.stdout.write(f'\n📊 Comparação com {path} (regressão: p50 +{threshold:g}% ou mais consultas)')
+        regressions = []
+        for name, stats in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f'🆕 {name}: sem linha de base')
+                continue
+            change = (stats['p50'] - before['p50']) / before['p50'] * 100 if before['p50'] else 0.0
+            query_change = stats['queries'] - before['queries']
+            line = (
+                f'{name}: p50 {before["p50"]} -> {stats["p50"]}ms ({change:+.1f}%), '
+                f'consultas {before["queries"]} -> {stats["queries"]}, '
+                f'memória {before["memory_kb"]} -> {stats["memory_kb"]}KB'
+            )
+            if change > threshold or query_change > 0:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f'❌ {line}'))
+            elif change < -threshold:
+                self.stdout.write(self.style.SUCCESS(f'🚀 {line}'))
+            else:
+                self.stdout.write(f'✅ {line}')
+        return regressions
+
+    def get_membership(self, company_id):
+        memberships = Membership.objects.filter(is_active=True, role=Membership.Role.OWNER).select_related('company', 'user')
+        if company_id:
+            membership = memberships.filter(company_id=company_id).first()
+            if membership is None:
+                raise CommandError(f'Empresa {company_id} não encontrada ou sem proprietário ativo.')
+            return membership
+
+        largest = (
+            Product.objects.order_by().values('company')
+            .annotate(total=Count('pk')).order_by('-total').values('company')[:1]
+        )
+        membership = memberships.filter(company__in=largest).first() or memberships.first()
+        if membership is None:
+            raise CommandError('Nenhuma empresa com proprietário ativo. Rode o seed_scale primeiro.')
+        return membership
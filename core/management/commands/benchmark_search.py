@@ -0,0 +1,61 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models.company import Company
+from core.benchmark import measure
+from core.search import search_queryset
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência (p50/p95) da busca das listagens para uma empresa'
+
+    MODELS = {
+        'product': 'inventory.Product',
+        'category': 'inventory.Category',
+        'customer': 'partners.Customer',
+        'supplier': 'partners.Supplier',
+    }
+
+    DEFAULT_TERMS = ['a', 'arroz', 'acucar refinado', 'cafe 500g', '7891', 'zzzz']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='ID da empresa (padrão: a primeira com registros)')
+        parser.add_argument('--model', choices=sorted(self.MODELS), default='product')
+        parser.add_argument('--term', action='append', dest='terms', help='Termo de busca (pode repetir)')
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        model = apps.get_model(self.MODELS[options['model']])
+        company = self.get_company(model, options.get('company'))
+        base = model.objects.filter(company=company, is_active=True)
+        page_size = options['page_size']
+
+        self.stdout.write(
+            f'🚀 Benchmark de busca: {model._meta.verbose_name_plural} '
+            f'({base.count()} registros, banco {connection.vendor})'
+        )
+
+        for term in options.get('terms') or self.DEFAULT_TERMS:
+            # A montagem entra na medição: no PostgreSQL ela consulta a estimativa do planejador
+            stats = measure(lambda: list(search_queryset(base, term)[:page_size]), repeat=options['repeat'])
+            self.stdout.write(
+                f'🔎 "{term}": p50={stats["p50"]}ms p95={stats["p95"]}ms max={stats["max"]}ms'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\n🎉 Concluído!'))
+
+    def get_company(self, model, company_id):
+        if company_id:
+            try:
+                return Company.objects.get(pk=company_id)
+            except Company.DoesNotExist:
+                raise CommandError(f'Empresa {company_id} não encontrada.')
+
+        company = Company.objects.filter(
+            pk__in=model.objects.values('company')
+        ).first()
+        if not company:
+            raise CommandError('Nenhum registro encontrado para o benchmark.')
+        return company
@@ -0,0 +1,87 @@
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cep import CEPAddress, CEPDatabase, get_database_path
+from core.ibge import STATES, get_index
+from core.imports import ImportFileError, open_rows
+
+
+# Cabeçalhos aceitos (normalizados) -> campo do CEPAddress
+COLUMN_ALIASES = {
+    'cep': 'postal_code',
+    'logradouro': 'street',
+    'endereco': 'street',
+    'rua': 'street',
+    'bairro': 'district',
+    'cidade': 'city_name',
+    'municipio': 'city_name',
+    'localidade': 'city_name',
+    'uf': 'state',
+    'estado': 'state',
+    'ibge': 'city_ibge_code',
+    'codigo_ibge': 'city_ibge_code',
+    'cod_ibge': 'city_ibge_code',
+}
+
+
+def _text(row, field):
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+class Command(BaseCommand):
+    help = 'Gera a base local de CEPs a partir de um CSV/XLSX (cep, logradouro, bairro, cidade, uf, ibge)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Caminho do arquivo .csv ou .xlsx')
+        parser.add_argument('--output', help='Arquivo da base (padrão: settings.CEP_DATABASE_PATH)')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Codificação do CSV (ex.: latin-1)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        output = options['output'] or get_database_path()
+        self.stdout.write(f'🚀 Lendo {os.path.basename(path)}...')
+
+        # Cidades sem código IBGE são resolvidas pela tabela de municípios
+        municipalities = get_index()
+        addresses, skipped = [], 0
+        with open(path, 'rb') as file:
+            try:
+                columns, rows = open_rows(file, path, COLUMN_ALIASES, encoding=options['encoding'])
+                if 'postal_code' not in columns:
+                    raise ImportFileError('Coluna obrigatória ausente: cep.')
+                for _, row in rows:
+                    postal_code = ''.join(filter(str.isdigit, _text(row, 'postal_code')))
+                    city_ibge_code = ''.join(filter(str.isdigit, _text(row, 'city_ibge_code')))
+                    state = _text(row, 'state').upper()
+                    if not city_ibge_code:
+                        city_ibge_code = municipalities.resolve(_text(row, 'city_name'), state) or ''
+                    if len(postal_code) != 8 or state not in STATES or not self.valid_code(municipalities, city_ibge_code, state):
+                        skipped += 1
+                        continue
+                    addresses.append(CEPAddress(
+                        postal_code=postal_code,
+                        street=_text(row, 'street'),
+                        district=_text(row, 'district'),
+                        city_name=_text(row, 'city_name'),
+                        state=state,
+                        city_ibge_code=city_ibge_code,
+                    ))
+            except ImportFileError as error:
+                raise CommandError(f'❌ {error}')
+
+        total = CEPDatabase.write(output, addresses)
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'⚠️  {skipped} linha(s) ignorada(s) por CEP, UF ou código IBGE inválido'))
+        self.stdout.write(self.style.SUCCESS(f'\n🎉 Concluído! {total} CEPs gravados em {output}'))
+
+    def valid_code(self, municipalities, city_ibge_code, state):
+        if not city_ibge_code:
+            return True
+        try:
+            municipalities.validate(city_ibge_code, state)
+        except ValidationError:
+            return False
+        return True
@@ -0,0 +1,76 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.ibge import UF_CODES, bump_version, normalize_city_name
+from core.imports import ImportFileError, open_rows
+from core.models.municipality import Municipality
+
+
+# Cabeçalhos aceitos (normalizados) -> campo do Municipality
+COLUMN_ALIASES = {
+    'codigo_ibge': 'ibge_code',
+    'cod_ibge': 'ibge_code',
+    'ibge': 'ibge_code',
+    'codigo': 'ibge_code',
+    'codigo_municipio': 'ibge_code',
+    'codigo_municipio_completo': 'ibge_code',
+    'nome': 'name',
+    'municipio': 'name',
+    'nome_municipio': 'name',
+    'cidade': 'name',
+    'uf': 'state',
+    'sigla_uf': 'state',
+}
+
+
+class Command(BaseCommand):
+    help = 'Carrega a tabela de municípios do IBGE a partir de um CSV/XLSX (codigo_ibge, nome, uf)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Caminho do arquivo .csv ou .xlsx')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Codificação do CSV (ex.: latin-1)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        self.stdout.write(f'🚀 Lendo {os.path.basename(path)}...')
+
+        municipalities, skipped = {}, 0
+        with open(path, 'rb') as file:
+            try:
+                columns, rows = open_rows(file, path, COLUMN_ALIASES, encoding=options['encoding'])
+                missing = {'ibge_code', 'name'} - set(columns)
+                if missing:
+                    raise ImportFileError(f"Coluna(s) obrigatória(s) ausente(s): {', '.join(sorted(missing))}.")
+                for _, row in rows:
+                    ibge_code = ''.join(filter(str.isdigit, str(row.get('ibge_code') or '')))
+                    name = str(row.get('name') or '').strip()
+                    # Sem coluna de UF, a UF sai do prefixo do código
+                    state = str(row.get('state') or UF_CODES.get(ibge_code[:2], '')).strip().upper()
+                    if len(ibge_code) != 7 or not name or UF_CODES.get(ibge_code[:2]) != state:
+                        skipped += 1
+                        continue
+                    municipalities[ibge_code] = Municipality(
+                        ibge_code=ibge_code,
+                        name=name[:120],
+                        normalized_name=normalize_city_name(name)[:120],
+                        state=state,
+                    )
+            except ImportFileError as error:
+                raise CommandError(f'❌ {error}')
+
+        with transaction.atomic():
+            Municipality.objects.bulk_create(
+                municipalities.values(),
+                batch_size=options['batch_size'],
+                update_conflicts=True,
+                unique_fields=['ibge_code'],
+                update_fields=['name', 'normalized_name', 'state'],
+            )
+        bump_version()
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'⚠️  {skipped} linha(s) ignorada(s) por código, nome ou UF inválidos'))
+        self.stdout.write(self.style.SUCCESS(f'\n🎉 Concluído! {len(municipalities)} municípios carregados'))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from core.models.address import Address
+
+
+class Command(BaseCommand):
+    help = 'Calcula o hash dos endereços e une os duplicados, reapontando clientes, fornecedores e estabelecimentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recalcula também os endereços que já têm hash (após mudar a normalização)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Address.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(content_hash__isnull=True)
+
+        self.stdout.write('🚀 Unindo endereços duplicados...')
+
+        last_pk, hashed, merged = 0, 0, 0
+        while batch := list(queryset.filter(pk__gt=last_pk)[:options['batch_size']]):
+            last_pk = batch[-1].pk
+            with transaction.atomic():
+                batch_hashed, batch_merged = self.merge_batch(batch)
+            hashed += batch_hashed
+            merged += batch_merged
+            self.stdout.write(f'⏳ Até o endereço #{last_pk}: {hashed} atualizados, {merged} unidos')
+
+        self.stdout.write(self.style.SUCCESS(f'\n🎉 Concluído! {hashed} endereços atualizados, {merged} duplicados removidos'))
+
+    def merge_batch(self, batch):
+        hashes = {address.pk: address.compute_content_hash() for address in batch}
+        canonical = dict(
+            Address.objects.filter(content_hash__in=set(hashes.values()))
+            .exclude(pk__in=hashes)
+            .values_list('content_hash', 'pk')
+        )
+
+        duplicates, to_hash = {}, []
+        for address in batch:
+            content_hash = hashes[address.pk]
+            if canonical.setdefault(content_hash, address.pk) != address.pk:
+                duplicates[address.pk] = canonical[content_hash]
+            elif address.content_hash != content_hash:
+                address.content_hash = content_hash
+                to_hash.append(address)
+
+        if duplicates:
+            for relation in Address.reference_relations():
+                column = relation.field.attname
+                relation.related_model._base_manager.filter(**{f'{column}__in': duplicates}).update(**{
+                    column: Case(*(
+                        When(**{column: duplicate}, then=Value(target))
+                        for duplicate, target in duplicates.items()
+                    )),
+                })
+            Address.objects.filter(pk__in=duplicates).delete()
+        Address.objects.bulk_update(to_hash, ['content_hash'])
+        return len(to_hash), len(duplicates)
@@ -0,0 +1,31 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.counters import recount_all
+from core.models.company import CompanyBaseModel
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de registros ativos por empresa'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            action='append',
+            dest='companies',
+            help='ID da empresa a recalcular (pode repetir; padrão: todas)',
+        )
+
+    def handle(self, *args, **options):
+        company_ids = options.get('companies')
+
+        self.stdout.write('🚀 Recalculando contadores...')
+
+        for model in apps.get_models():
+            if not issubclass(model, CompanyBaseModel):
+                continue
+            total = recount_all(model, company_ids)
+            self.stdout.write(f'✅ {model._meta.label}: {total} contador(es)')
+
+        self.stdout.write(self.style.SUCCESS('\n🎉 Concluído!'))
@@ -0,0 +1,281 @@
+import random
+import time
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models.company import Company
+from accounts.models.user import Membership, User
+from accounts.services.provisioning import DEFAULT_UNITS
+from core.bulk import insert_rows, reserve_ids, reset_sequences
+from core.cache import bump_tenant_version
+from core.counters import model_label, recount_all
+from core.models.address import Address
+from core.search import normalize_search_text
+from inventory.models.category import Category
+from inventory.models.product import Product, ProductFiscalData
+from inventory.models.stock import StockMovement
+from inventory.models.units import Unit
+from inventory.services.valuation import rebuild_valuation
+from partners.models.customers import Customer
+from partners.models.suppliers import Supplier
+
+
+# Capitais usadas nos endereços: (código IBGE, cidade, UF, prefixo do CEP)
+CITIES = [
+    ('3550308', 'São Paulo', 'SP', '01'),
+    ('3304557', 'Rio de Janeiro', 'RJ', '20'),
+    ('3106200', 'Belo Horizonte', 'MG', '30'),
+    ('4106902', 'Curitiba', 'PR', '80'),
+    ('4314902', 'Porto Alegre', 'RS', '90'),
+    ('4205407', 'Florianópolis', 'SC', '88'),
+    ('5300108', 'Brasília', 'DF', '70'),
+    ('2927408', 'Salvador', 'BA', '40'),
+    ('2611606', 'Recife', 'PE', '50'),
+    ('2304400', 'Fortaleza', 'CE', '60'),
+    ('1302603', 'Manaus', 'AM', '69'),
+    ('5208707', 'Goiânia', 'GO', '74'),
+]
+STREETS = ['Rua das Flores', 'Avenida Brasil', 'Rua XV de Novembro', 'Avenida Paulista', 'Rua da Paz', 'Rua São João', 'Avenida Getúlio Vargas', 'Rua Sete de Setembro']
+DISTRICTS = ['Centro', 'Jardim América', 'Vila Nova', 'Boa Vista', 'Santa Cruz', 'Industrial']
+FIRST_NAMES = ['Ana', 'João', 'Maria', 'José', 'Francisca', 'Antônio', 'Luiza', 'Carlos', 'Paula', 'Pedro', 'Juliana', 'Lucas']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Ferreira', 'Costa', 'Rodrigues', 'Almeida']
+COMPANY_WORDS = ['Comércio', 'Distribuidora', 'Indústria', 'Atacado', 'Alimentos', 'Materiais', 'Tecnologia', 'Logística']
+PRODUCT_WORDS = ['Açúcar', 'Café', 'Arroz', 'Feijão', 'Parafuso', 'Cabo', 'Tinta', 'Detergente', 'Papel', 'Óleo', 'Farinha', 'Lâmpada']
+PRODUCT_VARIANTS = ['Refinado', 'Premium', 'Tradicional', 'Integral', 'Extra', 'Industrial', 'Econômico', 'Especial']
+NCMS = ['17019900', '09012100', '10063021', '07133319', '73181500', '85444900', '32091010', '34022000', '48025610', '15079011']
+CFOPS = ['5102', '5405', '6102', '5101']
+
+# Multiplicadores primos: espalham os números sequenciais sem repetir
+CPF_STEP = 7919
+CNPJ_STEP = 104729
+
+
+def _check_digit(digits, weights):
+    remainder = sum(int(digit) * weight for digit, weight in zip(digits, weights)) % 11
+    return '0' if remainder < 2 else str(11 - remainder)
+
+
+def make_cpf(number):
+    """CPF válido a partir de um número de até 9 dígitos."""
+    base = f'{number % 10 ** 9:09d}'
+    base += _check_digit(base, range(10, 1, -1))
+    return base + _check_digit(base, range(11, 1, -1))
+
+
+def make_cnpj(number):
+    """CNPJ (matriz) válido a partir de um número de até 8 dígitos."""
+    base = f'{number % 10 ** 8:08d}0001'
+    base += _check_digit(base, [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+    return base + _check_digit(base, [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Gera empresas com dados sintéticos em volume (testes de carga e desempenho)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=1)
+        parser.add_argument('--categories', type=int, default=50, help='Por empresa')
+        parser.add_argument('--suppliers', type=int, default=500, help='Por empresa')
+        parser.add_argument('--customers', type=int, default=5000, help='Por empresa')
+        parser.add_argument('--products', type=int, default=100000, help='Por empresa')
+        parser.add_argument('--addresses', type=int, default=2000, help='Endereços distintos por empresa (compartilhados entre parceiros)')
+        parser.add_argument('--seed', type=int, default=42, help='Semente do gerador: a mesma semente gera os mesmos dados')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--password', default='seed1234', help='Senha do usuário proprietário de cada empresa')
+        parser.add_argument('--skip-ledger', action='store_true', help='Não gera os lançamentos de saldo inicial do razão de estoque')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.password = make_password(options['password'])
+        started = time.perf_counter()
+        first = Company.objects.count()
+
+        self.stdout.write(f"🚀 Gerando {options['companies']} empresa(s) com {options['products']} produto(s) cada (semente {options['seed']})...")
+        company_ids = []
+        for index in range(first, first + options['companies']):
+            rng = random.Random(f"{options['seed']}:{index}")
+            company_started = time.perf_counter()
+            company = self.create_company(index)
+            company_ids.append(company.pk)
+
+            addresses = self.create_addresses(rng, options['addresses'])
+            categories = self.create_categories(company, options['categories'])
+            units = self.create_units(company)
+            suppliers = self.create_partners(Supplier, company, rng, options['suppliers'], addresses, index)
+            self.create_partners(Customer, company, rng, options['customers'], addresses, index)
+            total = self.create_products(company, rng, options['products'], categories, units, suppliers, not options['skip_ledger'])
+            self.stdout.write(f'✅ {company.legal_name}: {total} produtos em {time.perf_counter() - company_started:.1f}s')
+
+        self.stdout.write('⏳ Recalculando contadores e valorização...')
+        reset_sequences(Supplier, Customer, ProductFiscalData, Product)
+        for model in (Category, Unit, Supplier, Customer, Product):
+            recount_all(model, company_ids)
+            for company_id in company_ids:
+                bump_tenant_version(company_id, model_label(model))
+        rebuild_valuation(company_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'\n🎉 Concluído em {time.perf_counter() - started:.1f}s! Empresas: {company_ids}'))
+
+    def bulk_create(self, model, objects, **kwargs):
+        created = []
+        for batch in batched(objects, self.batch_size):
+            created += model.objects.bulk_create(batch, **kwargs)
+        return created
+
+    @transaction.atomic
+    def create_company(self, index):
+        company = Company.objects.create(
+            legal_name=f'Empresa Seed {index + 1:04d} LTDA',
+            trade_name=f'Seed {index + 1:04d}',
+        )
+        user, created = User.objects.get_or_create(
+            email=f'seed{index + 1:04d}@example.com',
+            defaults={'username': f'seed{index + 1:04d}', 'password': self.password, 'company_active': company},
+        )
+        if not created:
+            user.company_active = company
+            user.save(update_fields=['company_active'])
+        Membership.objects.create(user=user, company=company, role=Membership.Role.OWNER)
+        return company
+
+    def create_addresses(self, rng, count):
+        addresses = []
+        for _ in range(count):
+            ibge_code, city_name, state, cep_prefix = rng.choice(CITIES)
+            address = Address(
+                street=rng.choice(STREETS),
+                number=str(rng.randint(1, 9999)),
+                district=rng.choice(DISTRICTS),
+                city_name=city_name,
+                city_ibge_code=ibge_code,
+                state=state,
+                postal_code=f'{cep_prefix}{rng.randint(0, 999999):06d}',
+            )
+            address.content_hash = address.compute_content_hash()
+            addresses.append(address)
+        # Endereços iguais (de outra empresa ou de outra execução) são reaproveitados
+        self.bulk_create(Address, addresses, ignore_conflicts=True)
+        hashes = list({address.content_hash for address in addresses})
+        address_ids = []
+        for batch in batched(hashes, self.batch_size):
+            address_ids += Address.objects.filter(content_hash__in=batch).values_list('pk', flat=True)
+        return address_ids
+
+    def create_categories(self, company, count):
+        categories = []
+        for number in range(count):
+            category = Category(
+                company=company,
+                name=f'{PRODUCT_WORDS[number % len(PRODUCT_WORDS)]} {number + 1:03d}',
+                slug=f'categoria-{number + 1:03d}',
+            )
+            category.refresh_search_text()
+            categories.append(category)
+        return [category.pk for category in self.bulk_create(Category, categories)]
+
+    def create_units(self, company):
+        units = []
+        for data in DEFAULT_UNITS:
+            unit = Unit(company=company, **data)
+            unit.refresh_search_text()
+            units.append(unit)
+        return [unit.pk for unit in self.bulk_create(Unit, units)]
+
+    def create_partners(self, model, company, rng, count, addresses, index):
+        # Documentos únicos por empresa: número sequencial espalhado por um primo
+        offset = index * 1_000_003 + (0 if model is Supplier else 500_000)
+        ids = reserve_ids(model, count)
+
+        def generate():
+            for number, pk in enumerate(ids):
+                if model is Supplier or rng.random() < 0.3:
+                    person_type = Supplier.PERSON_TYPE.PJ
+                    cpf_cnpj = make_cnpj((offset + number) * CNPJ_STEP)
+                    name = f'{rng.choice(COMPANY_WORDS)} {rng.choice(LAST_NAMES)} {number + 1} LTDA'
+                else:
+                    person_type = Supplier.PERSON_TYPE.PF
+                    cpf_cnpj = make_cpf((offset + number) * CPF_STEP)
+                    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}'
+                yield {
+                    'id': pk,
+                    'company_id': company.pk,
+                    'name': name,
+                    'cpf_cnpj': cpf_cnpj,
+                    'person_type': person_type,
+                    'partner_type': Supplier.PARTNER_TYPE.SUPPLIER if model is Supplier else Supplier.PARTNER_TYPE.CUSTOMER,
+                    'email': f'contato{number + 1}@example.com',
+                    'address_id': rng.choice(addresses) if addresses else None,
+                    'credit_limit': Decimal(rng.randrange(0, 5_000_000)) / 100,
+                    'search_text': normalize_search_text(name, cpf_cnpj),
+                }
+
+        insert_rows(model, generate(), batch_size=self.batch_size)
+        return list(ids)
+
+    def create_products(self, company, rng, count, categories, units, suppliers, with_ledger):
+        total = 0
+        for batch in batched(range(count), self.batch_size):
+            fiscal_ids = reserve_ids(ProductFiscalData, len(batch))
+            product_ids = reserve_ids(Product, len(batch))
+            fiscal_data, products, movements = [], [], []
+            for number, fiscal_id, product_id in zip(batch, fiscal_ids, product_ids):
+                fiscal_data.append({
+                    'id': fiscal_id,
+                    'company_id': company.pk,
+                    'ncm': rng.choice(NCMS),
+                    'cfop': rng.choice(CFOPS),
+                    'cst_icms': '00',
+                    'cst_pis': '01',
+                    'cst_cofins': '01',
+                    'icms_aliquota': Decimal(rng.choice([7, 12, 18])),
+                    'pis_aliquota': Decimal('1.65'),
+                    'cofins_aliquota': Decimal('7.60'),
+                })
+                name = f'{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_VARIANTS)} {number + 1}'
+                sku = f'SKU{number + 1:08d}'
+                barcode = f'789{rng.randrange(10 ** 9, 10 ** 10)}'
+                cost_price = Decimal(rng.randrange(100, 100_000)) / 100
+                stock_quantity = rng.randint(0, 500)
+                products.append({
+                    'id': product_id,
+                    'company_id': company.pk,
+                    'name': name,
+                    'sku': sku,
+                    'barcode': barcode,
+                    'category_id': rng.choice(categories) if categories else None,
+                    'unit_id': rng.choice(units) if units else None,
+                    'supplier_id': rng.choice(suppliers) if suppliers else None,
+                    'cost_price': cost_price,
+                    'sale_price': (cost_price * Decimal(rng.uniform(1.1, 2.5))).quantize(Decimal('0.01')),
+                    'stock_quantity': stock_quantity,
+                    'fiscal_data_id': fiscal_id,
+                    'search_text': normalize_search_text(name, sku, barcode),
+                })
+                if with_ledger and stock_quantity:
+                    # Saldo inicial no razão, como na migração do razão de estoque
+                    movements.append({
+                        'company_id': company.pk,
+                        'product_id': product_id,
+                        'kind': StockMovement.Kind.ADJUST,
+                        'reason': StockMovement.Reason.INITIAL,
+                        'quantity': stock_quantity,
+                    })
+
+            with transaction.atomic():
+                insert_rows(ProductFiscalData, fiscal_data, batch_size=self.batch_size)
+                insert_rows(Product, products, batch_size=self.batch_size)
+                insert_rows(StockMovement, movements, batch_size=self.batch_size)
+            total += len(products)
+            if total % (self.batch_size * 20) == 0:
+                self.stdout.write(f'⏳ {company.legal_name}: {total}/{count} produtos...')
+        return total
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_delete_address'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RowCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Quantidade')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='row_counters', to='accounts.company')),
+            ],
+            options={
+                'verbose_name': 'Contador de Registros',
+                'verbose_name_plural': 'Contadores de Registros',
+                'constraints': [models.UniqueConstraint(fields=('company', 'model_label'), name='unique_row_counter_per_company_model')],
+            },
+        ),
+    ]
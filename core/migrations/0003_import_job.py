@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_delete_address'),
+        ('core', '0002_row_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('products', 'Produtos')], max_length=20, verbose_name='Tipo')),
+                ('file', models.FileField(upload_to='imports/%Y/%m/', verbose_name='Arquivo')),
+                ('status', models.CharField(choices=[('pending', 'Aguardando'), ('running', 'Processando'), ('done', 'Concluída'), ('failed', 'Falhou')], default='pending', max_length=10, verbose_name='Situação')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Criados')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Atualizados')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Linhas com Erro')),
+                ('error_report', models.FileField(blank=True, upload_to='imports/errors/%Y/%m/', verbose_name='Relatório de Erros')),
+                ('message', models.TextField(blank=True, verbose_name='Mensagem')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='accounts.company')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Importação',
+                'verbose_name_plural': 'Importações',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_import_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Municipality',
+            fields=[
+                ('ibge_code', models.CharField(max_length=7, primary_key=True, serialize=False, verbose_name='Código IBGE')),
+                ('name', models.CharField(max_length=120, verbose_name='Nome')),
+                ('normalized_name', models.CharField(editable=False, max_length=120, verbose_name='Nome normalizado')),
+                ('state', models.CharField(max_length=2, verbose_name='UF')),
+            ],
+            options={
+                'verbose_name': 'Município',
+                'verbose_name_plural': 'Municípios',
+                'ordering': ['state', 'name'],
+                'indexes': [models.Index(fields=['state', 'normalized_name'], name='core_munici_state_470328_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_municipality'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='content_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, unique=True, verbose_name='Hash do conteúdo'),
+        ),
+    ]
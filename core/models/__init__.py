@@ -1,9 +1,17 @@
 from core.models.company import CompanyBaseModel
 from core.models.partners import PartnerBaseModel
 from core.models.address import Address
+from core.models.search import SearchableBaseModel
+from core.models.counters import RowCounter
+from core.models.imports import ImportJob
+from core.models.municipality import Municipality
 
 __all__ = [
     'CompanyBaseModel',
     'PartnerBaseModel',
     'Address',
+    'SearchableBaseModel',
+    'RowCounter',
+    'ImportJob',
+    'Municipality',
 ]
\ No newline at end of file
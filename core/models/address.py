@@ -1,9 +1,59 @@
-from django.db import models
+import hashlib
+
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 
+from core.search import normalize_search_text
+
+
+class AddressManager(models.Manager):
+
+    def get_or_create_by_content(self, **fields):
+        """
+        Endereço com o mesmo conteúdo normalizado (pelo `content_hash`), ou
+        um novo. Seguro contra criação concorrente graças ao índice único.
+        """
+        address = self.model(**fields)
+        address.content_hash = address.compute_content_hash()
+        existing = self.filter(content_hash=address.content_hash).first()
+        if existing:
+            return existing
+        try:
+            with transaction.atomic():
+                address.save()
+        except IntegrityError:
+            return self.get(content_hash=address.content_hash)
+        return address
+
+    def assign(self, owner, **fields):
+        """
+        Aponta `owner.address` para o endereço com esse conteúdo. O endereço
+        anterior nunca é alterado (pode estar em uso por outros cadastros):
+        se ficar sem referências, é removido.
+        """
+        address = self.get_or_create_by_content(**fields)
+        previous = owner.address
+        if owner.address_id != address.pk:
+            owner.address = address
+            owner.save()
+            if previous and not previous.is_referenced():
+                previous.delete()
+        return address
+
 
 class Address(models.Model):
-    """Endereço físico para  """
+    """
+    Endereço físico, compartilhado entre os cadastros com o mesmo conteúdo
+    (identificados pelo `content_hash`), inclusive de empresas diferentes.
+    Por isso o conteúdo de um endereço salvo não muda: para editar o
+    endereço de um cadastro use `Address.objects.assign`, que aponta o
+    cadastro para outra linha (cópia na escrita).
+    """
+    CONTENT_FIELDS = (
+        'street', 'number', 'complement', 'district',
+        'city_name', 'city_ibge_code', 'state', 'postal_code',
+    )
+
     street = models.CharField(max_length=255, verbose_name='Logradouro')
     number = models.CharField(max_length=20, verbose_name='Número')
     complement = models.CharField(max_length=60, blank=True, verbose_name='Complemento')
@@ -12,9 +62,12 @@ class Address(models.Model):
     city_ibge_code = models.CharField(max_length=7, help_text='Código IBGE (7 dígitos)', verbose_name='Código IBGE')
     state = models.CharField(max_length=2, verbose_name='UF')
     postal_code = models.CharField(max_length=8, help_text='CEP (8 dígitos)', verbose_name='CEP')
+    content_hash = models.CharField(max_length=64, unique=True, null=True, editable=False, verbose_name='Hash do conteúdo')
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AddressManager()
+
     class Meta:
         verbose_name = 'Endereço'
         verbose_name_plural = 'Endereços'
@@ -24,4 +77,33 @@ class Address(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.street}, {self.number} - {self.city_name}/{self.state}"
\ No newline at end of file
+        return f"{self.street}, {self.number} - {self.city_name}/{self.state}"
+
+    def save(self, *args, **kwargs):
+        content_hash = self.compute_content_hash()
+        if not self._state.adding and self.content_hash and content_hash != self.content_hash:
+            raise ValueError(
+                'Endereços são compartilhados entre cadastros e não podem ser alterados; '
+                'use Address.objects.assign para trocar o endereço de um cadastro.'
+            )
+        self.content_hash = content_hash
+        super().save(*args, **kwargs)
+
+    def compute_content_hash(self):
+        """SHA-256 dos campos normalizados (sem acentos, caixa ou espaços extras)."""
+        values = [normalize_search_text(getattr(self, field) or '') for field in self.CONTENT_FIELDS]
+        return hashlib.sha256('\x1f'.join(values).encode()).hexdigest()
+
+    @classmethod
+    def reference_relations(cls):
+        """Relações (`Customer.address`, `Establishment.address`...) que apontam para o endereço."""
+        return [
+            relation for relation in cls._meta.related_objects
+            if relation.one_to_many and relation.field.concrete
+        ]
+
+    def is_referenced(self):
+        return any(
+            relation.related_model._base_manager.filter(**{relation.field.name: self}).exists()
+            for relation in self.reference_relations()
+        )
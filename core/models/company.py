@@ -6,9 +6,34 @@ class CompanyBaseModel(models.Model):
     company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='%(class)ss')
     is_active = models.BooleanField(default=True, verbose_name='Ativo', help_text='Indica se o registro está ativo ou inativo.')
 
+    # Campos (attname) cujo valor carregado do banco é guardado para que os
+    # hooks de save/delete calculem deltas (ex.: contadores por empresa).
+    tracked_fields = ('is_active',)
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _snapshot_tracked_fields(self):
+        self._loaded_values = {
+            field: self.__dict__[field]
+            for field in self.tracked_fields
+            if field in self.__dict__
+        }
+
+    def get_loaded_value(self, field, default=None):
+        """Valor do campo no momento em que o registro foi lido/salvo pela última vez."""
+        return getattr(self, '_loaded_values', {}).get(field, default)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
+
 __all__ =[
     'CompanyBaseModel',
 ]
\ No newline at end of file
@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class RowCounter(models.Model):
+    """
+    Quantidade de registros ativos de um modelo por empresa, mantida de
+    forma incremental pelos hooks de save/delete de `CompanyBaseModel`.
+    """
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='row_counters')
+    model_label = models.CharField(max_length=100, verbose_name='Modelo')
+    count = models.BigIntegerField(default=0, verbose_name='Quantidade')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Contador de Registros'
+        verbose_name_plural = 'Contadores de Registros'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company', 'model_label'],
+                name='unique_row_counter_per_company_model'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} @ {self.company_id}: {self.count}"
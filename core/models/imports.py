@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import models
+
+
+class ImportJob(models.Model):
+    """
+    Importação em massa de um arquivo (CSV/XLSX) para uma empresa, com o
+    andamento e o relatório das linhas rejeitadas.
+    """
+    KIND_CHOICES = [
+        ('products', 'Produtos'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Aguardando'),
+        ('running', 'Processando'),
+        ('done', 'Concluída'),
+        ('failed', 'Falhou'),
+    ]
+
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='import_jobs')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name='Tipo')
+    file = models.FileField(upload_to='imports/%Y/%m/', verbose_name='Arquivo')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='Situação')
+
+    total_rows = models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')
+    created_count = models.PositiveIntegerField(default=0, verbose_name='Criados')
+    updated_count = models.PositiveIntegerField(default=0, verbose_name='Atualizados')
+    error_count = models.PositiveIntegerField(default=0, verbose_name='Linhas com Erro')
+    error_report = models.FileField(upload_to='imports/errors/%Y/%m/', blank=True, verbose_name='Relatório de Erros')
+    message = models.TextField(blank=True, verbose_name='Mensagem')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Último sinal de vida do processamento (atualizado a cada lote)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Importação'
+        verbose_name_plural = 'Importações'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class Municipality(models.Model):
+    """Município da tabela do IBGE (referência para `Address.city_ibge_code`)."""
+    ibge_code = models.CharField(max_length=7, primary_key=True, verbose_name='Código IBGE')
+    name = models.CharField(max_length=120, verbose_name='Nome')
+    normalized_name = models.CharField(max_length=120, editable=False, verbose_name='Nome normalizado')
+    state = models.CharField(max_length=2, verbose_name='UF')
+
+    class Meta:
+        verbose_name = 'Município'
+        verbose_name_plural = 'Municípios'
+        ordering = ['state', 'name']
+        indexes = [
+            models.Index(fields=['state', 'normalized_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.name}/{self.state} ({self.ibge_code})"
@@ -1,9 +1,10 @@
 from django.db import models
 from core.models.company import CompanyBaseModel
 from core.models.address import Address
+from core.models.search import SearchableBaseModel
 
 
-class PartnerBaseModel(CompanyBaseModel):
+class PartnerBaseModel(SearchableBaseModel, CompanyBaseModel):
     """
     Base abstrata para parceiros de negócio (clientes e fornecedores).
     
@@ -30,6 +31,8 @@ class PartnerBaseModel(CompanyBaseModel):
         CUSTOMER = 'customer', 'Cliente'
         SUPPLIER = 'supplier', 'Fornecedor'
 
+    search_fields = ('name', 'trading_name', 'cpf_cnpj')
+
     name = models.CharField(max_length=255, verbose_name='Nome/Razão Social')
     trading_name = models.CharField(max_length=255, blank=True, null=True, verbose_name='Nome Fantasia')
     cpf_cnpj = models.CharField(max_length=14, verbose_name='CPF/CNPJ')
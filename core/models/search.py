@@ -0,0 +1,29 @@
+from django.db import models
+from core.search import normalize_search_text
+
+
+class SearchableBaseModel(models.Model):
+    """
+    Base abstrata que mantém a coluna `search_text` com os valores de
+    `search_fields` normalizados (minúsculas e sem acentos).
+    """
+    search_fields = ()
+
+    search_text = models.TextField(blank=True, default='', editable=False, verbose_name='Texto de Busca')
+
+    class Meta:
+        abstract = True
+
+    def build_search_text(self):
+        return normalize_search_text(*(getattr(self, field) for field in self.search_fields))
+
+    def refresh_search_text(self):
+        """Atualiza `search_text` sem salvar (útil antes de bulk_create/bulk_update)."""
+        self.search_text = self.build_search_text()
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.search_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,51 @@
+from django.db.migrations.operations.base import Operation
+
+
+class CreateTrigramSearchIndex(Operation):
+    """
+    Cria o índice GIN (pg_trgm) da coluna `search_text`, escopado por empresa
+    e restrito aos registros ativos.
+
+    Só é aplicado no PostgreSQL; nos demais bancos a operação é ignorada e a
+    busca continua funcionando sem índice.
+    """
+    reversible = True
+
+    def __init__(self, model_name, name):
+        self.model_name = model_name
+        self.name = name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        table = schema_editor.quote_name(model._meta.db_table)
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {schema_editor.quote_name(self.name)} '
+            f'ON {table} USING gin (company_id, search_text gin_trgm_ops) '
+            f'WHERE is_active'
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}')
+
+    def describe(self):
+        return f'Create trigram search index {self.name} on {self.model_name}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'{self.model_name.lower()}_search_index'
+
+    def deconstruct(self):
+        return (
+            self.__class__.__name__,
+            [],
+            {'model_name': self.model_name, 'name': self.name},
+        )
@@ -0,0 +1,204 @@
+import base64
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    """Cursor recebido na URL não pôde ser decodificado."""
+
+
+def encode_cursor(values):
+    payload = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+    if not isinstance(values, list):
+        raise InvalidCursor(token)
+    return values
+
+
+class KeysetPage:
+    """
+    Página de uma paginação por cursor. Expõe a mesma interface usada
+    pelos templates (`object_list`, `has_next`, `has_previous`...) e os
+    cursores `next_cursor`/`previous_cursor` no lugar do número da página.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @cached_property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.cursor_for(self.object_list[-1])
+        return None
+
+    @cached_property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.cursor_for(self.object_list[0])
+        return None
+
+
+class KeysetPaginator:
+    """
+    Paginação por chave (keyset) sobre a ordenação do queryset.
+
+    Em vez de OFFSET, cada página filtra a partir dos valores de ordenação
+    do último (ou primeiro) registro exibido, por exemplo `(name, id)`.
+    Assim a página 5.000 custa o mesmo que a primeira. Os campos de
+    ordenação devem ser atributos diretos do modelo (ou anotações) e não
+    nulos; a chave primária é adicionada como desempate.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            ordering.append('pk')
+        self.ordering = ordering
+
+    @cached_property
+    def count(self):
+        return self.queryset.count()
+
+    def cursor_for(self, obj):
+        return encode_cursor([getattr(obj, field.lstrip('-')) for field in self.ordering])
+
+    def _seek(self, values, forward):
+        """
+        Monta o filtro lexicográfico `(a, b, pk) > (va, vb, vpk)`
+        respeitando a direção de cada campo.
+        """
+        if len(values) != len(self.ordering):
+            raise InvalidCursor(values)
+
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _page_queryset(self, after, before):
+        """Linhas da página mais uma (para saber se há outra), na ordem de busca."""
+        queryset = self.queryset.order_by(*self.ordering)
+        limit = self.per_page + 1
+
+        if before:
+            reverse_ordering = [
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ]
+            return (
+                queryset.filter(self._seek(decode_cursor(before), forward=False))
+                .order_by(*reverse_ordering)[:limit]
+            )
+
+        if after:
+            queryset = queryset.filter(self._seek(decode_cursor(after), forward=True))
+        return queryset[:limit]
+
+    def _build_page(self, rows, after, before):
+        if before:
+            has_previous = len(rows) > self.per_page
+            object_list = rows[:self.per_page][::-1]
+            return KeysetPage(object_list, self, has_next=True, has_previous=has_previous)
+
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self, has_next=has_next, has_previous=bool(after))
+
+    def page(self, after=None, before=None):
+        return self._build_page(list(self._page_queryset(after, before)), after, before)
+
+    async def apage(self, after=None, before=None):
+        """Versão assíncrona de `page` (views ASGI)."""
+        rows = [obj async for obj in self._page_queryset(after, before)]
+        return self._build_page(rows, after, before)
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin para ListViews que troca a paginação por OFFSET pela paginação
+    por cursor (`?after=<cursor>` / `?before=<cursor>`).
+
+    Com `?fragment=rows` em uma requisição HTMX apenas as linhas da tabela
+    (`rows_template_name`) são renderizadas, permitindo o "carregar mais"
+    (rolagem infinita) quando `infinite_scroll` está ativo.
+    """
+    paginator_class = KeysetPaginator
+    rows_template_name = None
+    infinite_scroll = False
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(queryset, per_page)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidCursor:
+            page = paginator.page()
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = await paginator.apage(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidCursor:
+            page = await paginator.apage()
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def is_rows_fragment(self):
+        return bool(
+            self.rows_template_name
+            and self.request.headers.get('Hx-Request')
+            and self.request.GET.get('fragment') == 'rows'
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['load_more'] = self.infinite_scroll or self.is_rows_fragment()
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.is_rows_fragment():
+            self.template_name = self.rows_template_name
+        return super().render_to_response(context, **response_kwargs)
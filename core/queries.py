@@ -0,0 +1,136 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('core.queries')
+
+
+class QueryBudgetExceeded(Exception):
+    """A view executou mais consultas do que o orçamento declarado."""
+
+
+def query_budget(max_queries):
+    """
+    Declara o número máximo de consultas SQL de uma view de função.
+    Em class-based views use o atributo `query_budget`.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view_func, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+class QueryRecorder:
+    """execute_wrapper que acumula a quantidade e a duração das consultas."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryBudgetMiddleware:
+    """
+    Registra a quantidade e o tempo das consultas de cada view e compara com
+    o orçamento declarado (`query_budget`).
+
+    O resultado vai para o logger `core.queries` e para o cabeçalho
+    `Server-Timing`. Com `QUERY_BUDGET_STRICT = True` (ativo nos testes)
+    uma view acima do orçamento levanta `QueryBudgetExceeded`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def install(stack, recorder):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            self.install(stack, recorder)
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        # O ORM assíncrono roda as consultas na thread do sync_to_async da
+        # requisição (thread_sensitive), cujas conexões são outras: os
+        # wrappers são instalados e removidos nessa mesma thread
+        recorder = QueryRecorder()
+        stack = ExitStack()
+        await sync_to_async(self.install)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        view_name = getattr(request, '_query_budget_view', None)
+        if view_name is None:
+            return response
+
+        budget = request._query_budget
+        response['Server-Timing'] = f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"'
+        logger.debug(
+            '%s: %s consultas em %.1fms (orçamento %s)',
+            view_name, recorder.count, recorder.duration * 1000, budget,
+        )
+
+        if budget is not None and recorder.count > budget:
+            message = f'{view_name} executou {recorder.count} consultas (orçamento: {budget})'
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        target = view_class or view_func
+        request._query_budget_view = f'{target.__module__}.{target.__qualname__}'
+        request._query_budget = get_query_budget(view_func)
+
+
+class FetchProfileMixin:
+    """
+    Perfil de carga declarado das ListViews: `list_select_related` e
+    `list_only` garantem um número constante de consultas por página.
+    """
+    list_select_related = ()
+    list_only = ()
+
+    def apply_fetch_profile(self, queryset):
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        if self.list_only:
+            queryset = queryset.only(*self.list_only)
+        return queryset
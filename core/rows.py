@@ -0,0 +1,55 @@
+"""
+Respostas HTMX por linha para as ações das listagens (desativar/reativar).
+
+Em vez de renderizar a tabela inteira, a resposta troca só a linha alvo do
+formulário (`hx-target` na linha, `hx-swap="outerHTML"`) e atualiza o
+contador de registros fora de banda (`hx-swap-oob`). A página, a busca e o
+cursor exibidos continuam os mesmos.
+"""
+from copy import copy
+from urllib.parse import urlsplit
+
+from django.http import HttpResponse, QueryDict
+from django.template.loader import render_to_string
+
+
+class RowResponseMixin:
+    """
+    `list_view_class` é a listagem de onde veio a ação: seus filtros (lidos
+    do cabeçalho HX-Current-URL) decidem se a linha continua na tabela e
+    como o contador `count_element_id` é calculado. Sem `row_template_name`
+    a linha é sempre removida.
+    """
+    list_view_class = None
+    row_template_name = None
+    count_element_id = None
+    count_template_name = 'core/row_count.html'
+
+    def get_list_params(self):
+        """Parâmetros da listagem exibida (o htmx envia a URL atual em HX-Current-URL)."""
+        return QueryDict(urlsplit(self.request.headers.get('HX-Current-URL', '')).query)
+
+    def get_list_view(self):
+        request = copy(self.request)
+        request.GET = self.get_list_params()
+        view = self.list_view_class()
+        view.setup(request)
+        view.object_list = view.get_queryset()
+        return view
+
+    def render_row_response(self, obj):
+        """Linha atualizada de `obj`, ou nada (linha removida) se ele saiu da listagem."""
+        list_view = self.get_list_view()
+        content = ''
+        if self.row_template_name and list_view.object_list.filter(pk=obj.pk).exists():
+            content = render_to_string(self.row_template_name, {
+                'object': obj,
+                self.get_context_object_name(obj): obj,
+            }, request=self.request)
+        if self.count_element_id:
+            content += render_to_string(self.count_template_name, {
+                'row_count': list_view.get_row_count(),
+                'count_id': self.count_element_id,
+                'oob': True,
+            }, request=self.request)
+        return HttpResponse(content)
@@ -0,0 +1,92 @@
+import unicodedata
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import IntegerField
+from django.db.models.functions import Cast
+
+
+# Casas (em base 10) mantidas na similaridade usada como chave de ordenação
+SEARCH_RANK_SCALE = 1000
+
+# Acima desta estimativa de resultados a busca não é ordenada por similaridade
+SEARCH_RANK_CUTOFF = getattr(settings, 'SEARCH_RANK_CUTOFF', 20000)
+
+
+def normalize_search_text(*values):
+    """
+    Normaliza valores para a coluna de busca: minúsculas, sem acentos
+    e com espaços simples. O mesmo tratamento é aplicado aos termos
+    digitados, permitindo buscas como "acucar" encontrarem "Açúcar".
+    """
+    text = ' '.join(str(value) for value in values if value)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+def search_queryset(queryset, search, ranked=True):
+    """
+    Filtra o queryset pela coluna `search_text` exigindo todos os termos.
+
+    No PostgreSQL o filtro usa o índice GIN (pg_trgm) da coluna e, quando
+    `ranked`, os resultados são ordenados pela similaridade com a busca.
+    Nos demais bancos (SQLite nos testes) aplica apenas o filtro.
+
+    A similaridade (float4) vira um inteiro (`search_rank`, escala
+    `SEARCH_RANK_SCALE`): como chave do cursor da paginação ela precisa
+    ser comparada por igualdade, o que não funciona com ponto flutuante.
+
+    Ordenar por similaridade exige calculá-la em todas as linhas que
+    casam: em buscas amplas ("a", "arroz" em 1 milhão de produtos) isso
+    leva segundos. Quando a estimativa do planejador passa de
+    `SEARCH_RANK_CUTOFF`, a ordenação da listagem é mantida e o índice
+    (empresa, nome, id) entrega a primeira página sem ordenar.
+    """
+    normalized = normalize_search_text(search)
+    if not normalized:
+        return queryset
+
+    for term in normalized.split():
+        queryset = queryset.filter(search_text__contains=term)
+
+    if ranked and connections[queryset.db].vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        from core.counters import estimate_count
+
+        if estimate_count(queryset) > SEARCH_RANK_CUTOFF:
+            return queryset
+
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        queryset = queryset.annotate(
+            search_rank=Cast(
+                TrigramWordSimilarity(normalized, 'search_text') * SEARCH_RANK_SCALE,
+                IntegerField(),
+            )
+        ).order_by('-search_rank', *ordering, 'pk')
+
+    return queryset
+
+
+class SearchMixin:
+    """
+    Mixin para ListViews com busca textual sobre modelos que herdam de
+    `SearchableBaseModel`.
+    """
+    search_param = 'search'
+    search_ranked = True
+
+    def get_search(self):
+        return self.request.GET.get(self.search_param, '').strip()
+
+    def apply_search(self, queryset):
+        search = self.get_search()
+        if search:
+            queryset = search_queryset(queryset, search, ranked=self.search_ranked)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['current_search'] = self.get_search()
+        return context
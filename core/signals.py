@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_tenant_version
+from core.counters import adjust_count
+from core.models.company import CompanyBaseModel
+
+
+@receiver(post_save)
+def update_row_counter_on_save(sender, instance, created, raw=False, **kwargs):
+    """Mantém o contador de ativos ao criar, desativar ou reativar registros."""
+    if raw or not isinstance(instance, CompanyBaseModel):
+        return
+
+    if created:
+        delta = 1 if instance.is_active else 0
+    else:
+        loaded = instance.get_loaded_value('is_active')
+        if loaded is None:
+            return
+        delta = int(instance.is_active) - int(loaded)
+
+    adjust_count(instance.company_id, sender, delta)
+
+
+@receiver(post_delete)
+def update_row_counter_on_delete(sender, instance, **kwargs):
+    if not isinstance(instance, CompanyBaseModel):
+        return
+    if instance.get_loaded_value('is_active', instance.is_active):
+        adjust_count(instance.company_id, sender, -1)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_tenant_version_on_change(sender, instance, raw=False, **kwargs):
+    """Invalida os caches versionados do modelo na empresa (lookups, KPIs...)."""
+    if raw or not isinstance(instance, CompanyBaseModel):
+        return
+    bump_tenant_version(instance.company_id, sender._meta.label_lower)
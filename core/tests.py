@@ -1,3 +1,936 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Length
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Company, User
+from accounts.models.user import Membership
+from core import cep, ibge
+from core.bulk import insert_rows, reset_sequences
+from core.cache import bump_tenant_version
+from core.counters import count_queryset, get_active_count, recount, recount_all
+from core.exports import stream_csv
+from core.lookups import LookupChoiceField, TenantLookup
+from core.models.address import Address
+from core.models.counters import RowCounter
+from core.models.municipality import Municipality
+from core.pagination import KeysetPaginator
+from core.queries import QueryBudgetExceeded
+from core.search import normalize_search_text, search_queryset
+from accounts.services.provisioning import DEFAULT_UNITS
+from core.management.commands.seed_scale import make_cnpj, make_cpf
+from inventory.forms.product import ProductDataForm
+from inventory.models.category import Category
+from inventory.models.product import Product
+from inventory.models.stock import StockMovement
+from inventory.models.units import Unit
+from inventory.views.product import ProductListView
+from partners.forms.customers import CustomerAddressForm
+from partners.models.customers import Customer
+from partners.models.suppliers import Supplier
+
+
+def create_tenant(name='Empresa Teste', email='dono@teste.com', role=Membership.Role.OWNER):
+    """Empresa com um usuário vinculado a ela e já com a empresa ativa."""
+    company = Company.objects.create(legal_name=name)
+    user = User.objects.create_user(username=email, email=email)
+    user.company_active = company
+    user.save()
+    Membership.objects.create(user=user, company=company, role=role)
+    return company, user
+
+
+def page_through(paginator):
+    """Todas as linhas de todas as páginas, seguindo o cursor `next_cursor`."""
+    rows, after = [], None
+    while True:
+        page = paginator.page(after=after)
+        rows.extend(page.object_list)
+        if not page.has_next():
+            return rows
+        after = page.next_cursor
+
+
+class SetupMixin:
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+
+
+class SearchTests(SetupMixin, TestCase):
+
+    def test_normalize_search_text(self):
+        self.assertEqual(normalize_search_text('  Açúcar  CRISTAL ', None, 'Pão'), 'acucar cristal pao')
+        self.assertEqual(normalize_search_text('', None), '')
+
+    def test_search_folds_accents_and_requires_all_terms(self):
+        sugar = Product.objects.create(company=self.company, name='Açúcar Cristal', sale_price=5)
+        Product.objects.create(company=self.company, name='Açúcar Mascavo', sale_price=7)
+        Product.objects.create(company=self.company, name='Café', sale_price=9, sku='CRIST-1')
+
+        queryset = Product.objects.filter(company=self.company)
+        self.assertEqual(list(search_queryset(queryset, 'ACUCAR cristal')), [sugar])
+        self.assertEqual(search_queryset(queryset, 'açucar').count(), 2)
+        self.assertEqual(search_queryset(queryset, 'crist').count(), 2)
+        self.assertEqual(search_queryset(queryset, '   ').count(), 3)
+
+    def test_ranked_search_pages_without_gaps_or_duplicates(self):
+        # Nomes repetidos empatam no rank (e no nome): o desempate é o pk
+        for index in range(45):
+            Product.objects.create(company=self.company, name=f'Arroz {index % 4}', sale_price=1)
+        Product.objects.create(company=self.company, name='Feijão', sale_price=1)
+
+        queryset = search_queryset(Product.objects.filter(company=self.company), 'arroz')
+        rows = page_through(KeysetPaginator(queryset, 10))
+
+        self.assertEqual(len(rows), 45)
+        self.assertEqual(len({product.pk for product in rows}), 45)
+        self.assertEqual(rows, list(queryset))
+
+    def test_unit_list_uses_search_text(self):
+        Unit.objects.create(company=self.company, name='Milímetro', abbreviation='mm')
+        Unit.objects.create(company=self.company, name='Metro Cúbico', abbreviation='m3')
+        Unit.objects.create(company=self.company, name='Caixa', abbreviation='cx')
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('inventory:unit_list'), {'search': 'MILIMETRO'})
+        self.assertEqual([unit.name for unit in response.context['object_list']], ['Milímetro'])
+        self.assertEqual(response.context['current_search'], 'MILIMETRO')
+        response = self.client.get(reverse('inventory:unit_list'), {'search': 'metro cubico'})
+        self.assertEqual([unit.name for unit in response.context['object_list']], ['Metro Cúbico'])
+        response = self.client.get(reverse('inventory:unit_list'), {'search': 'cx'})
+        self.assertEqual([unit.name for unit in response.context['object_list']], ['Caixa'])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'ordenação por similaridade só no PostgreSQL')
+    def test_broad_search_keeps_list_ordering(self):
+        for name in ('Arroz Branco', 'Arroz', 'Feijão com Arroz'):
+            Product.objects.create(company=self.company, name=name, sale_price=1)
+        queryset = Product.objects.filter(company=self.company)
+
+        ranked = search_queryset(queryset, 'arroz')
+        self.assertIn('search_rank', ranked.query.annotations)
+        self.assertEqual(ranked[0].name, 'Arroz')
+        with mock.patch('core.search.SEARCH_RANK_CUTOFF', 0):
+            broad = search_queryset(queryset, 'arroz')
+        self.assertNotIn('search_rank', broad.query.annotations)
+        self.assertEqual([product.name for product in broad], ['Arroz', 'Arroz Branco', 'Feijão com Arroz'])
+
+    def test_keyset_with_annotated_integer_rank(self):
+        # Mesmo caminho da busca ordenada no PostgreSQL: anotação inteira
+        # com empates na frente da ordenação
+        for index in range(30):
+            Product.objects.create(company=self.company, name='x' * (index % 3 + 1), sale_price=1)
+
+        queryset = Product.objects.filter(company=self.company).annotate(
+            search_rank=Cast(Length('name'), IntegerField()),
+        ).order_by('-search_rank', 'name', 'pk')
+        rows = page_through(KeysetPaginator(queryset, 7))
+
+        self.assertEqual([product.pk for product in rows], list(queryset.values_list('pk', flat=True)))
+
+
+def prime_counters(company):
+    """
+    Cria os contadores das listagens. O primeiro acesso de cada empresa os
+    cria com uma contagem exata, fora do orçamento das leituras seguintes.
+    """
+    for model in (Category, Unit, Supplier, Customer, Product):
+        recount_all(model, [company.pk])
+
+
+def seed_lists(company, size=25):
+    """Registros suficientes para mais de uma página em cada listagem."""
+    for index in range(size):
+        category = Category.objects.create(company=company, name=f'Categoria {index}', slug=f'categoria-{index}')
+        unit = Unit.objects.create(company=company, name=f'Unidade {index}', abbreviation=f'U{index}')
+        supplier = Supplier.objects.create(company=company, name=f'Fornecedor {index}', cpf_cnpj=f'{index:014d}')
+        Customer.objects.create(company=company, name=f'Cliente {index}', cpf_cnpj=f'{index:011d}')
+        Product.objects.create(
+            company=company, name=f'Produto {index}', sale_price=10, cost_price=5,
+            category=category, unit=unit, supplier=supplier,
+        )
+    for index in range(size):
+        _, user = create_tenant(name=f'Outra {index}', email=f'membro{index}@teste.com')
+        user.company_active = company
+        user.save()
+        Membership.objects.create(user=user, company=company, role=Membership.Role.MEMBER)
+    prime_counters(company)
+
+
+def query_count(response):
+    return int(re.search(r'"(\d+) queries"', response['Server-Timing']).group(1))
+
+
+class QueryBudgetTests(SetupMixin, TestCase):
+    list_urls = (
+        'inventory:product_list',
+        'inventory:category_list',
+        'inventory:unit_list',
+        'partners:customer_list',
+        'partners:supplier_list',
+        'configuration:user_list',
+    )
+
+    def setUp(self):
+        super().setUp()
+        seed_lists(self.company)
+        self.client.force_login(self.user)
+
+    def test_strict_mode_is_enabled_in_tests(self):
+        self.assertTrue(settings.QUERY_BUDGET_STRICT)
+
+    def test_view_over_budget_raises(self):
+        with mock.patch.object(ProductListView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('inventory:product_list'))
+
+    def test_list_views_stay_within_budget(self):
+        for name in self.list_urls:
+            url = reverse(name)
+            with self.subTest(url=url):
+                # Caches frios, página HTMX e busca: o modo estrito já
+                # levantaria o erro, a contagem fica como diagnóstico
+                for params, headers in (
+                    ({}, {}),
+                    ({}, {'HTTP_HX_REQUEST': 'true'}),
+                    ({'search': '1'}, {'HTTP_HX_REQUEST': 'true'}),
+                ):
+                    cache.clear()
+                    response = self.client.get(url, params, **headers)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn('Server-Timing', response)
+
+                budget = response.resolver_match.func.view_class.query_budget
+                self.assertLessEqual(query_count(response), budget)
+
+
+ADDRESS = {
+    'street': 'Rua das Flores', 'number': '10', 'complement': '', 'district': 'Centro',
+    'city_name': 'São Paulo', 'city_ibge_code': '3550308', 'state': 'SP', 'postal_code': '01001000',
+}
+
+
+class SharedAddressTests(SetupMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        self.shared = Address.objects.get_or_create_by_content(**ADDRESS)
+        self.customer = Customer.objects.create(company=self.company, name='Cliente', cpf_cnpj='1', address=self.shared)
+        self.other = Customer.objects.create(company=self.other_company, name='Outro', cpf_cnpj='2', address=self.shared)
+
+    def test_same_normalized_content_reuses_row(self):
+        variant = {**ADDRESS, 'street': 'RUA  DAS  FLORES', 'city_name': 'Sao Paulo'}
+        self.assertEqual(Address.objects.get_or_create_by_content(**variant), self.shared)
+        self.assertEqual(Address.objects.count(), 1)
+
+    def test_in_place_edit_of_saved_address_is_refused(self):
+        self.shared.street = 'Rua Nova'
+        with self.assertRaises(ValueError):
+            self.shared.save()
+        self.assertEqual(Address.objects.get(pk=self.shared.pk).street, 'Rua das Flores')
+
+        # Salvar sem mudar o conteúdo continua permitido
+        address = Address.objects.get(pk=self.shared.pk)
+        address.save()
+
+    def test_assign_copies_on_write(self):
+        edited = Address.objects.assign(self.customer, **{**ADDRESS, 'number': '20'})
+
+        self.assertNotEqual(edited.pk, self.shared.pk)
+        self.customer.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.customer.address, edited)
+        self.assertEqual(self.other.address, self.shared)
+        self.assertEqual(Address.objects.get(pk=self.shared.pk).number, '10')
+
+    def test_assign_to_existing_content_reuses_it_and_drops_orphan(self):
+        edited = Address.objects.assign(self.customer, **{**ADDRESS, 'number': '20'})
+        # O outro cliente passa para o mesmo conteúdo: reaproveita a linha
+        # e o endereço original, sem referências, é removido
+        reused = Address.objects.assign(self.other, **{**ADDRESS, 'number': '20'})
+
+        self.assertEqual(reused, edited)
+        self.assertFalse(Address.objects.filter(pk=self.shared.pk).exists())
+        self.assertEqual(Address.objects.count(), 1)
+
+    def test_address_form_does_not_change_shared_row(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('partners:customer_address', kwargs={'pk': self.customer.pk}),
+            {**ADDRESS, 'street': 'Avenida Brasil'},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.customer.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.customer.address.street, 'Avenida Brasil')
+        self.assertEqual(self.other.address.street, 'Rua das Flores')
+
+
+class CEPDatabaseTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cep.bin')
+        settings_override = override_settings(CEP_DATABASE_PATH=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(self.reset_database)
+
+    def reset_database(self):
+        if cep._database is not None:
+            cep._database[1].close()
+        cep._database = None
+        cep._cached_lookup.cache_clear()
+
+    def write(self, street, mtime):
+        cep.CEPDatabase.write(self.path, [
+            cep.CEPAddress('01001000', street, 'Sé', 'São Paulo', 'SP', '3550308'),
+            cep.CEPAddress('20040020', 'Avenida Rio Branco', 'Centro', 'Rio de Janeiro', 'RJ', '3304557'),
+        ])
+        os.utime(self.path, ns=(mtime, mtime))
+
+    def test_lookup(self):
+        self.assertIsNone(cep.lookup_cep('01001-000'))
+        self.write('Praça da Sé', 1_000_000_000)
+
+        address = cep.lookup_cep('01001-000')
+        self.assertEqual(address.street, 'Praça da Sé')
+        self.assertEqual(address.city_ibge_code, '3550308')
+        self.assertEqual(cep.lookup_cep('20040020').state, 'RJ')
+        self.assertIsNone(cep.lookup_cep('99999999'))
+        self.assertIsNone(cep.lookup_cep('123'))
+
+    def test_reload_closes_previous_map(self):
+        self.write('Praça da Sé', 1_000_000_000)
+        self.assertEqual(cep.lookup_cep('01001000').street, 'Praça da Sé')
+        previous = cep.get_database()
+
+        self.write('Praça da Sé - lado ímpar', 2_000_000_000)
+
+        self.assertEqual(cep.lookup_cep('01001000').street, 'Praça da Sé - lado ímpar')
+        self.assertIsNot(cep.get_database(), previous)
+        self.assertTrue(previous.data.closed)
+        self.assertEqual(cep._cached_lookup.cache_info().currsize, 1)
+
+
+MUNICIPALITIES = [
+    ('3550308', 'São Paulo', 'SP'),
+    ('3515103', 'Embu-Guaçu', 'SP'),
+    ('3545803', "Santa Bárbara d'Oeste", 'SP'),
+    ('1716307', "Pau D'Arco", 'TO'),
+    ('3304557', 'Rio de Janeiro', 'RJ'),
+]
+
+
+class MunicipalityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ibge._index = None
+        self.addCleanup(setattr, ibge, '_index', None)
+        settings_override = override_settings(CEP_DATABASE_PATH=os.path.join(tempfile.gettempdir(), 'sem-cep.bin'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def load(self):
+        Municipality.objects.bulk_create([
+            Municipality(ibge_code=code, name=name, normalized_name=ibge.normalize_city_name(name), state=state)
+            for code, name, state in MUNICIPALITIES
+        ])
+        ibge.bump_version()
+
+    def address_form(self, **data):
+        data = {
+            'postal_code': '01001-000', 'street': 'Praça da Sé', 'district': 'Sé',
+            'city_name': 'São Paulo', 'state': 'SP', 'city_ibge_code': '', **data,
+        }
+        return CustomerAddressForm(data)
+
+    def test_resolve_ignores_accents_and_punctuation(self):
+        index = ibge.MunicipalityIndex(MUNICIPALITIES)
+        self.assertEqual(index.resolve('EMBU GUACU', 'sp'), '3515103')
+        self.assertEqual(index.resolve('embu-guaçu', 'SP'), '3515103')
+        self.assertEqual(index.resolve('Santa Barbara d’Oeste', 'SP'), '3545803')
+        self.assertEqual(index.resolve('pau d arco', 'TO'), '1716307')
+        self.assertIsNone(index.resolve('Pau D\'Arco', 'PA'))
+        self.assertIsNone(index.resolve('São Paulo', None))
+
+    def test_empty_table_checks_only_state_prefix(self):
+        index = ibge.MunicipalityIndex([])
+        index.validate('3599999', 'sp')
+        with self.assertRaisesMessage(ValidationError, 'não pertence à UF RJ'):
+            index.validate('3550308', 'RJ')
+
+    def test_loaded_table_rejects_unknown_code_and_other_state(self):
+        index = ibge.MunicipalityIndex(MUNICIPALITIES)
+        index.validate('3550308', 'SP')
+        with self.assertRaisesMessage(ValidationError, 'não encontrado'):
+            index.validate('3599999', 'SP')
+        with self.assertRaisesMessage(ValidationError, 'não pertence à UF SP'):
+            index.validate('3304557', 'SP')
+
+    def test_form_fills_blank_code_from_index(self):
+        self.load()
+        form = self.address_form(city_name='Embu Guaçu')
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['city_ibge_code'], '3515103')
+
+        # O índice fica no processo: outro formulário não consulta a tabela
+        with self.assertNumQueries(0):
+            form = self.address_form(city_name="santa barbara d'oeste")
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['city_ibge_code'], '3545803')
+
+        form = self.address_form(city_name='Cidade Inexistente')
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['city_ibge_code'], '')
+
+    def test_form_rejects_code_from_other_state(self):
+        self.load()
+        form = self.address_form(city_ibge_code='3304557')
+        self.assertFalse(form.is_valid())
+        self.assertIn('não pertence à UF SP', form.errors['city_ibge_code'][0])
+
+    def test_form_without_table_checks_state_prefix(self):
+        self.assertTrue(self.address_form(city_ibge_code='3550308').is_valid())
+        form = self.address_form(city_ibge_code='3304557')
+        self.assertFalse(form.is_valid())
+        self.assertIn('city_ibge_code', form.errors)
+
+
+class RowCounterTests(SetupMixin, TestCase):
+
+    def counter(self, model=Customer):
+        return RowCounter.objects.get(company=self.company, model_label=model._meta.label_lower).count
+
+    def create_customer(self, index, **kwargs):
+        return Customer.objects.create(company=self.company, name=f'Cliente {index}', cpf_cnpj=str(index), **kwargs)
+
+    def test_first_read_creates_exact_counter(self):
+        for index in range(3):
+            self.create_customer(index)
+        self.create_customer(3, is_active=False)
+
+        self.assertFalse(RowCounter.objects.exists())
+        self.assertEqual(get_active_count(self.company.pk, Customer), 3)
+        self.assertEqual(self.counter(), 3)
+
+    def test_save_and_delete_adjust_counter(self):
+        get_active_count(self.company.pk, Customer)
+        customer = self.create_customer(1)
+        self.create_customer(2, is_active=False)
+        self.assertEqual(self.counter(), 1)
+
+        customer.name = 'Renomeado'
+        customer.save()
+        self.assertEqual(self.counter(), 1)
+
+        customer.is_active = False
+        customer.save()
+        self.assertEqual(self.counter(), 0)
+
+        customer.is_active = True
+        customer.save()
+        self.assertEqual(self.counter(), 1)
+
+        customer.delete()
+        Customer.objects.get(cpf_cnpj='2').delete()
+        self.assertEqual(self.counter(), 0)
+
+    def test_bulk_actions_adjust_counter_once(self):
+        customers = [self.create_customer(index) for index in range(5)]
+        get_active_count(self.company.pk, Customer)
+        self.client.force_login(self.user)
+        url = reverse('partners:customer_bulk')
+        ids = ','.join(str(customer.pk) for customer in customers[:3])
+
+        self.client.post(url, {'action': 'deactivate', 'ids': ids})
+        self.assertEqual(self.counter(), 2)
+        # Já inativos não contam de novo
+        self.client.post(url, {'action': 'deactivate', 'ids': ids})
+        self.assertEqual(self.counter(), 2)
+        self.client.post(url, {'action': 'reactivate', 'ids': ids})
+        self.assertEqual(self.counter(), 5)
+        self.assertEqual(recount(self.company.pk, Customer), 5)
+
+    @unittest.skipIf(connection.vendor == 'postgresql', 'No PostgreSQL vale a estimativa do planejador')
+    def test_filtered_count_is_capped(self):
+        for index in range(6):
+            self.create_customer(index)
+        queryset = Customer.objects.filter(company=self.company)
+
+        exact = count_queryset(queryset, cutoff=10)
+        self.assertEqual((exact.value, exact.approximate), (6, False))
+        capped = count_queryset(queryset, cutoff=4)
+        self.assertEqual((capped.value, capped.approximate), (4, True))
+        self.assertEqual(str(capped), '~4')
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Estimativa via EXPLAIN só no PostgreSQL')
+    def test_filtered_count_uses_planner_estimate(self):
+        for index in range(6):
+            self.create_customer(index)
+        queryset = Customer.objects.filter(company=self.company)
+
+        exact = count_queryset(queryset, cutoff=10000)
+        self.assertEqual((exact.value, exact.approximate), (6, False))
+        with mock.patch('core.counters.estimate_count', return_value=50000):
+            estimated = count_queryset(queryset, cutoff=10000)
+        self.assertEqual((estimated.value, estimated.approximate), (50000, True))
+
+    def test_list_badge_uses_counter(self):
+        for index in range(3):
+            self.create_customer(index)
+        get_active_count(self.company.pk, Customer)
+        RowCounter.objects.filter(company=self.company).update(count=42)
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('partners:customer_list'), HTTP_HX_REQUEST='true')
+        self.assertContains(response, '42 registro(s)')
+        response = self.client.get(reverse('partners:customer_list'), {'search': 'cliente'}, HTTP_HX_REQUEST='true')
+        self.assertContains(response, '3 registro(s)')
+
+
+class TenantLookupTests(SetupMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.lookup = TenantLookup(Category)
+        self.food = Category.objects.create(company=self.company, name='Alimentos', slug='alimentos')
+        Category.objects.create(company=self.company, name='Antigos', slug='antigos', is_active=False)
+        self.other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        self.other = Category.objects.create(company=self.other_company, name='Outra', slug='outra')
+
+    def test_rows_are_cached_per_tenant(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.lookup.choices(self.company.pk), [(self.food.pk, 'Alimentos')])
+        with self.assertNumQueries(0):
+            self.lookup.choices(self.company.pk)
+
+    def test_version_bump_invalidates_cache(self):
+        self.lookup.choices(self.company.pk)
+
+        # Gravações de outra empresa não invalidam
+        self.other.name = 'Outra Renomeada'
+        self.other.save()
+        with self.assertNumQueries(0):
+            self.lookup.choices(self.company.pk)
+
+        self.food.name = 'Alimentação'
+        self.food.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.lookup.choices(self.company.pk), [(self.food.pk, 'Alimentação')])
+
+        Category.objects.filter(pk=self.food.pk).update(is_active=False)
+        bump_tenant_version(self.company.pk, 'inventory.category')
+        self.assertEqual(self.lookup.choices(self.company.pk), [])
+
+    def test_choice_field_cleans_to_cached_instance(self):
+        field = LookupChoiceField(self.lookup, company_id=self.company.pk)
+        self.lookup.rows(self.company.pk)
+
+        with self.assertNumQueries(0):
+            category = field.clean(str(self.food.pk))
+        self.assertEqual((category.pk, category.name), (self.food.pk, 'Alimentos'))
+        self.assertFalse(category._state.adding)
+        with self.assertRaises(forms.ValidationError):
+            field.clean(str(self.other.pk))
+
+    def test_product_form_supplier_uses_cache(self):
+        supplier = Supplier.objects.create(company=self.company, name='Fornecedor Um', cpf_cnpj='11222333000181')
+        other_supplier = Supplier.objects.create(company=self.other_company, name='Fornecedor Outro', cpf_cnpj='11444777000161')
+        product = Product.objects.create(company=self.company, name='Arroz', sale_price=1, supplier=supplier)
+        data = {
+            'name': 'Arroz', 'supplier': supplier.pk, 'sale_price': '1', 'cost_price': '0',
+            'stock_quantity': '0', 'stock_seen': '0',
+        }
+        ProductDataForm(instance=product, company=self.company)['supplier'].as_widget()
+
+        with self.assertNumQueries(0):
+            html = ProductDataForm(instance=product, company=self.company)['supplier'].as_widget()
+            form = ProductDataForm(data, instance=product, company=self.company)
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertIn(f'<option value="{supplier.pk}" selected>Fornecedor Um</option>', html)
+        self.assertEqual(form.cleaned_data['supplier'].pk, supplier.pk)
+
+        data['supplier'] = other_supplier.pk
+        self.assertIn('supplier', ProductDataForm(data, instance=product, company=self.company).errors)
+
+
+class ConditionalListTests(SetupMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(company=self.company, name='Alimentos', slug='alimentos')
+        self.product = Product.objects.create(company=self.company, name='Arroz', sale_price=1, category=self.category)
+        prime_counters(self.company)
+        self.url = reverse('inventory:product_list')
+        self.client.force_login(self.user)
+
+    def refresh(self, etag=None, **params):
+        headers = {'HTTP_HX_REQUEST': 'true'}
+        if etag:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        return self.client.get(self.url, params, **headers)
+
+    def test_revalidation_returns_304_without_table_queries(self):
+        response = self.refresh()
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('HX-Request', response['Vary'])
+
+        response = self.refresh(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        # Só sessão e usuário
+        self.assertEqual(query_count(response), 2)
+
+        self.assertNotEqual(self.refresh(search='arroz')['ETag'], etag)
+        self.assertNotIn('ETag', self.client.get(self.url))
+
+    def test_writes_to_displayed_models_change_etag(self):
+        etag = self.refresh()['ETag']
+        for change in (
+            lambda: Product.objects.create(company=self.company, name='Feijão', sale_price=1),
+            lambda: Category.objects.filter(pk=self.category.pk).first().save(),
+            lambda: bump_tenant_version(self.company.pk, 'inventory.stockmovement'),
+        ):
+            change()
+            response = self.refresh(etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+        # Outras empresas não invalidam
+        other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        Product.objects.create(company=other_company, name='Outro', sale_price=1)
+        self.assertEqual(self.refresh(etag).status_code, 304)
+
+    def test_fragment_is_cached_per_company(self):
+        self.assertContains(self.refresh(), 'Arroz')
+        # UPDATE sem sinal não muda a versão: o fragmento vem do cache
+        Product.objects.filter(pk=self.product.pk).update(name='Arroz Integral')
+        response = self.refresh()
+        self.assertNotContains(response, 'Arroz Integral')
+        self.assertEqual(query_count(response), 2)
+
+        other_company, other_user = create_tenant(name='Outra', email='outra@teste.com')
+        prime_counters(other_company)
+        self.client.force_login(other_user)
+        self.assertNotContains(self.refresh(), 'Arroz')
+
+
+class RowResponseTests(SetupMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.products = [
+            Product.objects.create(company=self.company, name=name, sale_price=1)
+            for name in ('Arroz Branco', 'Arroz Integral', 'Feijão')
+        ]
+        prime_counters(self.company)
+        self.client.force_login(self.user)
+
+    def post_row(self, url, current_url):
+        return self.client.post(url, HTTP_HX_REQUEST='true', HTTP_HX_CURRENT_URL=f'http://testserver{current_url}')
+
+    def test_delete_removes_row_and_updates_count_of_current_search(self):
+        list_url = reverse('inventory:product_list')
+        response = self.post_row(
+            reverse('inventory:product_delete', kwargs={'pk': self.products[0].pk}),
+            f'{list_url}?search=arroz',
+        )
+        content = response.content.decode()
+        self.assertNotIn('product-row-', content)
+        self.assertIn('id="products-count" hx-swap-oob="true"', content)
+        self.assertIn('1 registro(s)', content)
+
+        response = self.post_row(reverse('inventory:product_delete', kwargs={'pk': self.products[1].pk}), list_url)
+        self.assertContains(response, '1 registro(s)')
+
+    def test_delete_without_htmx_redirects(self):
+        response = self.client.post(reverse('inventory:product_delete', kwargs={'pk': self.products[2].pk}))
+        self.assertRedirects(response, reverse('inventory:product_list'), fetch_redirect_response=False)
+
+    def test_delete_of_other_company_is_not_found(self):
+        other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        product = Product.objects.create(company=other_company, name='Outro', sale_price=1)
+        response = self.post_row(reverse('inventory:product_delete', kwargs={'pk': product.pk}), '/')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Product.objects.get(pk=product.pk).is_active)
+
+    def test_user_row_follows_status_filter(self):
+        _, member = create_tenant(name='Outra', email='membro@teste.com')
+        membership = Membership.objects.create(user=member, company=self.company, role=Membership.Role.MEMBER)
+        list_url = reverse('configuration:user_list')
+        delete_url = reverse('configuration:user_delete', kwargs={'pk': membership.pk})
+        reactivate_url = reverse('configuration:user_reactivate', kwargs={'pk': membership.pk})
+
+        response = self.post_row(delete_url, list_url)
+        self.assertContains(response, f'id="user-row-{membership.pk}"')
+        self.assertContains(response, 'Inativo')
+        self.assertEqual(self.post_row(delete_url, f'{list_url}?status=active').content.strip(), b'')
+
+        self.assertEqual(self.post_row(reactivate_url, f'{list_url}?status=inactive').content.strip(), b'')
+        response = self.post_row(reactivate_url, f'{list_url}?status=all')
+        self.assertContains(response, f'id="user-row-{membership.pk}"')
+        self.assertNotContains(response, 'Inativo')
+
+
+class BulkAllMatchingTests(SetupMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.grains = Category.objects.create(company=self.company, name='Grãos', slug='graos')
+        # Mais de uma página (20) de resultados da busca
+        self.rice = [
+            Product.objects.create(
+                company=self.company, name=f'Arroz {index:02d}', sale_price=1,
+                category=self.grains if index < 3 else None,
+            )
+            for index in range(25)
+        ]
+        self.beans = [Product.objects.create(company=self.company, name=f'Feijão {index}', sale_price=1) for index in range(2)]
+        self.other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        self.other_rice = Product.objects.create(company=self.other_company, name='Arroz', sale_price=1)
+        prime_counters(self.company)
+        self.url = reverse('inventory:product_bulk')
+        self.client.force_login(self.user)
+
+    def post_bulk(self, data, search='arroz'):
+        current_url = f"http://testserver{reverse('inventory:product_list')}?search={search}"
+        return self.client.post(self.url, data, HTTP_HX_REQUEST='true', HTTP_HX_CURRENT_URL=current_url)
+
+    def active_counter(self):
+        return RowCounter.objects.get(company=self.company, model_label='inventory.product').count
+
+    def test_deactivate_all_matching_search(self):
+        response = self.post_bulk({'action': 'deactivate', 'all_matching': 'on'})
+        self.assertContains(response, '25 registro(s) desativado(s).')
+        # Sem a lista de ids não há como desfazer
+        self.assertNotContains(response, 'Desfazer')
+
+        self.assertFalse(Product.objects.filter(pk__in=[product.pk for product in self.rice], is_active=True).exists())
+        self.assertEqual(Product.objects.filter(company=self.company, is_active=True).count(), 2)
+        self.assertTrue(Product.objects.get(pk=self.other_rice.pk).is_active)
+        self.assertEqual(self.active_counter(), 2)
+        self.assertEqual(recount(self.company.pk, Product), 2)
+
+        # Repetir não encontra mais nada
+        self.assertContains(self.post_bulk({'action': 'deactivate', 'all_matching': 'on'}), '0 registro(s) desativado(s).')
+        self.assertEqual(self.active_counter(), 2)
+
+    def test_set_category_counts_only_changed_rows(self):
+        response = self.post_bulk({'action': 'set_category', 'category': self.grains.pk, 'all_matching': 'on'})
+        self.assertContains(response, '22 produto(s) movido(s) para a categoria Grãos.')
+        self.assertEqual(Product.objects.filter(category=self.grains).count(), 25)
+        self.assertFalse(Product.objects.filter(pk__in=[product.pk for product in self.beans], category=self.grains).exists())
+        self.assertIsNone(Product.objects.get(pk=self.other_rice.pk).category_id)
+
+    def test_selected_ids_of_other_company_are_ignored(self):
+        ids = f'{self.rice[0].pk},{self.other_rice.pk}'
+        response = self.post_bulk({'action': 'deactivate', 'ids': ids})
+        self.assertContains(response, '1 registro(s) desativado(s).')
+        self.assertContains(response, 'Desfazer')
+        self.assertTrue(Product.objects.get(pk=self.other_rice.pk).is_active)
+        self.assertEqual(self.active_counter(), 26)
+
+    def test_empty_selection_keeps_table(self):
+        response = self.post_bulk({'action': 'deactivate'})
+        self.assertEqual(response['HX-Reswap'], 'none')
+        self.assertContains(response, 'Selecione ao menos um registro.')
+        self.assertEqual(self.active_counter(), 27)
+
+
+def read_csv(content):
+    return list(csv.reader(io.StringIO(content.decode('utf-8-sig')), delimiter=';'))
+
+
+class CSVExportTests(SetupMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        Product.objects.create(company=self.company, name='Arroz', sku='A1', sale_price=Decimal('-1.50'))
+        Product.objects.create(company=self.company, name='=HYPERLINK("http://x")', sku='@SUM(A1)', sale_price=2)
+        Product.objects.create(company=self.company, name='Feijão', sku='+55', description='-10', sale_price=3)
+        other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        Product.objects.create(company=other_company, name='Arroz da Outra', sale_price=1)
+        self.client.force_login(self.user)
+
+    def test_stream_flushes_in_blocks(self):
+        rows = ([index, f'Item {index}'] for index in range(5))
+        chunks = list(stream_csv(['Código', 'Nome'], rows, flush_every=2))
+        # Cabeçalho, dois blocos de 2 linhas e o resto
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(chunks[0].startswith('\ufeff'.encode()))
+        self.assertEqual(read_csv(b''.join(chunks))[-1], ['4', 'Item 4'])
+
+    def test_values_are_formatted_and_formulas_escaped(self):
+        rows = [[Decimal('-1.50'), date(2026, 1, 31), True, None, '=1+1', '+55 11', '-x', '@a', 'a=b']]
+        self.assertEqual(
+            read_csv(b''.join(stream_csv(['a'] * 9, rows)))[1],
+            ['-1,50', '31/01/2026', 'Sim', '', "'=1+1", "'+55 11", "'-x", "'@a", 'a=b'],
+        )
+
+    def test_product_export(self):
+        response = self.client.get(reverse('inventory:product_export'))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="produtos_', response['Content-Disposition'])
+        rows = read_csv(b''.join(response.streaming_content))
+
+        self.assertEqual(rows[0][:3], ['Nome', 'SKU', 'Código de Barras'])
+        by_name = {row[0]: row for row in rows[1:]}
+        self.assertEqual(set(by_name), {'Arroz', "'=HYPERLINK(\"http://x\")", 'Feijão'})
+        self.assertEqual(by_name['Arroz'][9], '-1,50')
+        self.assertEqual(by_name["'=HYPERLINK(\"http://x\")"][1], "'@SUM(A1)")
+        self.assertEqual(by_name['Feijão'][1:4], ["'+55", '', "'-10"])
+
+    def test_export_follows_search(self):
+        response = self.client.get(reverse('inventory:product_export'), {'search': 'arroz'})
+        rows = read_csv(b''.join(response.streaming_content))
+        self.assertEqual([row[0] for row in rows[1:]], ['Arroz'])
+
+
+class InsertRowsTests(SetupMixin, TestCase):
+
+    def test_keeps_null_apart_from_empty_text(self):
+        last = Product.objects.aggregate(last=Max('pk'))['last'] or 0
+        rows = [
+            {'id': last + 1, 'company_id': self.company.pk, 'name': 'Arroz "Tipo 1", 5kg\nNovo', 'sku': None, 'sale_price': Decimal('10.50')},
+            {'id': last + 2, 'company_id': self.company.pk, 'name': 'Feijão', 'sku': '', 'sale_price': 7, 'unit_id': None},
+        ]
+        self.assertEqual(insert_rows(Product, rows), 2)
+        reset_sequences(Product)
+
+        self.assertEqual(
+            list(Product.objects.filter(company=self.company).order_by('pk').values_list('name', 'sku', 'sale_price', 'is_active')),
+            [('Arroz "Tipo 1", 5kg\nNovo', None, Decimal('10.50'), True), ('Feijão', '', Decimal('7.00'), True)],
+        )
+        self.assertEqual(Product.objects.create(company=self.company, name='Café', sale_price=1).pk, last + 3)
+
+
+def check_digits_ok(document):
+    """Confere os dígitos verificadores de um CPF (11) ou CNPJ (14)."""
+    if len(document) == 11:
+        weights = [list(range(10, 1, -1)), list(range(11, 1, -1))]
+    else:
+        weights = [[5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]]
+    for position, weight in zip((-2, -1), weights):
+        remainder = sum(int(digit) * factor for digit, factor in zip(document, weight)) % 11
+        if document[position] != str(0 if remainder < 2 else 11 - remainder):
+            return False
+    return True
+
+
+class SeedScaleTests(TestCase):
+    options = {'categories': 3, 'suppliers': 4, 'customers': 12, 'products': 15, 'addresses': 3, 'batch_size': 4}
+
+    def setUp(self):
+        cache.clear()
+
+    def seed(self, **options):
+        call_command('seed_scale', **{**self.options, **options}, stdout=io.StringIO())
+        return Company.objects.get(legal_name='Empresa Seed 0001 LTDA')
+
+    def snapshot(self, company):
+        products = list(
+            Product.objects.filter(company=company).order_by('sku').values_list(
+                'name', 'sku', 'barcode', 'cost_price', 'sale_price', 'stock_quantity',
+                'category__name', 'unit__abbreviation', 'supplier__cpf_cnpj', 'fiscal_data__ncm',
+            )
+        )
+        partners = [
+            list(model.objects.filter(company=company).order_by('cpf_cnpj').values_list(
+                'name', 'cpf_cnpj', 'person_type', 'credit_limit', 'address__postal_code',
+            ))
+            for model in (Supplier, Customer)
+        ]
+        return products, partners
+
+    def test_document_generators_match_known_numbers(self):
+        self.assertEqual(make_cpf(529982247), '52998224725')
+        self.assertEqual(make_cnpj(11222333), '11222333000181')
+
+    def test_tiny_run_counts_and_documents(self):
+        company = self.seed()
+        self.assertEqual(Category.objects.filter(company=company).count(), 3)
+        self.assertEqual(Unit.objects.filter(company=company).count(), len(DEFAULT_UNITS))
+        self.assertEqual(Supplier.objects.filter(company=company).count(), 4)
+        self.assertEqual(Customer.objects.filter(company=company).count(), 12)
+        self.assertEqual(Product.objects.filter(company=company, fiscal_data__isnull=False).count(), 15)
+        self.assertEqual(
+            dict(RowCounter.objects.filter(company=company).values_list('model_label', 'count')),
+            {
+                'inventory.category': 3, 'inventory.unit': len(DEFAULT_UNITS), 'partners.supplier': 4,
+                'partners.customer': 12, 'inventory.product': 15,
+            },
+        )
+        self.assertTrue(Membership.objects.filter(company=company, role=Membership.Role.OWNER).exists())
+
+        # O saldo inicial do razão confere com o estoque gravado
+        for product in Product.objects.filter(company=company):
+            ledger = sum(StockMovement.objects.filter(product=product).values_list('quantity', flat=True))
+            self.assertEqual(ledger, product.stock_quantity)
+
+        documents = []
+        for model in (Supplier, Customer):
+            for cpf_cnpj, person_type in model.objects.filter(company=company).values_list('cpf_cnpj', 'person_type'):
+                self.assertEqual(len(cpf_cnpj), 11 if person_type == 'PF' else 14)
+                self.assertTrue(check_digits_ok(cpf_cnpj), cpf_cnpj)
+                documents.append(cpf_cnpj)
+        self.assertEqual(len(documents), len(set(documents)))
+        self.assertEqual(Supplier.objects.filter(company=company, person_type='PJ').count(), 4)
+
+    def test_same_seed_generates_same_data(self):
+        with transaction.atomic():
+            first = self.snapshot(self.seed(seed=7))
+            transaction.set_rollback(True)
+        with transaction.atomic():
+            other = self.snapshot(self.seed(seed=8))
+            transaction.set_rollback(True)
+        second = self.snapshot(self.seed(seed=7))
+
+        self.assertEqual(len(first[0]), 15)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_benchmark_http_on_seeded_company(self):
+        company = self.seed()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'baseline.json')
+
+        call_command(
+            'benchmark_http', company=company.pk, repeat=1, only=['product_list', 'customer_address'],
+            output=path, stdout=io.StringIO(),
+        )
+        with open(path, encoding='utf-8') as file:
+            report = json.load(file)
+        self.assertEqual(report['meta']['products'], 15)
+        self.assertEqual(set(report['results']), {'product_list', 'customer_address'})
+        self.assertGreater(report['results']['product_list']['queries'], 0)
+
+        # Comparada consigo mesma (só consultas, sem limite de tempo), não há regressão
+        call_command(
+            'benchmark_http', company=company.pk, repeat=1, only=['product_list'], baseline=path,
+            threshold=float('inf'), fail_on_regression=True, stdout=io.StringIO(),
+        )
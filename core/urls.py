@@ -0,0 +1,8 @@
+from django.urls import path
+from core import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('cep/', views.CEPLookupView.as_view(), name='cep_lookup'),
+]
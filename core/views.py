@@ -1,3 +1,22 @@
-from django.shortcuts import render
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views import View
 
-# Create your views here.
+from core.cep import lookup_cep
+
+
+class CEPLookupView(LoginRequiredMixin, View):
+    """
+    Endereço de um CEP (`?cep=00000000`) consultado na base local.
+    Responde 404 quando o CEP não está na base.
+    """
+    max_age = 60 * 60 * 24
+
+    def get(self, request, *args, **kwargs):
+        address = lookup_cep(request.GET.get('cep'))
+        if address is None:
+            return JsonResponse({'error': 'CEP não encontrado.'}, status=404)
+        response = JsonResponse(address._asdict())
+        patch_cache_control(response, private=True, max_age=self.max_age)
+        return response
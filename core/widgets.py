@@ -1,4 +1,5 @@
 from django import forms
+from django.urls import reverse
 
 
 class Phone(forms.TextInput):
@@ -18,4 +19,60 @@ class Phone(forms.TextInput):
         js = [
             "intl_tel_input/js/intlTelInput.min.js",
             "js/phone.js"
-        ]
\ No newline at end of file
+        ]
+
+class Autocomplete(forms.Select):
+    """
+    Select alimentado por um endpoint de `core.autocomplete.AutocompleteView`
+    via Select2. Só a opção selecionada é renderizada no HTML; as demais são
+    buscadas conforme o usuário digita.
+    """
+
+    def __init__(self, url, attrs=None, placeholder='Digite para buscar...'):
+        attrs = dict(attrs or {})
+        attrs['data-autocomplete-url'] = url
+        attrs['data-placeholder'] = placeholder
+        super().__init__(attrs)
+
+    def selected_choices(self, values):
+        values = {str(value) for value in values if value not in (None, '')}
+        if not values:
+            return []
+        queryset = getattr(self.choices, 'queryset', None)
+        if queryset is not None:
+            field = self.choices.field
+            return [
+                (field.prepare_value(obj), field.label_from_instance(obj))
+                for obj in queryset.filter(pk__in=values)
+            ]
+        return [(key, label) for key, label in self.choices if str(key) in values]
+
+    def optgroups(self, name, value, attrs=None):
+        groups = []
+        choices = [('', '')] + self.selected_choices(value)
+        for index, (option_value, option_label) in enumerate(choices):
+            selected = str(option_value) in value and option_value != ''
+            groups.append((None, [self.create_option(
+                name, option_value, option_label, selected, index, attrs=attrs,
+            )], index))
+        return groups
+
+
+class CEPInput(forms.TextInput):
+    """
+    Campo de CEP com máscara e preenchimento do endereço pela diretiva
+    Alpine `x-cep`, que consulta a base local (`core:cep_lookup`).
+    """
+
+    def __init__(self, attrs=None):
+        attrs = dict(attrs or {})
+        attrs.setdefault('placeholder', '00000-000')
+        attrs['x-data'] = ''
+        attrs['x-cep'] = ''
+        attrs['inputmode'] = 'numeric'
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-cep-url'] = reverse('core:cep_lookup')
+        return context
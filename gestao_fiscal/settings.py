@@ -59,10 +59,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.queries.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.tenant.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "allauth.account.middleware.AccountMiddleware",
@@ -188,6 +190,18 @@ INTERNAL_IPS = [
     'localhost',
 ]
 
+# Orçamento de consultas por view (core.queries.QueryBudgetMiddleware).
+# O runner dos testes ativa o modo estrito: views acima do orçamento geram erro.
+QUERY_BUDGET_STRICT = False
+TEST_RUNNER = 'core.test_runner.StrictQueryBudgetRunner'
+
+# Variantes assíncronas das listagens e autocompletes (core.async_views).
+# O asgi.py ativa por padrão; no WSGI ficam as views síncronas.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
+# Base local de CEPs (core.cep), gerada pelo comando load_cep
+CEP_DATABASE_PATH = BASE_DIR / 'data' / 'cep.bin'
+
 CRISPY_TEMPLATE_PACK = 'tailwind'
 CRISPY_ALLOWED_TEMPLATE_PACKS = 'tailwind'
 
@@ -23,6 +23,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('allauth.urls')),
     path('accounts/profile/', include('accounts.urls')),
+    path('', include('core.urls')),
     path('', include('configuration.urls')),
     path('', include('partners.urls')),
     path('', include('inventory.urls')),
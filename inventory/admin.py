@@ -1,5 +1,5 @@
 from django.contrib import admin
-from inventory.models import Product, ProductFiscalData, Category, Unit
+from inventory.models import Product, ProductFiscalData, Category, Unit, StockMovement, StockSnapshot, InventoryValuation
 
 
 @admin.register(Product)
@@ -21,4 +21,19 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(Unit)
 class UnitAdmin(admin.ModelAdmin):
     list_display = ('name', 'abbreviation')
-    search_fields = ('name', 'abbreviation')
\ No newline at end of file
+    search_fields = ('name', 'abbreviation')
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('occurred_at', 'product', 'kind', 'reason', 'quantity', 'reference')
+    search_fields = ('product__name', 'reference')
+    list_filter = ('kind', 'reason')
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('taken_at', 'product', 'quantity')
+
+@admin.register(InventoryValuation)
+class InventoryValuationAdmin(admin.ModelAdmin):
+    list_display = ('company', 'category', 'supplier', 'product_count', 'stock_quantity', 'total_cost', 'updated_at')
+    list_filter = ('company',)
@@ -0,0 +1,17 @@
+from django import forms
+
+
+class ProductImportForm(forms.Form):
+    """Formulário de envio da planilha de importação de produtos"""
+
+    file = forms.FileField(
+        label='Arquivo',
+        help_text='CSV (separado por ";" ou ",") ou XLSX com cabeçalho na primeira linha.',
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,.xlsx'}),
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data.get('file')
+        if file and not file.name.lower().endswith(('.csv', '.xlsx', '.xlsm')):
+            raise forms.ValidationError('Envie um arquivo .csv ou .xlsx.')
+        return file
@@ -1,12 +1,44 @@
 from django import forms
+from django.urls import reverse_lazy
 from inventory.models.product import Product, ProductFiscalData
-from inventory.models.category import Category
-from inventory.models.units import Unit
+from inventory.models.stock import StockMovement
+from inventory.services.stock import post_movements
+from core.bulk_actions import BulkActionForm
+from core.lookups import LookupChoiceField, LookupModelFormMixin
+from core.widgets import Autocomplete
+from inventory.lookups import category_lookup, unit_lookup
+from inventory.validators import (
+    clean_cest,
+    clean_cfop,
+    clean_ncm,
+    validate_cost_price,
+    validate_sale_price,
+    validate_stock_quantity,
+)
+from partners.lookups import supplier_lookup
 from partners.models.suppliers import Supplier
 
 
-class ProductDataForm(forms.ModelForm):
-    """Formulário com informações básicas do produto"""
+class ProductDataForm(LookupModelFormMixin, forms.ModelForm):
+    """
+    Formulário com informações básicas do produto.
+
+    O estoque não é gravado direto no produto: a diferença entre o valor
+    digitado e o exibido no formulário (`stock_seen`) vira um lançamento no
+    razão, então movimentações feitas enquanto o formulário estava aberto
+    não são sobrescritas.
+    """
+    stock_quantity = forms.IntegerField(
+        label='Quantidade em Estoque',
+        initial=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+    )
+    stock_seen = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    field_order = [
+        'name', 'category', 'unit', 'supplier', 'sku', 'barcode',
+        'cost_price', 'sale_price', 'stock_quantity', 'description',
+    ]
 
     class Meta:
         model = Product
@@ -19,7 +51,6 @@ class ProductDataForm(forms.ModelForm):
             'barcode',
             'cost_price',
             'sale_price',
-            'stock_quantity',
             'description',
         ]
         labels = {
@@ -32,7 +63,6 @@ class ProductDataForm(forms.ModelForm):
             'barcode': 'Código de Barras',
             'cost_price': 'Preço de Custo',
             'sale_price': 'Preço de Venda',
-            'stock_quantity': 'Quantidade em Estoque',
         }
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
@@ -41,45 +71,67 @@ class ProductDataForm(forms.ModelForm):
             'barcode': forms.TextInput(attrs={'class': 'form-control'}),
             'cost_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'sale_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
-            'stock_quantity': forms.NumberInput(attrs={'class': 'form-control'}),
         }
 
     def __init__(self, *args, **kwargs):
         self.company = kwargs.pop('company', None)
+        self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
 
-        if self.company:
-            self.fields['category'].queryset = Category.objects.filter(
-                company=self.company,
-                is_active=True
-            ).order_by('name')
-            self.fields['unit'].queryset = Unit.objects.filter(
-                company=self.company,
-                is_active=True
-            ).order_by('name')
-            self.fields['supplier'].queryset = Supplier.objects.filter(
-                company=self.company,
-                is_active=True
-            ).order_by('name')
+        self.fields['stock_quantity'].initial = self.instance.stock_quantity
+        self.fields['stock_seen'].initial = self.instance.stock_quantity
+
+        # Só a opção selecionada vai para o HTML; as demais vêm do autocomplete.
+        # Categorias, unidades e fornecedores são validados pelo cache da empresa.
+        company_id = self.company.pk if self.company else None
+        for name, lookup, url in (
+            ('category', category_lookup, reverse_lazy('inventory:category_autocomplete')),
+            ('unit', unit_lookup, reverse_lazy('inventory:unit_autocomplete')),
+            ('supplier', supplier_lookup, reverse_lazy('partners:supplier_autocomplete')),
+        ):
+            field = self.fields[name]
+            self.fields[name] = LookupChoiceField(
+                lookup,
+                company_id=company_id,
+                required=field.required,
+                label=field.label,
+                help_text=field.help_text,
+                widget=Autocomplete(url),
+            )
 
     def clean_sale_price(self):
         sale_price = self.cleaned_data.get('sale_price')
-        if sale_price and sale_price <= 0:
-            raise forms.ValidationError('O preço de venda deve ser maior que zero.')
+        validate_sale_price(sale_price)
         return sale_price
 
     def clean_cost_price(self):
         cost_price = self.cleaned_data.get('cost_price')
-        if cost_price and cost_price < 0:
-            raise forms.ValidationError('O preço de custo não pode ser negativo.')
+        validate_cost_price(cost_price)
         return cost_price
 
     def clean_stock_quantity(self):
         stock_quantity = self.cleaned_data.get('stock_quantity')
-        if stock_quantity and stock_quantity < 0:
-            raise forms.ValidationError('A quantidade em estoque não pode ser negativa.')
+        validate_stock_quantity(stock_quantity)
         return stock_quantity
 
+    def save(self, commit=True):
+        adding = self.instance._state.adding
+        product = super().save(commit=commit)
+        if commit:
+            self.post_stock_change(product, adding)
+        return product
+
+    def post_stock_change(self, product, adding):
+        seen = 0 if adding else (self.cleaned_data.get('stock_seen') or 0)
+        delta = (self.cleaned_data.get('stock_quantity') or 0) - seen
+        if not delta:
+            return
+        movement = StockMovement(product=product, kind=StockMovement.Kind.ADJUST, quantity=delta)
+        if adding:
+            movement.kind = StockMovement.Kind.IN
+            movement.reason = StockMovement.Reason.INITIAL
+        post_movements(product.company_id, [movement], user=self.user)
+
 
 class ProductTaxForm(forms.ModelForm):
     """Formulário com dados fiscais do produto"""
@@ -115,25 +167,35 @@ class ProductTaxForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
 
     def clean_ncm(self):
-        ncm = self.cleaned_data.get('ncm')
-        if ncm:
-            ncm = ''.join(filter(str.isdigit, ncm))
-            if len(ncm) != 8:
-                raise forms.ValidationError('NCM deve conter 8 dígitos.')
-        return ncm
+        return clean_ncm(self.cleaned_data.get('ncm'))
 
     def clean_cest(self):
-        cest = self.cleaned_data.get('cest')
-        if cest:
-            cest = ''.join(filter(str.isdigit, cest))
-            if len(cest) != 7:
-                raise forms.ValidationError('CEST deve conter 7 dígitos.')
-        return cest
+        return clean_cest(self.cleaned_data.get('cest'))
 
     def clean_cfop(self):
-        cfop = self.cleaned_data.get('cfop')
-        if cfop:
-            cfop = ''.join(filter(str.isdigit, cfop))
-            if len(cfop) != 4:
-                raise forms.ValidationError('CFOP deve conter 4 dígitos.')
-        return cfop
\ No newline at end of file
+        return clean_cfop(self.cleaned_data.get('cfop'))
+
+
+class ProductBulkActionForm(BulkActionForm):
+    """Ações em massa da listagem de produtos, incluindo alterar categoria e fornecedor."""
+    actions = BulkActionForm.actions + (
+        ('set_category', 'Alterar categoria'),
+        ('set_supplier', 'Alterar fornecedor'),
+    )
+    action_fields = {'set_category': 'category', 'set_supplier': 'supplier'}
+
+    supplier = forms.ModelChoiceField(queryset=Supplier.objects.none(), required=False, label='Fornecedor')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        company_id = self.company.pk if self.company else None
+        self.fields['category'] = LookupChoiceField(
+            category_lookup,
+            company_id=company_id,
+            required=False,
+            label='Categoria',
+            widget=Autocomplete(reverse_lazy('inventory:category_autocomplete')),
+        )
+        supplier = self.fields['supplier']
+        supplier.widget = Autocomplete(reverse_lazy('partners:supplier_autocomplete'))
+        supplier.queryset = Supplier.objects.filter(company_id=company_id, is_active=True)
@@ -12,4 +12,12 @@ class UnitForm(forms.ModelForm):
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'abbreviation': forms.TextInput(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+    def clean_abbreviation(self):
+        abbreviation = self.cleaned_data.get('abbreviation')
+
+        if Unit.objects.filter(company_id=self.instance.company_id, abbreviation=abbreviation).exclude(pk=self.instance.pk).exists():
+            raise forms.ValidationError("Já existe uma unidade com esta abreviação nesta empresa.")
+
+        return abbreviation
@@ -0,0 +1,12 @@
+from core.lookups import TenantLookup
+from inventory.models.category import Category
+from inventory.models.units import Unit
+
+
+category_lookup = TenantLookup(Category)
+
+unit_lookup = TenantLookup(
+    Unit,
+    fields=('name', 'abbreviation'),
+    label=lambda values: f"{values['name']} ({values['abbreviation']})",
+)
@@ -0,0 +1,74 @@
+import random
+from array import array
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models.company import Company
+from core.benchmark import measure
+from inventory.models.product import Product
+from inventory.services.taxes import TaxLine, calculate_taxes, calculate_taxes_cents, get_rate_table
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência (p50/p95) do cálculo de impostos para documentos com muitos itens'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='ID da empresa (padrão: a primeira com produtos)')
+        parser.add_argument('--lines', type=int, default=10000, help='Itens por documento')
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        company = self.get_company(options.get('company'))
+        product_ids = list(
+            Product.objects.filter(company=company).values_list('pk', flat=True)[:50000]
+        )
+        if not product_ids:
+            raise CommandError('Nenhum produto encontrado para o benchmark.')
+
+        rng = random.Random(options['seed'])
+        size = options['lines']
+        lines = [
+            TaxLine(
+                product=rng.choice(product_ids),
+                quantity=Decimal(rng.randint(1, 50000)) / 1000,
+                unit_price=Decimal(rng.randint(1, 1000000)) / 100,
+            )
+            for _ in range(size)
+        ]
+        ids = array('q', [line.product for line in lines])
+        quantity = array('q', [int(line.quantity * 1000) for line in lines])
+        unit_price = array('q', [int(line.unit_price * 100) for line in lines])
+        exempt = array('b', bytes(size))
+
+        table = get_rate_table(company.pk)
+        self.stdout.write(
+            f'🚀 Benchmark de impostos: {size} itens, {len(table.product_ids)} produtos '
+            f'com dados fiscais, {len(table.profiles)} perfis de alíquota'
+        )
+
+        stats = measure(lambda: calculate_taxes_cents(company.pk, ids, quantity, unit_price, exempt), repeat=options['repeat'])
+        self.stdout.write(f'🧮 Arrays em centavos: p50={stats["p50"]}ms p95={stats["p95"]}ms max={stats["max"]}ms')
+
+        stats = measure(lambda: calculate_taxes(company.pk, lines), repeat=options['repeat'])
+        self.stdout.write(f'🧾 TaxLine (com conversão): p50={stats["p50"]}ms p95={stats["p95"]}ms max={stats["max"]}ms')
+
+        totals = calculate_taxes(company.pk, lines).totals
+        self.stdout.write(
+            f'💰 Base R$ {totals["base"]} | ICMS R$ {totals["icms"]} | '
+            f'PIS R$ {totals["pis"]} | COFINS R$ {totals["cofins"]}'
+        )
+        self.stdout.write(self.style.SUCCESS('\n🎉 Concluído!'))
+
+    def get_company(self, company_id):
+        if company_id:
+            try:
+                return Company.objects.get(pk=company_id)
+            except Company.DoesNotExist:
+                raise CommandError(f'Empresa {company_id} não encontrada.')
+
+        company = Company.objects.filter(pk__in=Product.objects.values('company')).first()
+        if not company:
+            raise CommandError('Nenhum produto encontrado para o benchmark.')
+        return company
@@ -0,0 +1,83 @@
+import os
+import shutil
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models.company import Company
+from core.imports import ErrorReport, ImportFileError, open_rows
+from inventory.services.product_import import BATCH_SIZE, COLUMN_ALIASES, ProductImporter, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Importa produtos de um arquivo CSV/XLSX para uma empresa, ou processa as importações enviadas pela tela'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Caminho do arquivo .csv ou .xlsx')
+        parser.add_argument('--company', type=int, help='ID da empresa (obrigatório com o arquivo)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Linhas gravadas por transação')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Codificação do CSV (ex.: latin-1)')
+        parser.add_argument('--errors', help='Onde gravar o relatório de erros (padrão: <arquivo>.erros.csv)')
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Processa a fila de importações enviadas pela tela e marca as interrompidas como falhas',
+        )
+        parser.add_argument(
+            '--watch',
+            type=int,
+            metavar='SEGUNDOS',
+            help='Com --pending: continua verificando a fila a cada N segundos',
+        )
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            return self.handle_pending(options)
+        if not options['path'] or not options['company']:
+            raise CommandError('❌ Informe o arquivo e --company, ou use --pending.')
+
+        path = options['path']
+        company = Company.objects.filter(pk=options['company']).first()
+        if not company:
+            raise CommandError('❌ Empresa não encontrada.')
+
+        self.stdout.write(f'🚀 Importando {os.path.basename(path)} para {company.legal_name}...')
+
+        def progress(importer):
+            self.stdout.write(
+                f'⏳ {importer.total} linhas: {importer.created} criados, '
+                f'{importer.updated} atualizados, {importer.report.count} com erro'
+            )
+
+        importer = ProductImporter(company.pk, batch_size=options['batch_size'], on_batch=progress)
+        with open(path, 'rb') as file:
+            try:
+                columns, rows = open_rows(file, path, COLUMN_ALIASES, encoding=options['encoding'])
+                report = ErrorReport(columns)
+                importer.run(columns, rows, report)
+            except ImportFileError as error:
+                raise CommandError(f'❌ {error}')
+
+        if report.count:
+            errors_path = options['errors'] or f'{path}.erros.csv'
+            with open(errors_path, 'wb') as output:
+                shutil.copyfileobj(report.rewind(), output)
+            self.stdout.write(self.style.WARNING(f'⚠️  {report.count} linha(s) com erro: {errors_path}'))
+        report.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n🎉 Concluído! {importer.created} criados, {importer.updated} atualizados'
+        ))
+
+    def handle_pending(self, options):
+        def finished(job):
+            self.stdout.write(
+                f'📦 Importação #{job.pk} ({job.get_status_display()}): {job.created_count} criados, '
+                f'{job.updated_count} atualizados, {job.error_count} com erro'
+            )
+
+        while True:
+            run_pending_jobs(batch_size=options['batch_size'], on_job=finished)
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
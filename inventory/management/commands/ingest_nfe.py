@@ -0,0 +1,52 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models.company import Company
+from inventory.services.nfe import BATCH_SIZE, NFeIngestor, iter_nfe_sources
+
+
+class Command(BaseCommand):
+    help = 'Importa NF-e de fornecedores (XML, ZIP ou pasta) para uma empresa'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo .xml, .zip ou pasta com as NF-e')
+        parser.add_argument('--company', type=int, required=True, help='ID da empresa')
+        parser.add_argument('--workers', type=int, default=None, help='Processos de leitura (padrão: nº de CPUs)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Notas gravadas por transação')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'❌ Caminho não encontrado: {path}')
+        company = Company.objects.filter(pk=options['company']).first()
+        if not company:
+            raise CommandError('❌ Empresa não encontrada.')
+
+        self.stdout.write(f'🚀 Importando NF-e de {os.path.basename(path)} para {company.legal_name}...')
+
+        def progress(ingestor):
+            self.stdout.write(
+                f'⏳ {ingestor.documents} notas, {ingestor.items} itens: '
+                f'{ingestor.created} produtos criados, {ingestor.updated} atualizados'
+            )
+
+        ingestor = NFeIngestor(
+            company.pk,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            on_batch=progress,
+        )
+        ingestor.run(iter_nfe_sources(path))
+
+        if ingestor.errors:
+            self.stdout.write(self.style.WARNING(f'⚠️  {len(ingestor.errors)} erro(s):'))
+            for error in ingestor.errors[:20]:
+                self.stdout.write(f'   ❌ {error}')
+            if len(ingestor.errors) > 20:
+                self.stdout.write(f'   ... e mais {len(ingestor.errors) - 20}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n🎉 Concluído! {ingestor.documents} notas, '
+            f'{ingestor.created} produtos criados, {ingestor.updated} atualizados'
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models.valuation import InventoryValuation
+from inventory.services.valuation import rebuild_valuation
+
+
+class Command(BaseCommand):
+    help = 'Recalcula a valorização do estoque a partir dos produtos (corrige divergências)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            action='append',
+            dest='companies',
+            help='ID da empresa (pode repetir; padrão: todas)',
+        )
+
+    def handle(self, *args, **options):
+        company_ids = options.get('companies')
+        queryset = InventoryValuation.objects.all()
+        if company_ids:
+            queryset = queryset.filter(company_id__in=company_ids)
+
+        fields = ('company_id', 'bucket_key', 'product_count', 'stock_quantity', 'total_cost')
+        before = set(queryset.values_list(*fields))
+
+        self.stdout.write('🚀 Recalculando a valorização do estoque...')
+        total = rebuild_valuation(company_ids or None)
+        after = set(queryset.values_list(*fields))
+
+        drifted = {row[:2] for row in before ^ after}
+        if drifted:
+            self.stdout.write(self.style.WARNING(f'⚠️ {len(drifted)} grupo(s) estavam divergentes e foram corrigidos.'))
+        else:
+            self.stdout.write('✅ Nenhuma divergência encontrada.')
+        self.stdout.write(self.style.SUCCESS(f'\n🎉 Concluído! {total} grupo(s) recalculado(s).'))
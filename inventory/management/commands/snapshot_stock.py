@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from inventory.models.stock import StockMovement
+from inventory.services.stock import take_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Grava o saldo de estoque dos produtos movimentados desde o último retrato (rodar periodicamente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            action='append',
+            dest='companies',
+            help='ID da empresa (pode repetir; padrão: todas com movimentações)',
+        )
+        parser.add_argument('--at', help='Data/hora do retrato (ISO 8601; padrão: agora menos --lag-minutes)')
+        parser.add_argument(
+            '--lag-minutes',
+            type=int,
+            default=5,
+            help='Margem para lançamentos ainda em transação no momento do retrato',
+        )
+
+    def handle(self, *args, **options):
+        if options['at']:
+            taken_at = parse_datetime(options['at'])
+            if taken_at is None:
+                raise CommandError('❌ Data inválida em --at.')
+            if timezone.is_naive(taken_at):
+                taken_at = timezone.make_aware(taken_at)
+        else:
+            taken_at = timezone.now() - timedelta(minutes=options['lag_minutes'])
+
+        company_ids = options.get('companies') or (
+            StockMovement.objects.order_by().values_list('company_id', flat=True).distinct()
+        )
+
+        self.stdout.write(f'🚀 Gravando saldos em {timezone.localtime(taken_at):%d/%m/%Y %H:%M}...')
+        for company_id in company_ids:
+            total = take_snapshots(company_id, taken_at)
+            self.stdout.write(f'✅ Empresa {company_id}: {total} produto(s)')
+
+        self.stdout.write(self.style.SUCCESS('\n🎉 Concluído!'))
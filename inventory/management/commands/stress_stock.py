@@ -0,0 +1,90 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from inventory.models.product import Product
+from inventory.models.stock import StockMovement
+from inventory.services.stock import post_movements
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de concorrência do razão de estoque: lançadores em paralelo sobre os mesmos '
+        'produtos e conferência do saldo com a soma do razão (use com PostgreSQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, required=True, help='ID da empresa')
+        parser.add_argument('--workers', type=int, default=8, help='Lançadores em paralelo')
+        parser.add_argument('--batches', type=int, default=20, help='Transações por lançador')
+        parser.add_argument('--batch-size', type=int, default=200, help='Movimentações por transação')
+        parser.add_argument('--products', type=int, default=20, help='Produtos disputados')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        company_id = options['company']
+        product_ids = list(
+            Product.objects.filter(company_id=company_id).order_by('pk').values_list('pk', flat=True)[:options['products']]
+        )
+        if not product_ids:
+            raise CommandError('❌ Nenhum produto encontrado para a empresa.')
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING('⚠️  Sem PostgreSQL as transações são serializadas pelo banco.'))
+
+        before = self.balances(product_ids)
+        expected = dict.fromkeys(product_ids, 0)
+
+        def worker(index):
+            rng = random.Random(options['seed'] + index)
+            deltas = dict.fromkeys(product_ids, 0)
+            try:
+                for _ in range(options['batches']):
+                    movements = []
+                    for _ in range(options['batch_size']):
+                        kind = rng.choice((StockMovement.Kind.IN, StockMovement.Kind.OUT))
+                        movement = StockMovement(
+                            product_id=rng.choice(product_ids),
+                            kind=kind,
+                            reason=StockMovement.Reason.MANUAL,
+                            quantity=rng.randint(1, 10),
+                            reference='stress_stock',
+                        )
+                        movements.append(movement)
+                    for movement in post_movements(company_id, movements):
+                        deltas[movement.product_id] += movement.quantity
+            finally:
+                connection.close()
+            return deltas
+
+        self.stdout.write(
+            f"🚀 {options['workers']} lançadores x {options['batches']} transações x "
+            f"{options['batch_size']} movimentações em {len(product_ids)} produtos..."
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for deltas in pool.map(worker, range(options['workers'])):
+                for pk, delta in deltas.items():
+                    expected[pk] += delta
+        elapsed = time.perf_counter() - started
+        total = options['workers'] * options['batches'] * options['batch_size']
+        self.stdout.write(f'⏱️  {total} movimentações em {elapsed:.2f}s ({total / elapsed:.0f}/s)')
+
+        after = self.balances(product_ids)
+        ledger = dict(
+            StockMovement.objects.filter(product_id__in=product_ids)
+            .values('product_id').order_by().annotate(total=Sum('quantity')).values_list('product_id', 'total')
+        )
+        failures = [
+            pk for pk in product_ids
+            if after[pk] != before[pk] + expected[pk] or after[pk] != ledger.get(pk, 0)
+        ]
+        if failures:
+            raise CommandError(f'❌ Saldo divergente em {len(failures)} produto(s): {failures[:10]}')
+        self.stdout.write(self.style.SUCCESS('\n🎉 Nenhuma atualização perdida: saldos conferem com o razão.'))
+
+    def balances(self, product_ids):
+        return dict(Product.objects.filter(pk__in=product_ids).values_list('pk', 'stock_quantity'))
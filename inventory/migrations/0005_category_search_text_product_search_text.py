@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+from core.operations import CreateTrigramSearchIndex
+from core.search import normalize_search_text
+
+
+SEARCH_FIELDS = {
+    'category': ('name',),
+    'product': ('name', 'sku', 'barcode'),
+}
+
+
+def populate_search_text(apps, schema_editor):
+    for model_name, fields in SEARCH_FIELDS.items():
+        model = apps.get_model('inventory', model_name)
+        batch = []
+        for obj in model.objects.only('pk', *fields).iterator(chunk_size=2000):
+            obj.search_text = normalize_search_text(*(getattr(obj, field) for field in fields))
+            batch.append(obj)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ['search_text'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['search_text'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_product_supplier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de Busca'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de Busca'),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        CreateTrigramSearchIndex(model_name='category', name='inventory_category_search_trgm'),
+        CreateTrigramSearchIndex(model_name='product', name='inventory_product_search_trgm'),
+    ]
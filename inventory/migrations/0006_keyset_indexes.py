@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_delete_address'),
+        ('inventory', '0005_category_search_text_product_search_text'),
+        ('partners', '0008_customer_search_text_supplier_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['company', 'name', 'id'], name='inventory_p_company_f9fc07_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=models.Index(fields=['company', 'name', 'id'], name='inventory_u_company_fe126e_idx'),
+        ),
+    ]
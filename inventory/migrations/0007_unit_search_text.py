@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+from core.operations import CreateTrigramSearchIndex
+from core.search import normalize_search_text
+
+
+def populate_search_text(apps, schema_editor):
+    Unit = apps.get_model('inventory', 'Unit')
+    batch = []
+    for unit in Unit.objects.only('pk', 'name', 'abbreviation').iterator(chunk_size=2000):
+        unit.search_text = normalize_search_text(unit.name, unit.abbreviation)
+        batch.append(unit)
+        if len(batch) >= 2000:
+            Unit.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        Unit.objects.bulk_update(batch, ['search_text'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de Busca'),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        CreateTrigramSearchIndex(model_name='unit', name='inventory_unit_search_trgm'),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_opening_movements(apps, schema_editor):
+    # O saldo atual de cada produto vira o lançamento inicial do razão
+    Product = apps.get_model('inventory', 'Product')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    batch = []
+    queryset = Product.objects.exclude(stock_quantity=0).values_list('pk', 'company_id', 'stock_quantity')
+    for pk, company_id, quantity in queryset.iterator(chunk_size=2000):
+        batch.append(StockMovement(
+            company_id=company_id,
+            product_id=pk,
+            kind='adjust',
+            reason='initial',
+            quantity=quantity,
+        ))
+        if len(batch) >= 2000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_delete_address'),
+        ('inventory', '0007_unit_search_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('in', 'Entrada'), ('out', 'Saída'), ('adjust', 'Ajuste')], max_length=10, verbose_name='Tipo')),
+                ('reason', models.CharField(choices=[('initial', 'Saldo inicial'), ('purchase', 'Compra'), ('sale', 'Venda'), ('return', 'Devolução'), ('count', 'Inventário'), ('loss', 'Perda/Avaria'), ('import', 'Importação'), ('manual', 'Ajuste manual')], default='manual', max_length=20, verbose_name='Motivo')),
+                ('quantity', models.IntegerField(verbose_name='Quantidade')),
+                ('reference', models.CharField(blank=True, help_text='Documento de origem (ex.: NF-e, pedido).', max_length=100, verbose_name='Referência')),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data do Movimento')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='accounts.company')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='inventory.product', verbose_name='Produto')),
+            ],
+            options={
+                'verbose_name': 'Movimentação de Estoque',
+                'verbose_name_plural': 'Movimentações de Estoque',
+                'ordering': ['-occurred_at', '-id'],
+                'indexes': [models.Index(fields=['product', 'occurred_at'], name='inventory_s_product_060ca2_idx'), models.Index(fields=['company', 'occurred_at'], name='inventory_s_company_7d05ab_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(verbose_name='Data do Saldo')),
+                ('quantity', models.IntegerField(verbose_name='Quantidade')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='accounts.company')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventory.product')),
+            ],
+            options={
+                'verbose_name': 'Saldo de Estoque',
+                'verbose_name_plural': 'Saldos de Estoque',
+                'constraints': [models.UniqueConstraint(fields=('product', 'taken_at'), name='unique_stock_snapshot_per_product_time')],
+            },
+        ),
+        migrations.RunPython(create_opening_movements, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+
+
+def build_valuation(apps, schema_editor):
+    # Grupos iniciais a partir dos produtos ativos
+    Product = apps.get_model('inventory', 'Product')
+    InventoryValuation = apps.get_model('inventory', 'InventoryValuation')
+    rows = (
+        Product.objects.filter(is_active=True)
+        .order_by()
+        .values('company_id', 'category_id', 'supplier_id')
+        .annotate(
+            product_count=Count('pk'),
+            total_quantity=Sum('stock_quantity'),
+            total_cost=Sum(ExpressionWrapper(
+                F('cost_price') * F('stock_quantity'),
+                output_field=DecimalField(max_digits=18, decimal_places=2),
+            )),
+        )
+    )
+    InventoryValuation.objects.bulk_create(
+        [
+            InventoryValuation(
+                company_id=row['company_id'],
+                bucket_key=f"{row['category_id'] or 0}:{row['supplier_id'] or 0}",
+                category_id=row['category_id'],
+                supplier_id=row['supplier_id'],
+                product_count=row['product_count'],
+                stock_quantity=row['total_quantity'] or 0,
+                total_cost=round(row['total_cost'] or 0, 2),
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_delete_address'),
+        ('inventory', '0008_stock_ledger'),
+        ('partners', '0008_customer_search_text_supplier_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryValuation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_key', models.CharField(editable=False, max_length=50)),
+                ('product_count', models.IntegerField(default=0, verbose_name='Produtos')),
+                ('stock_quantity', models.BigIntegerField(default=0, verbose_name='Quantidade em Estoque')),
+                ('total_cost', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Valor em Estoque')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='inventory.category', verbose_name='Categoria')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_valuations', to='accounts.company')),
+                ('supplier', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='partners.supplier', verbose_name='Fornecedor')),
+            ],
+            options={
+                'verbose_name': 'Valorização do Estoque',
+                'verbose_name_plural': 'Valorização do Estoque',
+                'constraints': [models.UniqueConstraint(fields=('company', 'bucket_key'), name='unique_valuation_bucket_per_company')],
+            },
+        ),
+        migrations.RunPython(build_valuation, migrations.RunPython.noop),
+    ]
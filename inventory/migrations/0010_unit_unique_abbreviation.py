@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+def merge_duplicate_units(apps, schema_editor):
+    # Mantém uma unidade por (empresa, abreviação), preferindo a ativa e mais
+    # antiga, e aponta os produtos das duplicadas para ela. As duplicadas não
+    # são apagadas: ficam inativas, com a abreviação marcada com o id para
+    # liberar a restrição única.
+    Unit = apps.get_model('inventory', 'Unit')
+    Product = apps.get_model('inventory', 'Product')
+    RowCounter = apps.get_model('core', 'RowCounter')
+    kept = {}
+    duplicates = {}
+    for pk, company_id, abbreviation in (
+        Unit.objects.order_by('-is_active', 'pk').values_list('pk', 'company_id', 'abbreviation')
+    ):
+        key = (company_id, abbreviation)
+        if key in kept:
+            duplicates[pk] = kept[key]
+        else:
+            kept[key] = pk
+    if not duplicates:
+        return
+
+    for pk, target in duplicates.items():
+        Product.objects.filter(unit_id=pk).update(unit_id=target)
+    renamed = []
+    for unit in Unit.objects.filter(pk__in=list(duplicates)):
+        suffix = f'~{unit.pk}'
+        unit.abbreviation = unit.abbreviation[:10 - len(suffix)] + suffix
+        unit.is_active = False
+        renamed.append(unit)
+    Unit.objects.bulk_update(renamed, ['abbreviation', 'is_active'])
+
+    # O update em massa não passa pelos contadores de linhas
+    for company_id in {unit.company_id for unit in renamed}:
+        RowCounter.objects.update_or_create(
+            company_id=company_id,
+            model_label='inventory.unit',
+            defaults={'count': Unit.objects.filter(company_id=company_id, is_active=True).count()},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_row_counter'),
+        ('inventory', '0009_inventory_valuation'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_units, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='unit',
+            constraint=models.UniqueConstraint(fields=('company', 'abbreviation'), name='unique_unit_abbreviation_per_company'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_permission_bits'),
+        ('inventory', '0010_unit_unique_abbreviation'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='category',
+            name='inventory_c_company_07f959_idx',
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['company', 'name', 'id'], name='inventory_c_company_400996_idx'),
+        ),
+    ]
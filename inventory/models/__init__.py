@@ -1,10 +1,15 @@
 from inventory.models.product import Product, ProductFiscalData
 from inventory.models.category import Category
 from inventory.models.units import Unit
+from inventory.models.stock import StockMovement, StockSnapshot
+from inventory.models.valuation import InventoryValuation
 
 __all__ = [
     'Product',
     'ProductFiscalData',
     'Category',
     'Unit',
+    'StockMovement',
+    'StockSnapshot',
+    'InventoryValuation',
 ]
\ No newline at end of file
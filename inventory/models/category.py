@@ -1,11 +1,13 @@
 from django.db import models
 from core.models.company import CompanyBaseModel
+from core.models.search import SearchableBaseModel
 
 
-class Category(CompanyBaseModel):
+class Category(SearchableBaseModel, CompanyBaseModel):
     """
     Modelo para representar categorias de produtos.
     """
+    search_fields = ('name',)
 
     name = models.CharField(max_length=100, verbose_name='Nome da Categoria')
     slug = models.SlugField(verbose_name='Slug')
@@ -18,7 +20,7 @@ class Category(CompanyBaseModel):
         verbose_name_plural = 'Categorias de Produto'
         ordering = ['name']
         indexes = [
-            models.Index(fields=['company', 'name']),
+            models.Index(fields=['company', 'name', 'id']),
         ]
         constraints = [
             models.UniqueConstraint(
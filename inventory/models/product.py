@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from core.models.company import CompanyBaseModel
+from core.models.search import SearchableBaseModel
 from inventory.models.category import Category
 from inventory.models.units import Unit
 from partners.models.suppliers import Supplier
@@ -38,10 +39,14 @@ class ProductFiscalData(CompanyBaseModel):
         verbose_name_plural = "Dados Fiscais do Produto"
 
 
-class Product(CompanyBaseModel):
+class Product(SearchableBaseModel, CompanyBaseModel):
     """
     Modelo para representar produtos no inventário.
     """
+    search_fields = ('name', 'sku', 'barcode')
+
+    # Valores anteriores usados para atualizar a valorização do estoque
+    tracked_fields = CompanyBaseModel.tracked_fields + ('category_id', 'supplier_id', 'cost_price', 'stock_quantity')
 
     name = models.CharField(max_length=200, verbose_name='Nome do Produto')
     description = models.TextField(blank=True, null=True, verbose_name='Descrição do Produto')
@@ -75,6 +80,46 @@ class Product(CompanyBaseModel):
         verbose_name = 'Produto'
         verbose_name_plural = 'Produtos'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['company', 'name', 'id']),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get('force_insert'):
+            return super().save(*args, **kwargs)
+
+        # O saldo só muda pelo razão (inventory.services.stock): salvar um
+        # produto já existente nunca regrava `stock_quantity`
+        if kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'stock_quantity'
+            ]
+        with transaction.atomic(using=kwargs.get('using')):
+            self._lock_tracked_values(kwargs.get('using'))
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            self._lock_tracked_values(kwargs.get('using'))
+            return super().delete(*args, **kwargs)
+
+    def _lock_tracked_values(self, using=None):
+        """
+        Trava a linha e relê os valores anteriores usados pela valorização e
+        pelos contadores. Os lidos com a instância podem estar desatualizados
+        (outra edição salva no meio): duas edições simultâneas subtrairiam o
+        mesmo valor anterior.
+        """
+        current = (
+            Product._base_manager.using(using or self._state.db)
+            .select_for_update()
+            .filter(pk=self.pk)
+            .values(*self.tracked_fields)
+            .first()
+        )
+        if current is not None:
+            self._loaded_values = current
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class StockMovement(models.Model):
+    """
+    Lançamento do razão de estoque. `quantity` é a variação com sinal
+    (entradas positivas, saídas negativas), então o saldo em qualquer data
+    é a soma dos lançamentos até ela. Use `inventory.services.stock` para
+    lançar: o saldo do produto é atualizado na mesma transação.
+    """
+
+    class Kind(models.TextChoices):
+        IN = 'in', 'Entrada'
+        OUT = 'out', 'Saída'
+        ADJUST = 'adjust', 'Ajuste'
+
+    class Reason(models.TextChoices):
+        INITIAL = 'initial', 'Saldo inicial'
+        PURCHASE = 'purchase', 'Compra'
+        SALE = 'sale', 'Venda'
+        RETURN = 'return', 'Devolução'
+        COUNT = 'count', 'Inventário'
+        LOSS = 'loss', 'Perda/Avaria'
+        IMPORT = 'import', 'Importação'
+        MANUAL = 'manual', 'Ajuste manual'
+
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='stock_movements')
+    product = models.ForeignKey('inventory.Product', on_delete=models.PROTECT, related_name='stock_movements', verbose_name='Produto')
+    kind = models.CharField(max_length=10, choices=Kind.choices, verbose_name='Tipo')
+    reason = models.CharField(max_length=20, choices=Reason.choices, default=Reason.MANUAL, verbose_name='Motivo')
+    quantity = models.IntegerField(verbose_name='Quantidade')
+    reference = models.CharField(max_length=100, blank=True, verbose_name='Referência', help_text='Documento de origem (ex.: NF-e, pedido).')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    occurred_at = models.DateTimeField(default=timezone.now, verbose_name='Data do Movimento')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Movimentação de Estoque'
+        verbose_name_plural = 'Movimentações de Estoque'
+        ordering = ['-occurred_at', '-id']
+        indexes = [
+            models.Index(fields=['product', 'occurred_at']),
+            models.Index(fields=['company', 'occurred_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.quantity:+d} - {self.product_id}"
+
+
+class StockSnapshot(models.Model):
+    """
+    Saldo de um produto em um instante, gravado periodicamente
+    (`snapshot_stock`) para que o saldo em uma data some só os lançamentos
+    posteriores ao último retrato, sem reler o razão inteiro.
+    """
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='stock_snapshots')
+    product = models.ForeignKey('inventory.Product', on_delete=models.CASCADE, related_name='stock_snapshots')
+    taken_at = models.DateTimeField(verbose_name='Data do Saldo')
+    quantity = models.IntegerField(verbose_name='Quantidade')
+
+    class Meta:
+        verbose_name = 'Saldo de Estoque'
+        verbose_name_plural = 'Saldos de Estoque'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'taken_at'], name='unique_stock_snapshot_per_product_time'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.taken_at:%d/%m/%Y %H:%M}: {self.quantity}"
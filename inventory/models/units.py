@@ -1,11 +1,13 @@
 from django.db import models
 from core.models.company import CompanyBaseModel
+from core.models.search import SearchableBaseModel
 
 
-class Unit(CompanyBaseModel):
+class Unit(SearchableBaseModel, CompanyBaseModel):
     """
     Modelo para representar unidades de medida de produtos.
     """
+    search_fields = ('name', 'abbreviation')
 
     name = models.CharField(max_length=100, verbose_name='Nome da Unidade')
     abbreviation = models.CharField(max_length=10, verbose_name='Abreviação')
@@ -16,6 +18,15 @@ class Unit(CompanyBaseModel):
         verbose_name = 'Unidade'
         verbose_name_plural = 'Unidades'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['company', 'name', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company', 'abbreviation'],
+                name='unique_unit_abbreviation_per_company'
+            )
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.abbreviation})"
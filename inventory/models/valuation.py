@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class InventoryValuation(models.Model):
+    """
+    Valor do estoque (`cost_price * stock_quantity` dos produtos ativos)
+    por empresa, categoria e fornecedor. Mantido de forma incremental a
+    cada alteração de produto ou lançamento de estoque, e recalculado por
+    completo pelo comando `rebuild_valuation`.
+    """
+    company = models.ForeignKey('accounts.Company', on_delete=models.CASCADE, related_name='inventory_valuations')
+    # "<categoria>:<fornecedor>", com 0 para "sem categoria/fornecedor"
+    bucket_key = models.CharField(max_length=50, editable=False)
+    category = models.ForeignKey('inventory.Category', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+', verbose_name='Categoria')
+    supplier = models.ForeignKey('partners.Supplier', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+', verbose_name='Fornecedor')
+    product_count = models.IntegerField(default=0, verbose_name='Produtos')
+    stock_quantity = models.BigIntegerField(default=0, verbose_name='Quantidade em Estoque')
+    total_cost = models.DecimalField(max_digits=18, decimal_places=2, default=0, verbose_name='Valor em Estoque')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Valorização do Estoque'
+        verbose_name_plural = 'Valorização do Estoque'
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'bucket_key'], name='unique_valuation_bucket_per_company'),
+        ]
+
+    def __str__(self):
+        return f"{self.company_id} {self.bucket_key}: {self.total_cost}"
+
+    @staticmethod
+    def make_bucket_key(category_id, supplier_id):
+        return f"{category_id or 0}:{supplier_id or 0}"
@@ -0,0 +1,306 @@
+import logging
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from core.bulk import upsert_by_pk
+from core.cache import bump_tenant_version
+from core.counters import model_label, recount
+from core.ibge import get_index
+from core.models.address import Address
+from inventory.models.product import Product, ProductFiscalData
+from inventory.models.units import Unit
+from inventory.services.nfe_parser import parse_nfe_document
+from inventory.services.product_import import RelatedMap
+from inventory.services.valuation import rebuild_valuation
+from inventory.validators import clean_cest, clean_cfop, clean_ncm
+from partners.models.suppliers import Supplier
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+# Limite por XML dentro do ZIP (proteção contra arquivos comprimidos gigantes)
+MAX_XML_SIZE = 5 * 1024 * 1024
+
+FISCAL_FIELDS = (
+    'ncm', 'cest', 'cfop', 'origin', 'cst_icms', 'cst_pis', 'cst_cofins',
+    'icms_aliquota', 'pis_aliquota', 'cofins_aliquota',
+)
+
+# Dados do emitente que completam um fornecedor já cadastrado, só quando vazios
+SUPPLIER_FILL_FIELDS = ('trading_name', 'state_registration', 'tax_regime', 'phone')
+
+
+def iter_nfe_sources(path):
+    """Gera `(nome, bytes)` de cada XML em um arquivo .xml, um .zip ou uma pasta."""
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.lower().endswith(('.xml', '.zip')):
+                    yield from iter_nfe_sources(os.path.join(root, name))
+    elif path.lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith('.xml'):
+                    continue
+                if info.file_size > MAX_XML_SIZE:
+                    yield info.filename, None
+                    continue
+                yield info.filename, archive.read(info)
+    else:
+        with open(path, 'rb') as file:
+            yield os.path.basename(path), file.read()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class NFeIngestor:
+    """
+    Importa NF-e de fornecedores em lotes.
+
+    A leitura dos XML roda em um pool de processos (`workers`); cada lote de
+    documentos lidos é gravado em uma transação com operações em massa:
+    o emitente vira um `Supplier` (criado pelo CNPJ; um já cadastrado só tem
+    os campos vazios e o endereço completados), cada `<det>` é associado a
+    um `Product` (pelo código de barras ou pelo código do fornecedor como
+    SKU) ou cria um novo, e os dados fiscais do item preenchem o
+    `ProductFiscalData`. Itens com dados fiscais inválidos são ignorados e
+    relatados em `errors`.
+    """
+
+    def __init__(self, company_id, workers=None, batch_size=BATCH_SIZE, on_batch=None):
+        self.company_id = company_id
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.documents = self.items = 0
+        self.created = self.updated = 0
+        self.errors = []
+
+    def run(self, sources):
+        self.units = RelatedMap(Unit.objects.filter(company_id=self.company_id, is_active=True), ('abbreviation', 'name'))
+        self.municipalities = get_index()
+
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for batch in batched(sources, self.batch_size):
+                self.process_batch(batch, pool)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        for model in (Supplier, Product):
+            recount(self.company_id, model)
+            bump_tenant_version(self.company_id, model_label(model))
+        # upsert em massa não dispara sinais: a valorização é refeita uma vez
+        rebuild_valuation([self.company_id])
+
+    def process_batch(self, batch, pool):
+        entries = []
+        for name, data in batch:
+            if data is None:
+                self.errors.append(f'{name}: arquivo maior que o limite de {MAX_XML_SIZE // 1024 // 1024} MB.')
+            else:
+                entries.append((name, data))
+
+        if pool:
+            chunksize = max(1, len(entries) // (self.workers * 4))
+            results = pool.map(parse_nfe_document, entries, chunksize=chunksize)
+        else:
+            results = map(parse_nfe_document, entries)
+
+        documents = []
+        for name, document, error in results:
+            if error:
+                self.errors.append(f'{name}: {error}')
+            else:
+                documents.append(document)
+
+        if documents:
+            with transaction.atomic():
+                self.write_batch(documents)
+            self.documents += len(documents)
+        if self.on_batch:
+            self.on_batch(self)
+
+    # Gravação
+
+    def upsert_suppliers(self, documents):
+        emitters = {document['emitter']['cpf_cnpj']: document['emitter'] for document in documents}
+        incoming = {}
+        for cpf_cnpj, emitter in emitters.items():
+            supplier = Supplier(
+                company_id=self.company_id,
+                cpf_cnpj=cpf_cnpj,
+                name=(emitter['name'] or cpf_cnpj)[:255],
+                trading_name=emitter['trading_name'],
+                state_registration=(emitter['state_registration'] or '')[:20] or None,
+                tax_regime=emitter['tax_regime'],
+                phone=(emitter['phone'] or '')[:15] or None,
+                person_type=Supplier.PERSON_TYPE.PJ if len(cpf_cnpj) == 14 else Supplier.PERSON_TYPE.PF,
+                partner_type=Supplier.PARTNER_TYPE.SUPPLIER,
+            )
+            supplier.refresh_search_text()
+            incoming[cpf_cnpj] = supplier
+
+        # Os já cadastrados não são sobrescritos: a nota só completa o que falta
+        Supplier.objects.bulk_create(incoming.values(), ignore_conflicts=True)
+        supplier_ids, without_address, to_fill = {}, [], []
+        now = timezone.now()
+        for supplier in Supplier.objects.filter(company_id=self.company_id, cpf_cnpj__in=emitters):
+            supplier_ids[supplier.cpf_cnpj] = supplier.pk
+            if supplier.address_id is None:
+                without_address.append((supplier.pk, emitters[supplier.cpf_cnpj]['address']))
+            blank = [
+                field for field in SUPPLIER_FILL_FIELDS
+                if not getattr(supplier, field) and getattr(incoming[supplier.cpf_cnpj], field)
+            ]
+            if blank:
+                for field in blank:
+                    setattr(supplier, field, getattr(incoming[supplier.cpf_cnpj], field))
+                supplier.refresh_search_text()
+                supplier.updated_at = now
+                to_fill.append(supplier)
+
+        if to_fill:
+            Supplier.objects.bulk_update(to_fill, [*SUPPLIER_FILL_FIELDS, 'search_text', 'updated_at'])
+        self.create_addresses(without_address)
+        return supplier_ids
+
+    def build_address(self, data):
+        """`Address` do `<enderEmit>`, com o município conferido no índice do IBGE."""
+        if not data or not data['street'] or not data['state']:
+            return None
+        state = data['state'].upper()
+        ibge_code = data['city_ibge_code']
+        try:
+            self.municipalities.validate(ibge_code or '', state)
+        except ValidationError:
+            ibge_code = self.municipalities.resolve(data['city_name'], state)
+        if not ibge_code:
+            return None
+        name = self.municipalities.get(ibge_code)
+        return Address(
+            street=data['street'][:255],
+            number=(data['number'] or 'S/N')[:20],
+            complement=(data['complement'] or '')[:60],
+            district=(data['district'] or '')[:80],
+            city_name=(name[0] if name else data['city_name'] or '')[:120],
+            city_ibge_code=ibge_code,
+            state=state,
+            postal_code=''.join(filter(str.isdigit, data['postal_code'] or ''))[:8],
+        )
+
+    def create_addresses(self, suppliers):
+        """Cria o endereço dos fornecedores que ainda não têm um."""
+        pending = []
+        for pk, data in suppliers:
+            address = self.build_address(data)
+            if address:
+                pending.append((pk, address))
+        if not pending:
+            return
+
+        # Endereços são compartilhados pelo conteúdo: reaproveita os existentes
+        for _, address in pending:
+            address.content_hash = address.compute_content_hash()
+        Address.objects.bulk_create([address for _, address in pending], ignore_conflicts=True)
+        address_ids = dict(
+            Address.objects.filter(content_hash__in=[address.content_hash for _, address in pending])
+            .values_list('content_hash', 'pk')
+        )
+        Supplier.objects.bulk_update(
+            [Supplier(pk=pk, address_id=address_ids[address.content_hash]) for pk, address in pending],
+            ['address'],
+        )
+
+    def clean_fiscal(self, item):
+        fiscal = {field: item[field] for field in FISCAL_FIELDS if item[field] is not None}
+        fiscal['ncm'] = clean_ncm(fiscal.get('ncm'))
+        fiscal['cest'] = clean_cest(fiscal.get('cest'))
+        fiscal['cfop'] = clean_cfop(fiscal.get('cfop'))
+        if not fiscal['ncm'] or not fiscal['cfop']:
+            raise ValidationError('NCM e CFOP são obrigatórios.')
+        return fiscal
+
+    def write_batch(self, documents):
+        supplier_ids = self.upsert_suppliers(documents)
+
+        # Um item por produto no lote: a última nota vence
+        items = {}
+        for document in documents:
+            supplier_id = supplier_ids[document['emitter']['cpf_cnpj']]
+            for item in document['items']:
+                self.items += 1
+                key = ('barcode', item['barcode']) if item['barcode'] else ('code', supplier_id, item['code'])
+                items[key] = (document, supplier_id, item)
+
+        barcodes = [key[1] for key in items if key[0] == 'barcode']
+        codes = [key[2] for key in items if key[0] == 'code']
+        existing = {}
+        queryset = Product.objects.filter(company_id=self.company_id, is_active=True).order_by('pk')
+        for product in queryset.filter(barcode__in=barcodes):
+            existing.setdefault(('barcode', product.barcode), product)
+        for product in queryset.filter(sku__in=codes, supplier_id__in=supplier_ids.values()):
+            existing.setdefault(('code', product.supplier_id, product.sku), product)
+
+        fiscal_ids = [product.fiscal_data_id for product in existing.values() if product.fiscal_data_id]
+        existing_fiscal = ProductFiscalData.objects.in_bulk(fiscal_ids) if fiscal_ids else {}
+
+        to_create, to_update, fiscal_to_update, new_fiscal = [], [], [], []
+        for key, (document, supplier_id, item) in items.items():
+            # Sem dados fiscais válidos o item não cria nem altera o produto
+            try:
+                fiscal = self.clean_fiscal(item)
+            except ValidationError as error:
+                self.errors.append(f"NF-e {document['key'] or document['number']}, item {item['number']}: {' '.join(error.messages)}")
+                continue
+
+            product = existing.get(key)
+            if product is None:
+                product = Product(
+                    company_id=self.company_id,
+                    name=(item['name'] or item['code'] or '')[:200],
+                    sku=(item['code'] or '')[:50] or None,
+                    barcode=item['barcode'],
+                    sale_price=item['unit_price'] or 0,
+                )
+                to_create.append(product)
+            else:
+                to_update.append(product)
+            product.supplier_id = supplier_id
+            product.cost_price = item['unit_price'] or product.cost_price
+            if item['unit'] and not product.unit_id:
+                product.unit_id = self.units.resolve(item['unit'])
+            product.refresh_search_text()
+
+            fiscal_data = existing_fiscal.get(product.fiscal_data_id)
+            if fiscal_data:
+                for field, value in fiscal.items():
+                    setattr(fiscal_data, field, value)
+                fiscal_to_update.append(fiscal_data)
+            else:
+                new_fiscal.append((product, ProductFiscalData(company_id=self.company_id, **fiscal)))
+
+        if new_fiscal:
+            ProductFiscalData.objects.bulk_create([fiscal for _, fiscal in new_fiscal])
+            for product, fiscal in new_fiscal:
+                product.fiscal_data_id = fiscal.pk
+
+        Product.objects.bulk_create(to_create)
+        upsert_by_pk(Product, to_update, ['supplier', 'cost_price', 'unit', 'fiscal_data', 'search_text', 'updated_at'])
+        upsert_by_pk(ProductFiscalData, fiscal_to_update, list(FISCAL_FIELDS))
+
+        self.created += len(to_create)
+        self.updated += len(to_update)
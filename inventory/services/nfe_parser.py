@@ -0,0 +1,170 @@
+"""
+Leitura de NF-e (procNFe/NFe) em fluxo com `iterparse`.
+
+Este módulo só usa a biblioteca padrão e devolve estruturas simples
+(dicts e strings), para poder rodar nos processos do pool de leitura sem
+carregar o Django.
+"""
+import io
+import xml.etree.ElementTree as ET
+from decimal import Decimal, InvalidOperation
+
+
+class NFeParseError(Exception):
+    """XML que não é uma NF-e válida."""
+
+
+# CRT (Código de Regime Tributário) do emitente -> PartnerBaseModel.TaxRegime
+CRT_TAX_REGIMES = {
+    '1': 'simples',
+    '2': 'simples_excesso',
+}
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _text(elem, path):
+    value = elem.findtext(path)
+    if value is None:
+        return None
+    return value.strip() or None
+
+
+def _decimal(value, places='0.01'):
+    if value is None:
+        return None
+    try:
+        return Decimal(value).quantize(Decimal(places))
+    except InvalidOperation:
+        return None
+
+
+def _first_child(elem, path):
+    group = elem.find(path)
+    if group is None or not len(group):
+        return None
+    return group[0]
+
+
+def _parse_emitter(emit):
+    return {
+        'cpf_cnpj': _text(emit, '{*}CNPJ') or _text(emit, '{*}CPF'),
+        'name': _text(emit, '{*}xNome'),
+        'trading_name': _text(emit, '{*}xFant'),
+        'state_registration': _text(emit, '{*}IE'),
+        'tax_regime': CRT_TAX_REGIMES.get(_text(emit, '{*}CRT')),
+        'phone': _text(emit, '{*}enderEmit/{*}fone'),
+        'address': _parse_address(emit.find('{*}enderEmit')),
+    }
+
+
+def _parse_address(ender):
+    if ender is None:
+        return None
+    return {
+        'street': _text(ender, '{*}xLgr'),
+        'number': _text(ender, '{*}nro'),
+        'complement': _text(ender, '{*}xCpl'),
+        'district': _text(ender, '{*}xBairro'),
+        'city_ibge_code': _text(ender, '{*}cMun'),
+        'city_name': _text(ender, '{*}xMun'),
+        'state': _text(ender, '{*}UF'),
+        'postal_code': _text(ender, '{*}CEP'),
+    }
+
+
+def _parse_item(det):
+    prod = det.find('{*}prod')
+    if prod is None:
+        raise NFeParseError('Item sem <prod>.')
+
+    barcode = _text(prod, '{*}cEAN')
+    if barcode and not barcode.isdigit():
+        barcode = None  # "SEM GTIN"
+
+    item = {
+        'number': det.get('nItem'),
+        'code': _text(prod, '{*}cProd'),
+        'barcode': barcode,
+        'name': _text(prod, '{*}xProd'),
+        'ncm': _text(prod, '{*}NCM'),
+        'cest': _text(prod, '{*}CEST'),
+        'cfop': _text(prod, '{*}CFOP'),
+        'unit': _text(prod, '{*}uCom'),
+        'quantity': _decimal(_text(prod, '{*}qCom'), '0.0001'),
+        'unit_price': _decimal(_text(prod, '{*}vUnCom')),
+        'origin': None,
+        'cst_icms': None,
+        'icms_aliquota': None,
+        'cst_pis': None,
+        'pis_aliquota': None,
+        'cst_cofins': None,
+        'cofins_aliquota': None,
+    }
+
+    # <ICMS> tem um único filho (ICMS00, ICMS20, ICMSSN102...); idem PIS/COFINS
+    icms = _first_child(det, '{*}imposto/{*}ICMS')
+    if icms is not None:
+        item['origin'] = _text(icms, '{*}orig')
+        item['cst_icms'] = _text(icms, '{*}CST') or _text(icms, '{*}CSOSN')
+        item['icms_aliquota'] = _decimal(_text(icms, '{*}pICMS'))
+    pis = _first_child(det, '{*}imposto/{*}PIS')
+    if pis is not None:
+        item['cst_pis'] = _text(pis, '{*}CST')
+        item['pis_aliquota'] = _decimal(_text(pis, '{*}pPIS'))
+    cofins = _first_child(det, '{*}imposto/{*}COFINS')
+    if cofins is not None:
+        item['cst_cofins'] = _text(cofins, '{*}CST')
+        item['cofins_aliquota'] = _decimal(_text(cofins, '{*}pCOFINS'))
+    return item
+
+
+def parse_nfe(source):
+    """
+    Lê uma NF-e de um arquivo (caminho ou objeto binário) e retorna
+    `{'key', 'number', 'emitter', 'items'}`.
+
+    Os elementos `<det>` são descartados da árvore assim que lidos, então a
+    memória não depende da quantidade de itens da nota.
+    """
+    document = {'key': None, 'number': None, 'emitter': None, 'items': []}
+    try:
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            tag = _local(elem.tag)
+            if event == 'start':
+                if tag == 'infNFe':
+                    document['key'] = (elem.get('Id') or '').removeprefix('NFe') or None
+                continue
+
+            if tag == 'nNF':
+                document['number'] = (elem.text or '').strip()
+            elif tag == 'emit':
+                document['emitter'] = _parse_emitter(elem)
+                elem.clear()
+            elif tag == 'det':
+                document['items'].append(_parse_item(elem))
+                elem.clear()
+            elif tag in ('dest', 'transp', 'cobr', 'pag', 'infAdic', 'Signature'):
+                elem.clear()
+            elif tag == 'chNFe' and elem.text:
+                document['key'] = elem.text.strip()
+    except ET.ParseError as error:
+        raise NFeParseError(f'XML inválido: {error}')
+
+    if not document['emitter'] or not document['emitter']['cpf_cnpj']:
+        raise NFeParseError('Emitente (<emit>) não encontrado.')
+    return document
+
+
+def parse_nfe_document(entry):
+    """
+    Alvo do pool de processos: recebe `(nome, bytes)` e retorna
+    `(nome, documento, erro)`.
+    """
+    name, data = entry
+    try:
+        return name, parse_nfe(io.BytesIO(data)), None
+    except NFeParseError as error:
+        return name, None, str(error)
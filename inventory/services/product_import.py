@@ -0,0 +1,401 @@
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import CharField, DecimalField, IntegerField, TextField
+from django.utils import timezone
+
+from core.bulk import upsert_by_pk
+from core.cache import bump_tenant_version
+from core.counters import model_label, recount
+from core.imports import ErrorReport, ImportFileError, open_rows, parse_decimal
+from core.models.imports import ImportJob
+from core.search import normalize_search_text
+from inventory.models.category import Category
+from inventory.models.product import Product, ProductFiscalData
+from inventory.models.stock import StockMovement
+from inventory.models.units import Unit
+from inventory.services.stock import post_movements
+from inventory.services.valuation import rebuild_valuation
+from inventory.validators import (
+    clean_cest,
+    clean_cfop,
+    clean_ncm,
+    only_digits,
+    validate_cost_price,
+    validate_sale_price,
+    validate_stock_quantity,
+)
+from partners.models.suppliers import Supplier
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# Importação em andamento sem sinal de vida (um lote gravado) por mais que
+# isso é dada como interrompida: o processo que a rodava morreu
+STALE_AFTER = timedelta(minutes=getattr(settings, 'IMPORT_STALE_MINUTES', 15))
+
+PRODUCT_FIELDS = ('name', 'description', 'sku', 'barcode', 'cost_price', 'sale_price', 'stock_quantity')
+RELATED_FIELDS = ('category', 'unit', 'supplier')
+FISCAL_FIELDS = (
+    'ncm', 'cest', 'cfop', 'origin', 'cst_icms', 'cst_pis', 'cst_cofins',
+    'icms_aliquota', 'pis_aliquota', 'cofins_aliquota',
+)
+REQUIRED_COLUMNS = ('name', 'sale_price')
+
+# Cabeçalhos aceitos além dos nomes dos campos (já normalizados)
+COLUMN_ALIASES = {
+    'nome': 'name',
+    'produto': 'name',
+    'descricao': 'description',
+    'codigo': 'sku',
+    'referencia': 'sku',
+    'codigo_de_barras': 'barcode',
+    'ean': 'barcode',
+    'gtin': 'barcode',
+    'preco_de_custo': 'cost_price',
+    'custo': 'cost_price',
+    'preco_de_venda': 'sale_price',
+    'preco': 'sale_price',
+    'estoque': 'stock_quantity',
+    'quantidade': 'stock_quantity',
+    'categoria': 'category',
+    'unidade': 'unit',
+    'fornecedor': 'supplier',
+    'origem': 'origin',
+    'aliquota_icms': 'icms_aliquota',
+    'aliquota_pis': 'pis_aliquota',
+    'aliquota_cofins': 'cofins_aliquota',
+}
+
+# Mesmas regras de ProductDataForm/ProductTaxForm
+FIELD_CLEANERS = {
+    'ncm': clean_ncm,
+    'cest': clean_cest,
+    'cfop': clean_cfop,
+}
+FIELD_VALIDATORS = {
+    'sale_price': validate_sale_price,
+    'cost_price': validate_cost_price,
+    'stock_quantity': validate_stock_quantity,
+}
+
+
+class RelatedMap:
+    """
+    Mapa em memória (chave normalizada -> pk) para resolver uma chave
+    estrangeira pelo nome ou código sem consultar o banco a cada linha.
+    """
+
+    def __init__(self, queryset, fields, digit_fields=()):
+        self.keys = {}
+        for pk, *values in queryset.values_list('pk', *fields).order_by('pk').iterator(chunk_size=5000):
+            self.keys.setdefault(str(pk), pk)
+            for field, value in zip(fields, values):
+                if not value:
+                    continue
+                key = only_digits(value) if field in digit_fields else normalize_search_text(value)
+                self.keys.setdefault(key, pk)
+
+    def resolve(self, value):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        value = str(value).strip()
+        return self.keys.get(normalize_search_text(value)) or self.keys.get(only_digits(value) or None)
+
+
+class ProductImporter:
+    """
+    Importa produtos (e seus dados fiscais) de um fluxo de linhas.
+
+    As linhas são validadas campo a campo com as regras dos formulários,
+    sem instanciar um formulário por linha, e gravadas em lotes de
+    `batch_size` com bulk_create/bulk_update, um lote por transação.
+    Produtos são atualizados quando o SKU já existe na empresa; um SKU
+    repetido no arquivo rejeita as linhas seguintes, seja qual for o lote.
+    Além do lote corrente ficam carregados só os mapas de categorias,
+    unidades e fornecedores e os SKUs já lidos.
+    """
+
+    def __init__(self, company_id, batch_size=BATCH_SIZE, on_batch=None):
+        self.company_id = company_id
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.total = self.created = self.updated = 0
+        # SKU -> linha em que apareceu primeiro
+        self.seen_skus = {}
+
+    def load_maps(self):
+        active = {'company_id': self.company_id, 'is_active': True}
+        self.maps = {
+            'category': RelatedMap(Category.objects.filter(**active), ('name', 'slug')),
+            'unit': RelatedMap(Unit.objects.filter(**active), ('abbreviation', 'name')),
+            'supplier': RelatedMap(
+                Supplier.objects.filter(**active),
+                ('cpf_cnpj', 'name', 'trading_name'),
+                digit_fields=('cpf_cnpj',),
+            ),
+        }
+
+    def run(self, columns, rows, report):
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ImportFileError(f"Colunas obrigatórias ausentes: {', '.join(missing)}.")
+
+        self.product_columns = [field for field in PRODUCT_FIELDS if field in columns]
+        self.related_columns = [field for field in RELATED_FIELDS if field in columns]
+        self.fiscal_columns = [field for field in FISCAL_FIELDS if field in columns]
+        self.report = report
+        self.load_maps()
+
+        batch = []
+        for number, row in rows:
+            self.total += 1
+            parsed = self.parse_row(number, row)
+            if parsed is not None:
+                batch.append(parsed)
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+
+        recount(self.company_id, Product)
+        bump_tenant_version(self.company_id, model_label(Product))
+        # upsert em massa não dispara sinais: a valorização é refeita uma vez
+        rebuild_valuation([self.company_id])
+
+    # Validação
+
+    def clean_value(self, model, name, value):
+        field = model._meta.get_field(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            if field.has_default():
+                return field.get_default()
+            if not field.blank:
+                raise ValidationError('Este campo é obrigatório.')
+            return None if field.null else ''
+
+        if isinstance(value, float) and value.is_integer() and isinstance(field, (CharField, TextField, IntegerField)):
+            value = int(value)
+        if isinstance(field, (CharField, TextField)):
+            value = str(value)
+        elif isinstance(field, DecimalField):
+            value = parse_decimal(value)
+
+        if name in FIELD_CLEANERS:
+            value = FIELD_CLEANERS[name](value)
+        value = field.clean(value, None)
+        if name in FIELD_VALIDATORS:
+            FIELD_VALIDATORS[name](value)
+        return value
+
+    def parse_row(self, number, row):
+        errors = []
+        product, related, fiscal = {}, {}, {}
+
+        for name in self.product_columns:
+            try:
+                product[name] = self.clean_value(Product, name, row.get(name))
+            except ValidationError as error:
+                errors.append(f"{name}: {' '.join(error.messages)}")
+
+        for name in self.related_columns:
+            value = row.get(name)
+            if value in (None, ''):
+                related[f'{name}_id'] = None
+                continue
+            pk = self.maps[name].resolve(value)
+            if pk is None:
+                errors.append(f'{name}: "{value}" não encontrado.')
+            related[f'{name}_id'] = pk
+
+        # Dados fiscais só são gravados quando a linha traz algum deles
+        if any(row.get(name) not in (None, '') for name in self.fiscal_columns):
+            for name in self.fiscal_columns:
+                try:
+                    fiscal[name] = self.clean_value(ProductFiscalData, name, row.get(name))
+                except ValidationError as error:
+                    errors.append(f"{name}: {' '.join(error.messages)}")
+
+        sku = product.get('sku')
+        if sku and not errors:
+            first = self.seen_skus.setdefault(sku, number)
+            if first != number:
+                errors.append(f'sku: "{sku}" repetido no arquivo (linha {first}).')
+
+        if errors:
+            self.report.add(number, row, errors)
+            return None
+        return number, row, product, related, fiscal
+
+    # Gravação
+
+    def flush(self, batch):
+        try:
+            with transaction.atomic():
+                created, updated = self.write_batch(batch)
+        except DatabaseError as error:
+            logger.exception('Falha ao gravar lote da importação de produtos')
+            for number, row, *_ in batch:
+                self.report.add(number, row, [f'Erro ao gravar o lote: {error}'])
+        else:
+            self.created += created
+            self.updated += updated
+        if self.on_batch:
+            self.on_batch(self)
+
+    def write_batch(self, batch):
+        skus = {product['sku'] for _, _, product, _, _ in batch if product.get('sku')}
+        existing = {}
+        # Travados até o fim do lote: o estoque importado vira um ajuste
+        # calculado sobre o saldo atual
+        queryset = Product.objects.select_for_update().filter(company_id=self.company_id, is_active=True, sku__in=skus)
+        for product in queryset.order_by('pk'):
+            existing.setdefault(product.sku, product)
+
+        fiscal_ids = [product.fiscal_data_id for product in existing.values() if product.fiscal_data_id]
+        existing_fiscal = ProductFiscalData.objects.in_bulk(fiscal_ids) if self.fiscal_columns and fiscal_ids else {}
+
+        to_create, to_update, fiscal_to_update = [], [], []
+        new_fiscal = []  # (produto, dados fiscais) ainda sem pk
+        stock = []  # (produto, quantidade importada, saldo atual)
+
+        for number, row, values, related, fiscal in batch:
+            sku = values.get('sku')
+            product = existing.get(sku) if sku else None
+            is_update = product is not None
+            if not is_update:
+                product = Product(company_id=self.company_id)
+            values = dict(values)
+            if 'stock_quantity' in values:
+                stock.append((product, values.pop('stock_quantity') or 0, product.stock_quantity))
+            for field, value in {**values, **related}.items():
+                setattr(product, field, value)
+            product.refresh_search_text()
+
+            if fiscal:
+                fiscal_data = existing_fiscal.get(product.fiscal_data_id)
+                if fiscal_data:
+                    for field, value in fiscal.items():
+                        setattr(fiscal_data, field, value)
+                    fiscal_to_update.append(fiscal_data)
+                else:
+                    new_fiscal.append((product, ProductFiscalData(company_id=self.company_id, **fiscal)))
+            (to_update if is_update else to_create).append(product)
+
+        if new_fiscal:
+            ProductFiscalData.objects.bulk_create([fiscal for _, fiscal in new_fiscal])
+            for product, fiscal in new_fiscal:
+                product.fiscal_data_id = fiscal.pk
+
+        Product.objects.bulk_create(to_create)
+        fields = [field for field in self.product_columns if field != 'stock_quantity']
+        fields += [*self.related_columns, 'search_text', 'updated_at']
+        if self.fiscal_columns:
+            fields.append('fiscal_data')
+        upsert_by_pk(Product, to_update, fields)
+        upsert_by_pk(ProductFiscalData, fiscal_to_update, self.fiscal_columns)
+
+        post_movements(self.company_id, [
+            StockMovement(
+                product=product,
+                kind=StockMovement.Kind.ADJUST,
+                reason=StockMovement.Reason.IMPORT,
+                quantity=quantity - current,
+            )
+            for product, quantity, current in stock
+            if quantity != current and product.pk
+        ])
+
+        return len(to_create), len(to_update)
+
+
+def run_import_job(job, batch_size=BATCH_SIZE, encoding='utf-8-sig'):
+    """Executa uma `ImportJob` de produtos e grava o resultado e o relatório de erros."""
+
+    def save_progress(importer):
+        ImportJob.objects.filter(pk=job.pk).update(
+            total_rows=importer.total,
+            created_count=importer.created,
+            updated_count=importer.updated,
+            error_count=importer.report.count,
+            updated_at=timezone.now(),
+        )
+
+    job.status = 'running'
+    job.save(update_fields=['status'])
+    importer = ProductImporter(job.company_id, batch_size=batch_size, on_batch=save_progress)
+    report = None
+    try:
+        with job.file.open('rb') as file:
+            columns, rows = open_rows(file, os.path.basename(job.file.name), COLUMN_ALIASES, encoding=encoding)
+            report = ErrorReport(columns)
+            importer.run(columns, rows, report)
+    except ImportFileError as error:
+        job.status = 'failed'
+        job.message = str(error)
+    except Exception:
+        logger.exception('Falha na importação de produtos #%s', job.pk)
+        job.status = 'failed'
+        job.message = 'Erro inesperado ao processar o arquivo.'
+    else:
+        job.status = 'done'
+
+    job.total_rows = importer.total
+    job.created_count = importer.created
+    job.updated_count = importer.updated
+    if report is not None:
+        job.error_count = report.count
+        if report.count:
+            report.save(job.error_report, f'erros_importacao_{job.pk}.csv')
+        report.close()
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def fail_stale_jobs(now=None):
+    """Marca como falhas as importações interrompidas (ver `STALE_AFTER`)."""
+    now = now or timezone.now()
+    return ImportJob.objects.filter(
+        kind='products',
+        status='running',
+        updated_at__lt=now - STALE_AFTER,
+    ).update(
+        status='failed',
+        message='A importação foi interrompida. Envie o arquivo novamente.',
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def claim_next_job():
+    """
+    Próxima importação da fila, já marcada como 'running'. O UPDATE
+    condicional garante que dois processos nunca peguem a mesma.
+    """
+    pending = ImportJob.objects.filter(kind='products', status='pending').order_by('created_at', 'pk')
+    for pk in pending.values_list('pk', flat=True)[:10]:
+        if ImportJob.objects.filter(pk=pk, status='pending').update(status='running', updated_at=timezone.now()):
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def run_pending_jobs(batch_size=BATCH_SIZE, on_job=None):
+    """Processa a fila de importações enviadas pela tela (comando `import_products --pending`)."""
+    fail_stale_jobs()
+    count = 0
+    while (job := claim_next_job()) is not None:
+        run_import_job(job, batch_size=batch_size)
+        count += 1
+        if on_job:
+            on_job(job)
+    return count
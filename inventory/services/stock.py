@@ -0,0 +1,195 @@
+"""
+Lançamentos de estoque.
+
+O saldo (`Product.stock_quantity`) só muda por aqui: cada lançamento grava
+a movimentação no razão e soma a variação ao saldo com `F()`, no próprio
+UPDATE. Edições concorrentes somam em vez de sobrescrever, e os produtos
+são travados em ordem de id antes de gravar o razão para evitar deadlocks
+entre lançamentos simultâneos.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.cache import bump_tenant_version
+from inventory.models.product import Product
+from inventory.models.stock import StockMovement, StockSnapshot
+from inventory.services.valuation import stock_changed
+
+
+BATCH_SIZE = 1000
+
+# Produtos por UPDATE (cada um vira um WHEN no CASE)
+UPDATE_CHUNK = 500
+
+EPOCH = datetime(1900, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def signed_quantity(kind, quantity):
+    """Entradas somam, saídas subtraem; ajustes mantêm o sinal informado."""
+    if kind == StockMovement.Kind.IN:
+        return abs(quantity)
+    if kind == StockMovement.Kind.OUT:
+        return -abs(quantity)
+    return quantity
+
+
+def _chunks(values, size):
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def apply_deltas(deltas):
+    """
+    Soma `{produto: variação}` aos saldos. Os produtos são travados em
+    ordem de id e atualizados com um UPDATE por bloco de `UPDATE_CHUNK`.
+    Deve rodar dentro de uma transação; a valorização do estoque é
+    ajustada na mesma transação.
+    """
+    for chunk in _chunks(sorted(pk for pk, delta in deltas.items() if delta), UPDATE_CHUNK):
+        rows = list(
+            Product.objects.select_for_update().filter(pk__in=chunk).order_by('pk')
+            .values_list('pk', 'company_id', 'category_id', 'supplier_id', 'cost_price', 'is_active')
+        )
+        Product.objects.filter(pk__in=chunk).update(stock_quantity=F('stock_quantity') + Case(
+            *(When(pk=pk, then=Value(deltas[pk])) for pk in chunk),
+            output_field=IntegerField(),
+        ))
+        stock_changed(rows, deltas)
+
+
+def post_movements(company_id, movements, user=None, batch_size=BATCH_SIZE):
+    """
+    Lança `StockMovement`s ainda não salvos (produto, tipo, quantidade,
+    motivo, referência) da empresa em uma transação: grava o razão em
+    lotes com bulk_create e atualiza os saldos de uma vez por produto.
+
+    Movimentações retroativas invalidam os retratos de saldo posteriores a
+    elas, que são refeitos pelo `snapshot_stock`.
+    """
+    movements = list(movements)
+    if not movements:
+        return []
+
+    deltas = defaultdict(int)
+    oldest = None
+    for movement in movements:
+        movement.company_id = company_id
+        movement.created_by = movement.created_by or user
+        movement.quantity = signed_quantity(movement.kind, movement.quantity)
+        movement.occurred_at = movement.occurred_at or timezone.now()
+        deltas[movement.product_id] += movement.quantity
+        oldest = min(oldest or movement.occurred_at, movement.occurred_at)
+
+    with transaction.atomic():
+        # Trava os produtos em ordem de id antes de gravar o razão: as chaves
+        # estrangeiras do INSERT travariam as linhas em ordem qualquer e
+        # lançamentos simultâneos entrariam em deadlock
+        product_ids = set(
+            Product.objects.select_for_update()
+            .filter(company_id=company_id, pk__in=deltas)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        missing = set(deltas) - product_ids
+        if missing:
+            raise ValueError(f'Produtos de outra empresa ou inexistentes: {sorted(missing)}')
+
+        StockMovement.objects.bulk_create(movements, batch_size=batch_size)
+        apply_deltas(deltas)
+        StockSnapshot.objects.filter(product_id__in=deltas, taken_at__gte=oldest).delete()
+
+    # O saldo faz parte do produto: listagens e caches de produtos também mudam
+    bump_tenant_version(company_id, 'inventory.stockmovement')
+    bump_tenant_version(company_id, 'inventory.product')
+    return movements
+
+
+def set_stock(company_id, counts, reason=StockMovement.Reason.COUNT, reference='', user=None):
+    """
+    Ajusta os saldos para as quantidades contadas (`{produto: quantidade}`),
+    lançando a diferença de cada produto. Os saldos atuais são lidos com
+    os produtos travados, então lançamentos concorrentes não se perdem.
+    """
+    with transaction.atomic():
+        current = dict(
+            Product.objects.select_for_update()
+            .filter(company_id=company_id, pk__in=counts)
+            .order_by('pk')
+            .values_list('pk', 'stock_quantity')
+        )
+        movements = [
+            StockMovement(
+                product_id=pk,
+                kind=StockMovement.Kind.ADJUST,
+                reason=reason,
+                reference=reference,
+                quantity=counts[pk] - quantity,
+            )
+            for pk, quantity in current.items()
+            if counts[pk] != quantity
+        ]
+        return post_movements(company_id, movements, user=user)
+
+
+def stock_as_of(company_id, when, product_ids=None):
+    """
+    Saldo `{produto: quantidade}` na data `when`: o último retrato até a
+    data mais os lançamentos entre o retrato e a data, em uma consulta.
+    """
+    snapshots = StockSnapshot.objects.filter(product=OuterRef('pk'), taken_at__lte=when).order_by('-taken_at')
+    movements = (
+        StockMovement.objects
+        .filter(
+            product=OuterRef('pk'),
+            occurred_at__lte=when,
+            occurred_at__gt=Coalesce(OuterRef('snapshot_at'), Value(EPOCH)),
+        )
+        .order_by()
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    queryset = Product.objects.filter(company_id=company_id)
+    if product_ids is not None:
+        queryset = queryset.filter(pk__in=product_ids)
+    queryset = queryset.annotate(
+        snapshot_at=Subquery(snapshots.values('taken_at')[:1]),
+    ).annotate(
+        balance=(
+            Coalesce(Subquery(snapshots.values('quantity')[:1]), 0)
+            + Coalesce(Subquery(movements, output_field=IntegerField()), 0)
+        ),
+    )
+    return dict(queryset.order_by().values_list('pk', 'balance'))
+
+
+def take_snapshots(company_id, taken_at, batch_size=BATCH_SIZE):
+    """
+    Grava em `taken_at` o saldo dos produtos da empresa movimentados desde
+    o último retrato; para os demais, o retrato anterior continua valendo.
+    """
+    since = StockSnapshot.objects.filter(company_id=company_id, taken_at__lte=taken_at).aggregate(
+        last=Max('taken_at'),
+    )['last']
+    changed = StockMovement.objects.filter(
+        company_id=company_id,
+        occurred_at__lte=taken_at,
+        occurred_at__gt=since or EPOCH,
+    ).values('product_id')
+    balances = stock_as_of(company_id, taken_at, product_ids=changed)
+    StockSnapshot.objects.bulk_create(
+        [
+            StockSnapshot(company_id=company_id, product_id=pk, taken_at=taken_at, quantity=quantity)
+            for pk, quantity in balances.items()
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    return len(balances)
@@ -0,0 +1,237 @@
+"""
+Cálculo de ICMS, PIS e COFINS de documentos com muitos itens.
+
+Os valores trafegam como inteiros: dinheiro em centavos, quantidades em
+milésimos e alíquotas em pontos-base (18,00% = 1800). O cálculo roda em
+`array`s de inteiros, sem `Decimal` por item; a conversão para `Decimal`
+só acontece na borda (`TaxLine` na entrada e `TaxResult` na saída).
+"""
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+
+from django.core.cache import cache
+
+from core.cache import get_tenant_version, tenant_cache_key
+from inventory.models.product import Product
+from partners.models.customers import Customer
+
+
+# CSTs/CSOSNs sem destaque do imposto (isenção, não incidência, ST
+# cobrada anteriormente, Simples Nacional sem permissão de crédito...)
+ICMS_UNTAXED_CSTS = frozenset({
+    '40', '41', '50', '60',
+    '101', '102', '103', '201', '202', '203', '300', '400', '500',
+})
+PIS_COFINS_UNTAXED_CSTS = frozenset({'04', '05', '06', '07', '08', '09'})
+
+RATE_TABLE_TIMEOUT = 60 * 60
+
+
+def to_basis_points(rate, cst=None, untaxed=frozenset()):
+    """Alíquota percentual -> pontos-base (0 quando o CST não tributa)."""
+    if rate is None or cst in untaxed:
+        return 0
+    return int((Decimal(rate) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def to_cents(value):
+    return int((Decimal(value) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def to_thousandths(value):
+    return int((Decimal(value) * 1000).to_integral_value(ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def compute_line_taxes(quantity, unit_price, icms_bp, pis_bp, cofins_bp, exempt):
+    """
+    Núcleo do cálculo sobre arrays de inteiros (mesmo tamanho):
+    `quantity` em milésimos, `unit_price` em centavos, alíquotas em
+    pontos-base e `exempt` (0/1) para clientes isentos.
+
+    Arredondamento: meio para cima, no centavo, por item. Seguindo o Tema 69
+    do STF, o ICMS destacado é excluído da base do PIS/COFINS.
+
+    Retorna arrays de centavos `(base, icms, pis_cofins_base, pis, cofins)`.
+    Os casos calculados à mão estão em `inventory/tests.py`.
+    """
+    base = array('q', [(q * p + 500) // 1000 for q, p in zip(quantity, unit_price)])
+    icms = array('q', [
+        0 if ex else (b * r + 5000) // 10000
+        for b, r, ex in zip(base, icms_bp, exempt)
+    ])
+    pis_cofins_base = array('q', [
+        0 if ex else b - v
+        for b, v, ex in zip(base, icms, exempt)
+    ])
+    pis = array('q', [(b * r + 5000) // 10000 for b, r in zip(pis_cofins_base, pis_bp)])
+    cofins = array('q', [(b * r + 5000) // 10000 for b, r in zip(pis_cofins_base, cofins_bp)])
+    return base, icms, pis_cofins_base, pis, cofins
+
+
+class RateTable:
+    """
+    Tabela de alíquotas da empresa em formato compacto: ids de produto
+    ordenados (`array('q')`) apontando para perfis distintos
+    `(icms, pis, cofins)` em pontos-base. Serializa rápido para o cache e
+    a busca é por bisseção.
+    """
+
+    def __init__(self, product_ids, profile_index, profiles):
+        self.product_ids = product_ids
+        self.profile_index = profile_index
+        self.profiles = profiles
+
+    @classmethod
+    def build(cls, company_id):
+        profiles = [(0, 0, 0)]
+        positions = {(0, 0, 0): 0}
+        product_ids, profile_index = array('q'), array('l')
+        queryset = Product.objects.filter(
+            company_id=company_id,
+            fiscal_data__isnull=False,
+        ).order_by('pk').values_list(
+            'pk',
+            'fiscal_data__cst_icms', 'fiscal_data__icms_aliquota',
+            'fiscal_data__cst_pis', 'fiscal_data__pis_aliquota',
+            'fiscal_data__cst_cofins', 'fiscal_data__cofins_aliquota',
+        )
+        for pk, cst_icms, icms, cst_pis, pis, cst_cofins, cofins in queryset.iterator(chunk_size=5000):
+            profile = (
+                to_basis_points(icms, cst_icms, ICMS_UNTAXED_CSTS),
+                to_basis_points(pis, cst_pis, PIS_COFINS_UNTAXED_CSTS),
+                to_basis_points(cofins, cst_cofins, PIS_COFINS_UNTAXED_CSTS),
+            )
+            if profile not in positions:
+                positions[profile] = len(profiles)
+                profiles.append(profile)
+            product_ids.append(pk)
+            profile_index.append(positions[profile])
+        return cls(product_ids, profile_index, profiles)
+
+    def lookup(self, product_ids):
+        """Arrays `(icms, pis, cofins)` em pontos-base para os produtos informados."""
+        known, index, profiles = self.product_ids, self.profile_index, self.profiles
+        size = len(known)
+        rows = []
+        for pk in product_ids:
+            position = bisect_left(known, pk)
+            found = position < size and known[position] == pk
+            rows.append(profiles[index[position]] if found else profiles[0])
+        icms, pis, cofins = zip(*rows) if rows else ((), (), ())
+        return array('q', icms), array('q', pis), array('q', cofins)
+
+
+# Última tabela lida por empresa neste processo, válida enquanto a chave
+# de cache (que embute as versões) não mudar.
+_local_tables = {}
+
+
+def get_rate_table(company_id):
+    """Tabela de alíquotas cacheada, invalidada por alterações em produtos ou dados fiscais."""
+    key = tenant_cache_key(
+        company_id,
+        'inventory.productfiscaldata',
+        'tax_rates',
+        get_tenant_version(company_id, 'inventory.product'),
+    )
+    local = _local_tables.get(company_id)
+    if local and local[0] == key:
+        return local[1]
+
+    table = cache.get(key)
+    if table is None:
+        table = RateTable.build(company_id)
+        cache.set(key, table, RATE_TABLE_TIMEOUT)
+    _local_tables[company_id] = (key, table)
+    return table
+
+
+@dataclass(frozen=True)
+class TaxLine:
+    """Item de um documento: produto (id ou instância), quantidade, preço unitário e cliente."""
+    product: Any
+    quantity: Any
+    unit_price: Any
+    customer: Any = None
+
+
+class TaxResult:
+    """Resultado em centavos por item, com totais e conversão para `Decimal`."""
+
+    def __init__(self, base, icms, pis_cofins_base, pis, cofins, icms_base):
+        self.base = base
+        self.icms_base = icms_base
+        self.icms = icms
+        self.pis_cofins_base = pis_cofins_base
+        self.pis = pis
+        self.cofins = cofins
+
+    def __len__(self):
+        return len(self.base)
+
+    @property
+    def totals(self):
+        return {
+            'base': from_cents(sum(self.base)),
+            'icms_base': from_cents(sum(self.icms_base)),
+            'icms': from_cents(sum(self.icms)),
+            'pis_cofins_base': from_cents(sum(self.pis_cofins_base)),
+            'pis': from_cents(sum(self.pis)),
+            'cofins': from_cents(sum(self.cofins)),
+        }
+
+    def line(self, index):
+        return {
+            'base': from_cents(self.base[index]),
+            'icms_base': from_cents(self.icms_base[index]),
+            'icms': from_cents(self.icms[index]),
+            'pis_cofins_base': from_cents(self.pis_cofins_base[index]),
+            'pis': from_cents(self.pis[index]),
+            'cofins': from_cents(self.cofins[index]),
+        }
+
+    def lines(self):
+        return [self.line(index) for index in range(len(self))]
+
+
+def calculate_taxes_cents(company_id, product_ids, quantity, unit_price, exempt):
+    """Cálculo a partir de arrays já convertidos (ver `compute_line_taxes`)."""
+    icms_bp, pis_bp, cofins_bp = get_rate_table(company_id).lookup(product_ids)
+    base, icms, pis_cofins_base, pis, cofins = compute_line_taxes(
+        quantity, unit_price, icms_bp, pis_bp, cofins_bp, exempt,
+    )
+    icms_base = array('q', [0 if ex or not r else b for b, r, ex in zip(base, icms_bp, exempt)])
+    return TaxResult(base, icms, pis_cofins_base, pis, cofins, icms_base)
+
+
+def calculate_taxes(company_id, lines):
+    """
+    Calcula ICMS/PIS/COFINS de uma lista de `TaxLine` da empresa.
+
+    Faz no máximo uma consulta (clientes isentos) além da leitura da tabela
+    de alíquotas, que normalmente vem do cache.
+    """
+    lines = list(lines)
+    customer_ids = {getattr(line.customer, 'pk', line.customer) for line in lines} - {None}
+    exempt_ids = set()
+    if customer_ids:
+        exempt_ids = set(
+            Customer.objects.filter(company_id=company_id, pk__in=customer_ids, is_exempt=True)
+            .values_list('pk', flat=True)
+        )
+
+    product_ids = array('q', [getattr(line.product, 'pk', line.product) for line in lines])
+    quantity = array('q', [to_thousandths(line.quantity) for line in lines])
+    unit_price = array('q', [to_cents(line.unit_price) for line in lines])
+    exempt = array('b', [getattr(line.customer, 'pk', line.customer) in exempt_ids for line in lines])
+    if any(value < 0 for value in quantity) or any(value < 0 for value in unit_price):
+        raise ValueError('Quantidade e preço unitário não podem ser negativos.')
+
+    return calculate_taxes_cents(company_id, product_ids, quantity, unit_price, exempt)
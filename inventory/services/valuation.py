@@ -0,0 +1,238 @@
+"""
+Valorização do estoque por categoria e fornecedor.
+
+Cada produto ativo contribui com `(1, quantidade, custo * quantidade)` para
+o grupo `(categoria, fornecedor)`. Alterações somam a diferença entre a
+contribuição anterior e a nova com `F()`, sem reagregar a tabela de
+produtos; `rebuild_valuation` refaz tudo com um GROUP BY.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import Coalesce
+
+from inventory.models.product import Product
+from inventory.models.valuation import InventoryValuation
+
+
+ZERO = Decimal('0.00')
+
+TRACKED = ('is_active', 'category_id', 'supplier_id', 'cost_price', 'stock_quantity')
+
+
+def contribution(is_active, cost_price, stock_quantity):
+    if not is_active:
+        return (0, 0, ZERO)
+    stock_quantity = stock_quantity or 0
+    return (1, stock_quantity, Decimal(cost_price or 0) * stock_quantity)
+
+
+def add_delta(deltas, category_id, supplier_id, count, quantity, value):
+    delta = deltas[(category_id, supplier_id)]
+    delta[0] += count
+    delta[1] += quantity
+    delta[2] += value
+
+
+def adjust_valuation(company_id, deltas):
+    """
+    Aplica `{(categoria, fornecedor): [produtos, quantidade, valor]}` aos
+    grupos da empresa: um UPDATE com `F()` por grupo, criando o grupo
+    quando ele ainda não existe.
+    """
+    for (category_id, supplier_id), (count, quantity, value) in deltas.items():
+        if not count and not quantity and not value:
+            continue
+        bucket_key = InventoryValuation.make_bucket_key(category_id, supplier_id)
+        changes = {
+            'product_count': F('product_count') + count,
+            'stock_quantity': F('stock_quantity') + quantity,
+            'total_cost': F('total_cost') + value,
+        }
+        queryset = InventoryValuation.objects.filter(company_id=company_id, bucket_key=bucket_key)
+        if queryset.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                InventoryValuation.objects.create(
+                    company_id=company_id,
+                    bucket_key=bucket_key,
+                    category_id=category_id,
+                    supplier_id=supplier_id,
+                    product_count=count,
+                    stock_quantity=quantity,
+                    total_cost=value,
+                )
+        except IntegrityError:
+            queryset.update(**changes)
+
+
+def adjust_valuation_bulk(company_id, deltas, batch_size=1000):
+    """
+    `adjust_valuation` para muitos grupos de uma vez (atualizações em
+    massa): lê os grupos afetados com lock e grava os novos totais com um
+    upsert por lote, em vez de um UPDATE por grupo. Roda na transação de
+    quem chama.
+    """
+    deltas = {bucket: delta for bucket, delta in deltas.items() if any(delta)}
+    buckets = list(deltas)
+    for start in range(0, len(buckets), batch_size):
+        chunk = {
+            InventoryValuation.make_bucket_key(category_id, supplier_id): (category_id, supplier_id)
+            for category_id, supplier_id in buckets[start:start + batch_size]
+        }
+        current = {
+            valuation.bucket_key: valuation
+            for valuation in InventoryValuation.objects.select_for_update().filter(
+                company_id=company_id, bucket_key__in=list(chunk),
+            )
+        }
+        valuations = []
+        for bucket_key, (category_id, supplier_id) in chunk.items():
+            count, quantity, value = deltas[(category_id, supplier_id)]
+            valuation = current.get(bucket_key) or InventoryValuation(
+                company_id=company_id,
+                bucket_key=bucket_key,
+                category_id=category_id,
+                supplier_id=supplier_id,
+                total_cost=ZERO,
+            )
+            valuation.product_count += count
+            valuation.stock_quantity += quantity
+            valuation.total_cost += value
+            valuations.append(valuation)
+        InventoryValuation.objects.bulk_create(
+            valuations,
+            update_conflicts=True,
+            unique_fields=['company', 'bucket_key'],
+            update_fields=['product_count', 'stock_quantity', 'total_cost', 'updated_at'],
+        )
+
+
+def product_changed(product, created, update_fields=None):
+    """Atualiza a valorização após salvar um produto (ativo, desativado ou movido de grupo)."""
+    deltas = defaultdict(lambda: [0, 0, ZERO])
+    stock_quantity = product.stock_quantity
+    if not created:
+        loaded = getattr(product, '_loaded_values', {})
+        if any(field not in loaded for field in TRACKED):
+            # Produto lido sem os campos da valorização (ex.: .only()):
+            # sem o valor anterior não há delta; o rebuild corrige
+            return
+        count, quantity, value = contribution(loaded['is_active'], loaded['cost_price'], loaded['stock_quantity'])
+        add_delta(deltas, loaded['category_id'], loaded['supplier_id'], -count, -quantity, -value)
+        if update_fields is not None and 'stock_quantity' not in update_fields:
+            # O saldo não foi gravado; variações dele chegam por `stock_changed`
+            stock_quantity = loaded['stock_quantity']
+
+    count, quantity, value = contribution(product.is_active, product.cost_price, stock_quantity)
+    add_delta(deltas, product.category_id, product.supplier_id, count, quantity, value)
+    adjust_valuation(product.company_id, deltas)
+
+
+def product_deleted(product):
+    deltas = defaultdict(lambda: [0, 0, ZERO])
+    count, quantity, value = contribution(
+        product.get_loaded_value('is_active', product.is_active),
+        product.get_loaded_value('cost_price', product.cost_price),
+        product.get_loaded_value('stock_quantity', product.stock_quantity),
+    )
+    add_delta(
+        deltas,
+        product.get_loaded_value('category_id', product.category_id),
+        product.get_loaded_value('supplier_id', product.supplier_id),
+        -count, -quantity, -value,
+    )
+    adjust_valuation(product.company_id, deltas)
+
+
+def stock_changed(rows, quantities):
+    """
+    Atualiza a valorização após lançamentos de estoque. `rows` são
+    `(produto, empresa, categoria, fornecedor, custo, ativo)` e
+    `quantities`, `{produto: variação}`.
+    """
+    by_company = defaultdict(lambda: defaultdict(lambda: [0, 0, ZERO]))
+    for pk, company_id, category_id, supplier_id, cost_price, is_active in rows:
+        if is_active and quantities.get(pk):
+            quantity = quantities[pk]
+            add_delta(by_company[company_id], category_id, supplier_id, 0, quantity, Decimal(cost_price or 0) * quantity)
+    for company_id, deltas in by_company.items():
+        adjust_valuation(company_id, deltas)
+
+
+def aggregate_contributions(queryset, *group_by):
+    """Produtos, quantidade e custo total de `queryset` agrupados por `group_by`."""
+    return (
+        queryset.order_by()
+        .values(*group_by)
+        .annotate(
+            product_count=Count('pk'),
+            total_quantity=Coalesce(Sum('stock_quantity'), 0),
+            total_cost=Coalesce(
+                Sum(ExpressionWrapper(
+                    F('cost_price') * F('stock_quantity'),
+                    output_field=DecimalField(max_digits=18, decimal_places=2),
+                )),
+                ZERO,
+                output_field=DecimalField(max_digits=18, decimal_places=2),
+            ),
+        )
+    )
+
+
+def bulk_update_deltas(queryset, values):
+    """
+    Deltas de um `queryset.update(**values)` que ainda vai ser executado
+    (ativo, categoria e/ou fornecedor): um GROUP BY pelos grupos atuais das
+    linhas, sem ler produto por produto.
+    """
+    changed = set(values) & set(TRACKED)
+    if not changed:
+        return {}
+    if changed - {'is_active', 'category_id', 'supplier_id'}:
+        raise ValueError(f'Campos sem suporte na atualização em massa: {sorted(changed)}')
+
+    deltas = defaultdict(lambda: [0, 0, ZERO])
+    for row in aggregate_contributions(queryset, 'is_active', 'category_id', 'supplier_id'):
+        count, quantity, value = row['product_count'], row['total_quantity'], Decimal(row['total_cost']).quantize(ZERO)
+        if row['is_active']:
+            add_delta(deltas, row['category_id'], row['supplier_id'], -count, -quantity, -value)
+        if values.get('is_active', row['is_active']):
+            add_delta(
+                deltas,
+                values.get('category_id', row['category_id']),
+                values.get('supplier_id', row['supplier_id']),
+                count, quantity, value,
+            )
+    return deltas
+
+
+def rebuild_valuation(company_ids=None):
+    """Recalcula os grupos das empresas a partir dos produtos (reparo de divergências)."""
+    queryset = Product.objects.filter(is_active=True)
+    if company_ids is not None:
+        queryset = queryset.filter(company_id__in=company_ids)
+    rows = aggregate_contributions(queryset, 'company_id', 'category_id', 'supplier_id')
+    valuations = [
+        InventoryValuation(
+            company_id=row['company_id'],
+            bucket_key=InventoryValuation.make_bucket_key(row['category_id'], row['supplier_id']),
+            category_id=row['category_id'],
+            supplier_id=row['supplier_id'],
+            product_count=row['product_count'],
+            stock_quantity=row['total_quantity'],
+            total_cost=Decimal(row['total_cost']).quantize(ZERO),
+        )
+        for row in rows.iterator()
+    ]
+
+    with transaction.atomic():
+        existing = InventoryValuation.objects.all()
+        if company_ids is not None:
+            existing = existing.filter(company_id__in=company_ids)
+        existing.delete()
+        InventoryValuation.objects.bulk_create(valuations, batch_size=1000)
+    return len(valuations)
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from inventory.models.product import Product
+from inventory.services.valuation import product_changed, product_deleted
+
+
+@receiver(post_save, sender=Product)
+def update_valuation_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Soma à valorização a diferença entre o produto anterior e o salvo."""
+    if raw:
+        return
+    product_changed(instance, created, update_fields)
+
+
+@receiver(post_delete, sender=Product)
+def update_valuation_on_delete(sender, instance, **kwargs):
+    product_deleted(instance)
@@ -1,3 +1,818 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import random
+import re
+import tempfile
+import threading
+import unittest
+import zipfile
+from array import array
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import get_tenant_version
+from core.counters import recount
+from core.imports import ErrorReport, ImportFileError, open_rows, parse_decimal
+from core.models.imports import ImportJob
+from core.tests import create_tenant, prime_counters
+from inventory.models.category import Category
+from inventory.models.product import Product, ProductFiscalData
+from inventory.models.units import Unit
+from inventory.models.stock import StockMovement, StockSnapshot
+from inventory.models.valuation import InventoryValuation
+from inventory.services.nfe import NFeIngestor, iter_nfe_sources
+from inventory.services.nfe_parser import NFeParseError, parse_nfe, parse_nfe_document
+from inventory.services.product_import import (
+    COLUMN_ALIASES,
+    STALE_AFTER,
+    ProductImporter,
+    claim_next_job,
+    fail_stale_jobs,
+    run_pending_jobs,
+)
+from inventory.services.stock import post_movements, set_stock, stock_as_of, take_snapshots
+from inventory.services.taxes import TaxLine, calculate_taxes, compute_line_taxes, to_cents, to_thousandths
+from inventory.services.valuation import rebuild_valuation
+from partners.models.customers import Customer
+from partners.models.suppliers import Supplier
+
+
+def movement(product, kind, quantity, occurred_at=None):
+    return StockMovement(product_id=product.pk, kind=kind, quantity=quantity, occurred_at=occurred_at)
+
+
+def ledger_balance(product):
+    return StockMovement.objects.filter(product=product).aggregate(total=Sum('quantity'))['total'] or 0
+
+
+class StockLedgerTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+        self.rice = Product.objects.create(company=self.company, name='Arroz', sale_price=10, cost_price=6)
+        self.beans = Product.objects.create(company=self.company, name='Feijão', sale_price=8, cost_price=5)
+
+    def test_post_movements_signs_quantities_and_updates_balance(self):
+        post_movements(self.company.pk, [
+            movement(self.rice, StockMovement.Kind.IN, 10),
+            movement(self.rice, StockMovement.Kind.OUT, 3),
+            movement(self.beans, StockMovement.Kind.OUT, -4),
+            movement(self.beans, StockMovement.Kind.ADJUST, -1),
+        ], user=self.user)
+
+        self.rice.refresh_from_db()
+        self.beans.refresh_from_db()
+        self.assertEqual(self.rice.stock_quantity, 7)
+        self.assertEqual(self.beans.stock_quantity, -5)
+        self.assertEqual(ledger_balance(self.rice), 7)
+        self.assertEqual(ledger_balance(self.beans), -5)
+        self.assertEqual(StockMovement.objects.filter(created_by=self.user).count(), 4)
+
+    def test_post_movements_rejects_products_of_other_company(self):
+        other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        other = Product.objects.create(company=other_company, name='Outro', sale_price=1)
+
+        with self.assertRaises(ValueError):
+            post_movements(self.company.pk, [
+                movement(self.rice, StockMovement.Kind.IN, 1),
+                movement(other, StockMovement.Kind.IN, 1),
+            ])
+        self.assertFalse(StockMovement.objects.exists())
+        self.rice.refresh_from_db()
+        self.assertEqual(self.rice.stock_quantity, 0)
+
+    def test_post_movements_invalidates_product_caches(self):
+        before = [get_tenant_version(self.company.pk, label) for label in ('inventory.product', 'inventory.stockmovement')]
+        post_movements(self.company.pk, [movement(self.rice, StockMovement.Kind.IN, 1)])
+        after = [get_tenant_version(self.company.pk, label) for label in ('inventory.product', 'inventory.stockmovement')]
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+    def test_product_save_does_not_overwrite_balance(self):
+        stale = Product.objects.get(pk=self.rice.pk)
+        post_movements(self.company.pk, [movement(self.rice, StockMovement.Kind.IN, 5)])
+
+        stale.name = 'Arroz Tipo 1'
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.stock_quantity, 5)
+
+    def test_set_stock_posts_only_differences(self):
+        post_movements(self.company.pk, [movement(self.rice, StockMovement.Kind.IN, 10)])
+
+        posted = set_stock(self.company.pk, {self.rice.pk: 4, self.beans.pk: 0}, reference='INV-1')
+
+        self.assertEqual(len(posted), 1)
+        self.assertEqual(posted[0].kind, StockMovement.Kind.ADJUST)
+        self.assertEqual(posted[0].reason, StockMovement.Reason.COUNT)
+        self.assertEqual(posted[0].quantity, -6)
+        self.rice.refresh_from_db()
+        self.assertEqual(self.rice.stock_quantity, 4)
+        self.assertEqual(ledger_balance(self.rice), 4)
+        self.assertEqual(set_stock(self.company.pk, {self.rice.pk: 4}), [])
+
+    def test_stock_as_of_and_snapshots(self):
+        now = timezone.now()
+        day = timedelta(days=1)
+        post_movements(self.company.pk, [
+            movement(self.rice, StockMovement.Kind.IN, 10, now - 5 * day),
+            movement(self.rice, StockMovement.Kind.OUT, 2, now - 3 * day),
+            movement(self.beans, StockMovement.Kind.IN, 7, now - 3 * day),
+            movement(self.rice, StockMovement.Kind.IN, 1, now - day),
+        ])
+
+        self.assertEqual(stock_as_of(self.company.pk, now - 6 * day), {self.rice.pk: 0, self.beans.pk: 0})
+        self.assertEqual(stock_as_of(self.company.pk, now - 4 * day), {self.rice.pk: 10, self.beans.pk: 0})
+        self.assertEqual(stock_as_of(self.company.pk, now), {self.rice.pk: 9, self.beans.pk: 7})
+
+        self.assertEqual(take_snapshots(self.company.pk, now - 2 * day), 2)
+        snapshot = StockSnapshot.objects.get(product=self.rice)
+        self.assertEqual(snapshot.quantity, 8)
+        # Sem movimentações desde o último retrato nada é gravado
+        self.assertEqual(take_snapshots(self.company.pk, now - 2 * day + timedelta(hours=1)), 0)
+
+        # O saldo a partir do retrato é igual ao saldo pelo razão inteiro
+        self.assertEqual(stock_as_of(self.company.pk, now), {self.rice.pk: 9, self.beans.pk: 7})
+        self.assertEqual(stock_as_of(self.company.pk, now - 2 * day, product_ids=[self.rice.pk]), {self.rice.pk: 8})
+
+    def test_backdated_movement_invalidates_later_snapshots(self):
+        now = timezone.now()
+        post_movements(self.company.pk, [movement(self.rice, StockMovement.Kind.IN, 10, now - timedelta(days=3))])
+        take_snapshots(self.company.pk, now - timedelta(days=1))
+
+        post_movements(self.company.pk, [movement(self.rice, StockMovement.Kind.OUT, 4, now - timedelta(days=2))])
+
+        self.assertFalse(StockSnapshot.objects.exists())
+        self.assertEqual(stock_as_of(self.company.pk, now - timedelta(days=1)), {self.rice.pk: 6, self.beans.pk: 0})
+
+
+def valuation_state(company):
+    """Grupos não vazios da valorização: `{bucket_key: (produtos, quantidade, valor)}`."""
+    return {
+        valuation.bucket_key: (valuation.product_count, valuation.stock_quantity, valuation.total_cost)
+        for valuation in InventoryValuation.objects.filter(company=company)
+        if valuation.product_count or valuation.stock_quantity or valuation.total_cost
+    }
+
+
+class InventoryValuationTests(TestCase):
+    """A valorização incremental deve bater com um `rebuild_valuation` feito do zero."""
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+        self.food = Category.objects.create(company=self.company, name='Alimentos', slug='alimentos')
+        self.drinks = Category.objects.create(company=self.company, name='Bebidas', slug='bebidas')
+        self.supplier = Supplier.objects.create(company=self.company, name='Fornecedor', cpf_cnpj='1')
+        self.products = [
+            Product.objects.create(
+                company=self.company, name=f'Produto {index}', sale_price=10, cost_price=Decimal('2.50') + index,
+                category=self.food if index % 2 else self.drinks, supplier=self.supplier if index % 3 else None,
+            )
+            for index in range(6)
+        ]
+        post_movements(self.company.pk, [
+            movement(product, StockMovement.Kind.IN, 10 + index) for index, product in enumerate(self.products)
+        ])
+        prime_counters(self.company)
+
+    def assertMatchesRebuild(self):
+        incremental = valuation_state(self.company)
+        rebuild_valuation([self.company.pk])
+        self.assertEqual(incremental, valuation_state(self.company))
+
+    def test_create_and_stock_movements(self):
+        self.assertMatchesRebuild()
+
+    def test_edit_moves_product_between_groups(self):
+        product = Product.objects.get(pk=self.products[0].pk)
+        product.category = self.food
+        product.supplier = self.supplier
+        product.cost_price = Decimal('9.99')
+        product.save()
+        self.assertMatchesRebuild()
+
+    def test_edit_of_instance_read_with_only(self):
+        product = Product.objects.only('name').get(pk=self.products[1].pk)
+        product.category = self.drinks
+        product.save()
+        self.assertMatchesRebuild()
+
+    def test_concurrent_edits_from_stale_instances(self):
+        # Duas edições do mesmo produto lidas antes de qualquer gravação: a
+        # segunda não pode subtrair o valor anterior já subtraído pela primeira
+        first = Product.objects.get(pk=self.products[2].pk)
+        second = Product.objects.get(pk=self.products[2].pk)
+        first.cost_price = Decimal('20.00')
+        first.save()
+        second.category = self.food if second.category_id == self.drinks.pk else self.drinks
+        second.save()
+        self.assertMatchesRebuild()
+
+    def test_deactivate_and_delete(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('inventory:product_delete', kwargs={'pk': self.products[3].pk}))
+        self.assertFalse(Product.objects.get(pk=self.products[3].pk).is_active)
+        self.assertMatchesRebuild()
+
+        Product.objects.get(pk=self.products[4].pk).stock_movements.all().delete()
+        Product.objects.get(pk=self.products[4].pk).delete()
+        self.assertMatchesRebuild()
+
+    def test_bulk_actions(self):
+        self.client.force_login(self.user)
+        ids = ','.join(str(product.pk) for product in self.products[:4])
+        url = reverse('inventory:product_bulk')
+        self.client.post(url, {'action': 'set_category', 'category': self.food.pk, 'ids': ids})
+        self.assertMatchesRebuild()
+        self.client.post(url, {'action': 'deactivate', 'ids': ids})
+        self.assertMatchesRebuild()
+        self.client.post(url, {'action': 'reactivate', 'ids': ids})
+        self.assertMatchesRebuild()
+        self.assertEqual(Product.objects.filter(category=self.food).count(), 5)
+
+
+class ProductInfiniteScrollTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+        self.products = [
+            Product.objects.create(company=self.company, name=f'Produto {index:02d}', sale_price=1)
+            for index in range(45)
+        ]
+        prime_counters(self.company)
+        self.client.force_login(self.user)
+
+    def test_rows_fragment_chain_loads_every_product_once(self):
+        url = reverse('inventory:product_list')
+        response = self.client.get(url, HTTP_HX_REQUEST='true')
+        content = response.content.decode()
+        self.assertIn('hx-trigger="revealed"', content)
+        self.assertNotIn('Próximo', content)
+
+        seen = re.findall(r'id="product-row-(\d+)"', content)
+        next_url = re.search(r'hx-get="([^"]*fragment=rows[^"]*)"', content)
+        while next_url:
+            fragment = self.client.get(next_url.group(1).replace('&amp;', '&'), HTTP_HX_REQUEST='true').content.decode()
+            self.assertNotIn('<table', fragment)
+            seen += re.findall(r'id="product-row-(\d+)"', fragment)
+            next_url = re.search(r'hx-get="([^"]*fragment=rows[^"]*)"', fragment)
+
+        self.assertEqual([int(pk) for pk in seen], [product.pk for product in self.products])
+
+
+class AutocompleteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+        self.drinks = [
+            Category.objects.create(company=self.company, name=f'Bebidas {index:02d}', slug=f'bebidas-{index:02d}')
+            for index in range(25)
+        ]
+        self.sweets = Category.objects.create(company=self.company, name='Doces Finos', slug='doces-finos')
+        Category.objects.create(company=self.company, name='Bebidas Antigas', slug='bebidas-antigas', is_active=False)
+        other_company, _ = create_tenant(name='Outra', email='outra@teste.com')
+        Category.objects.create(company=other_company, name='Bebidas Outra', slug='bebidas-outra')
+        self.url = reverse('inventory:category_autocomplete')
+        self.client.force_login(self.user)
+
+    def ids(self, response):
+        return [result['id'] for result in response.json()['results']]
+
+    def test_select2_pages(self):
+        first = self.client.get(self.url, {'term': 'bébi', 'page': 1})
+        self.assertEqual(first.json()['results'][0], {'id': self.drinks[0].pk, 'text': 'Bebidas 00'})
+        self.assertTrue(first.json()['pagination']['more'])
+        second = self.client.get(self.url, {'term': 'bébi', 'page': 2})
+        self.assertFalse(second.json()['pagination']['more'])
+
+        self.assertEqual(self.ids(first) + self.ids(second), [category.pk for category in self.drinks])
+
+    def test_limit_and_offset(self):
+        response = self.client.get(self.url, {'q': 'bebidas', 'limit': 5, 'offset': 20})
+        self.assertEqual(self.ids(response), [category.pk for category in self.drinks[20:]])
+        self.assertFalse(response.json()['pagination']['more'])
+
+        response = self.client.get(self.url, {'term': 'bebidas', 'limit': 3, 'page': 2})
+        self.assertEqual(self.ids(response), [category.pk for category in self.drinks[3:6]])
+        # Limite inválido ou zero volta ao padrão
+        self.assertEqual(len(self.ids(self.client.get(self.url, {'term': 'bebidas', 'limit': 0}))), 20)
+        self.assertEqual(len(self.ids(self.client.get(self.url, {'term': 'bebidas', 'limit': 'x'}))), 20)
+
+    def test_matches_word_prefix_only(self):
+        self.assertEqual(self.ids(self.client.get(self.url, {'term': 'fin'})), [self.sweets.pk])
+        self.assertEqual(self.ids(self.client.get(self.url, {'term': 'oces'})), [])
+
+    def test_unit_label(self):
+        unit = Unit.objects.create(company=self.company, name='Quilograma', abbreviation='KG')
+        response = self.client.get(reverse('inventory:unit_autocomplete'), {'term': 'kg'})
+        self.assertEqual(response.json()['results'], [{'id': unit.pk, 'text': 'Quilograma (KG)'}])
+
+    def test_not_modified_until_category_changes(self):
+        response = self.client.get(self.url, {'term': 'doces'})
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get(self.url, {'term': 'doces'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        # Outra busca tem outro ETag
+        self.assertEqual(self.client.get(self.url, {'term': 'bebidas'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        created = Category.objects.create(company=self.company, name='Doces Caseiros', slug='doces-caseiros')
+        response = self.client.get(self.url, {'term': 'doces'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.ids(response), [created.pk, self.sweets.pk])
+
+
+class ComputeLineTaxesTests(SimpleTestCase):
+    """Casos calculados à mão (valores em centavos, milésimos e pontos-base)."""
+
+    def compute(self, quantity, unit_price, icms, pis, cofins, exempt):
+        return [list(values) for values in compute_line_taxes(
+            array('q', quantity), array('q', unit_price),
+            array('q', icms), array('q', pis), array('q', cofins),
+            array('b', exempt),
+        )]
+
+    def test_reference_lines(self):
+        # 2 x R$ 10,00 a 18% e 1,5 x R$ 3,33 a 12%; PIS 1,65% e COFINS 7,6%
+        # sobre a base sem o ICMS: 1640 x 1,65% = 27,06 e 1640 x 7,6% = 124,64
+        result = self.compute([2000, 1500], [1000, 333], [1800, 1200], [165, 165], [760, 760], [0, 0])
+        self.assertEqual(result, [[2000, 500], [360, 60], [1640, 440], [27, 7], [125, 33]])
+
+    def test_exempt_customer_pays_nothing(self):
+        result = self.compute([2000, 1500], [1000, 333], [1800, 1200], [165, 165], [760, 760], [1, 0])
+        self.assertEqual(result, [[2000, 500], [0, 60], [0, 440], [0, 7], [0, 33]])
+
+    def test_half_up_rounding_boundaries(self):
+        # Base: 1,5 x R$ 0,01 = 1,5 centavo -> 2; 1,499 x R$ 0,01 -> 1
+        base, *_ = self.compute([1500, 1499], [1, 1], [0, 0], [0, 0], [0, 0], [0, 0])
+        self.assertEqual(base, [2, 1])
+        # ICMS: 25 x 18% = 4,5 centavos -> 5; 25 x 17,99% = 4,4975 -> 4
+        _, icms, pis_cofins_base, *_ = self.compute([1000, 1000], [25, 25], [1800, 1799], [0, 0], [0, 0], [0, 0])
+        self.assertEqual(icms, [5, 4])
+        self.assertEqual(pis_cofins_base, [20, 21])
+        # PIS: 100 x 0,5% = 0,5 centavo -> 1; 100 x 0,49% -> 0
+        *_, pis, cofins = self.compute([1000, 1000], [100, 100], [0, 0], [50, 49], [50, 49], [0, 0])
+        self.assertEqual(pis, [1, 0])
+        self.assertEqual(cofins, [1, 0])
+
+    def test_decimal_conversion_rounds_half_up(self):
+        self.assertEqual(to_cents(Decimal('0.005')), 1)
+        self.assertEqual(to_cents(Decimal('0.004')), 0)
+        self.assertEqual(to_thousandths(Decimal('1.0005')), 1001)
+
+
+class CalculateTaxesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, _ = create_tenant()
+        self.taxed = self.create_product('Tributado', cst_icms='00', icms_aliquota='18.00', cst_pis='01',
+                                         pis_aliquota='1.65', cst_cofins='01', cofins_aliquota='7.60')
+        self.customer = Customer.objects.create(company=self.company, name='Cliente', cpf_cnpj='11111111111')
+        self.exempt = Customer.objects.create(company=self.company, name='Isento', cpf_cnpj='22222222222', is_exempt=True)
+
+    def create_product(self, name, **fiscal):
+        fiscal_data = None
+        if fiscal:
+            fiscal_data = ProductFiscalData.objects.create(company=self.company, ncm='10063021', cfop='5102', **fiscal)
+        return Product.objects.create(company=self.company, name=name, sale_price=1, fiscal_data=fiscal_data)
+
+    def test_taxed_line(self):
+        result = calculate_taxes(self.company.pk, [TaxLine(self.taxed, Decimal('2'), Decimal('10.00'), self.customer)])
+        self.assertEqual(result.line(0), {
+            'base': Decimal('20.00'),
+            'icms_base': Decimal('20.00'),
+            'icms': Decimal('3.60'),
+            'pis_cofins_base': Decimal('16.40'),
+            'pis': Decimal('0.27'),
+            'cofins': Decimal('1.25'),
+        })
+
+    def test_exempt_customer(self):
+        result = calculate_taxes(self.company.pk, [
+            TaxLine(self.taxed.pk, 2, Decimal('10.00'), self.exempt.pk),
+            TaxLine(self.taxed.pk, 2, Decimal('10.00'), self.customer.pk),
+        ])
+        self.assertEqual(result.line(0)['icms_base'], Decimal('0'))
+        self.assertEqual([result.line(0)[name] for name in ('icms', 'pis', 'cofins')], [Decimal('0')] * 3)
+        self.assertEqual(result.totals['icms'], Decimal('3.60'))
+
+    def test_csts_without_taxable_base(self):
+        product = self.create_product('Isento de ICMS', cst_icms='40', icms_aliquota='18.00', cst_pis='06',
+                                      pis_aliquota='1.65', cst_cofins='01', cofins_aliquota='7.60')
+        line = calculate_taxes(self.company.pk, [TaxLine(product, 1, Decimal('100.00'))]).line(0)
+        self.assertEqual(line['icms_base'], Decimal('0'))
+        self.assertEqual(line['icms'], Decimal('0'))
+        self.assertEqual(line['pis_cofins_base'], Decimal('100.00'))
+        self.assertEqual(line['pis'], Decimal('0'))
+        self.assertEqual(line['cofins'], Decimal('7.60'))
+
+    def test_missing_fiscal_data(self):
+        without_fiscal = self.create_product('Sem dados fiscais')
+        without_rates = self.create_product('Sem alíquotas', cst_icms='00')
+        result = calculate_taxes(self.company.pk, [
+            TaxLine(without_fiscal, 3, Decimal('1.50')),
+            TaxLine(without_rates, 1, Decimal('2.00')),
+            TaxLine(999999, 1, Decimal('2.00')),
+        ])
+        for index, base in enumerate((Decimal('4.50'), Decimal('2.00'), Decimal('2.00'))):
+            line = result.line(index)
+            self.assertEqual(line['base'], base)
+            self.assertEqual(line['pis_cofins_base'], base)
+            self.assertEqual([line[name] for name in ('icms_base', 'icms', 'pis', 'cofins')], [Decimal('0')] * 4)
+
+    def test_rate_change_invalidates_cached_table(self):
+        calculate_taxes(self.company.pk, [TaxLine(self.taxed, 1, Decimal('10.00'))])
+        fiscal_data = self.taxed.fiscal_data
+        fiscal_data.icms_aliquota = Decimal('12.00')
+        fiscal_data.save()
+
+        result = calculate_taxes(self.company.pk, [TaxLine(self.taxed, 1, Decimal('10.00'))])
+        self.assertEqual(result.line(0)['icms'], Decimal('1.20'))
+
+    def test_negative_values_are_rejected(self):
+        with self.assertRaises(ValueError):
+            calculate_taxes(self.company.pk, [TaxLine(self.taxed, -1, Decimal('10.00'))])
+
+
+def run_importer(company, text, filename='produtos.csv', batch_size=1000):
+    """Importa `text` (CSV) e devolve o importador e as linhas do relatório de erros."""
+    importer = ProductImporter(company.pk, batch_size=batch_size)
+    columns, rows = open_rows(io.BytesIO(text.encode('utf-8-sig')), filename, COLUMN_ALIASES)
+    report = ErrorReport(columns)
+    importer.run(columns, rows, report)
+    errors = list(csv.reader(io.StringIO(report.rewind().read().decode('utf-8-sig')), delimiter=';'))
+    report.close()
+    return importer, errors
+
+
+class OpenRowsTests(SimpleTestCase):
+
+    def test_csv_headers_aliases_and_blank_lines(self):
+        text = 'Nome;Preço de Venda;Código\r\nArroz;1.234,56;A1\r\n;;\r\nFeijão;7,5;\r\n'
+        columns, rows = open_rows(io.BytesIO(text.encode('utf-8-sig')), 'x.csv', COLUMN_ALIASES)
+        self.assertEqual(columns, ['name', 'sale_price', 'sku'])
+        self.assertEqual(list(rows), [
+            (2, {'name': 'Arroz', 'sale_price': '1.234,56', 'sku': 'A1'}),
+            (4, {'name': 'Feijão', 'sale_price': '7,5', 'sku': ''}),
+        ])
+        self.assertEqual(parse_decimal('1.234,56'), '1234.56')
+
+    def test_xlsx(self):
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['Produto', 'Preço'])
+        workbook.active.append(['Arroz', 5.5])
+        file = io.BytesIO()
+        workbook.save(file)
+        file.seek(0)
+        columns, rows = open_rows(file, 'x.xlsx', COLUMN_ALIASES)
+        self.assertEqual(columns, ['name', 'sale_price'])
+        self.assertEqual(list(rows), [(2, {'name': 'Arroz', 'sale_price': 5.5})])
+
+    def test_invalid_files(self):
+        for content, filename in ((b'', 'x.csv'), (b'a;b', 'x.txt'), ('nome\nação'.encode('latin-1'), 'x.csv')):
+            with self.subTest(filename=filename), self.assertRaises(ImportFileError):
+                open_rows(io.BytesIO(content), filename, COLUMN_ALIASES)
+
+
+class ProductImporterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+        self.category = Category.objects.create(company=self.company, name='Grãos', slug='graos')
+        self.existing = Product.objects.create(company=self.company, name='Antigo', sku='A1', sale_price=1)
+        post_movements(self.company.pk, [movement(self.existing, StockMovement.Kind.IN, 4)])
+
+    def test_creates_and_updates_by_sku(self):
+        importer, errors = run_importer(self.company, (
+            'nome;sku;preco;estoque;categoria;ncm\n'
+            'Arroz Novo;A1;10,50;9;graos;1006.30.21\n'
+            'Feijão;B1;8;2;;\n'
+        ))
+        self.assertEqual((importer.total, importer.created, importer.updated), (2, 1, 1))
+        self.assertEqual(len(errors), 1)
+
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.name, self.existing.sale_price), ('Arroz Novo', Decimal('10.50')))
+        self.assertEqual(self.existing.category, self.category)
+        self.assertEqual(self.existing.fiscal_data.ncm, '10063021')
+        # O estoque importado entra como ajuste no razão
+        self.assertEqual(self.existing.stock_quantity, 9)
+        self.assertEqual(ledger_balance(self.existing), 9)
+        created = Product.objects.get(company=self.company, sku='B1')
+        self.assertEqual((created.name, created.stock_quantity, created.fiscal_data), ('Feijão', 2, None))
+
+    def test_row_errors_go_to_report(self):
+        importer, errors = run_importer(self.company, (
+            'nome;preco;estoque;categoria;ncm\n'
+            'Bom;5;;;\n'
+            ';5;;;\n'
+            'Negativo;-1;-2;;\n'
+            'Sem categoria;5;;Bebidas;\n'
+            'NCM curto;5;;;123\n'
+        ))
+        self.assertEqual((importer.total, importer.created), (5, 1))
+        self.assertEqual(errors[0], ['linha', 'erros', 'name', 'sale_price', 'stock_quantity', 'category', 'ncm'])
+        report = {int(row[0]): row[1] for row in errors[1:]}
+        self.assertEqual(sorted(report), [3, 4, 5, 6])
+        self.assertIn('name: Este campo é obrigatório.', report[3])
+        self.assertIn('O preço de venda deve ser maior que zero.', report[4])
+        self.assertIn('A quantidade em estoque não pode ser negativa.', report[4])
+        self.assertIn('category: "Bebidas" não encontrado.', report[5])
+        self.assertIn('NCM deve conter 8 dígitos.', report[6])
+
+    def test_repeated_sku_is_rejected_in_any_batch(self):
+        text = 'nome;sku;preco\nPrimeiro;C1;5\nOutro;D1;5\nSegundo;C1;6\n'
+        for batch_size in (1, 2, 1000):
+            with self.subTest(batch_size=batch_size):
+                Product.objects.filter(sku__in=('C1', 'D1')).delete()
+                importer, errors = run_importer(self.company, text, batch_size=batch_size)
+                self.assertEqual((importer.created, importer.updated), (2, 0))
+                self.assertEqual([row[:2] for row in errors[1:]], [['4', 'sku: "C1" repetido no arquivo (linha 2).']])
+                self.assertEqual(Product.objects.get(sku='C1').name, 'Primeiro')
+
+    def test_failed_batch_reports_each_row_once(self):
+        with mock.patch.object(ProductImporter, 'write_batch', side_effect=DatabaseError('falhou')), \
+                self.assertLogs('inventory.services.product_import', 'ERROR'):
+            importer, errors = run_importer(self.company, 'nome;sku;preco\nA;X1;5\nB;X2;5\nC;X1;5\n', batch_size=2)
+        self.assertEqual(importer.created, 0)
+        self.assertEqual([row[0] for row in errors[1:]], ['2', '3', '4'])
+        self.assertIn('Erro ao gravar o lote', errors[1][1])
+        self.assertIn('repetido no arquivo', errors[3][1])
+
+    def test_missing_required_column(self):
+        with self.assertRaisesMessage(ImportFileError, 'sale_price'):
+            run_importer(self.company, 'nome;sku\nArroz;A9\n')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ProductImportJobTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, self.user = create_tenant()
+        self.client.force_login(self.user)
+
+    def upload(self, text):
+        response = self.client.post(reverse('inventory:product_import'), {
+            'file': SimpleUploadedFile('produtos.csv', text.encode('utf-8-sig'), content_type='text/csv'),
+        })
+        return ImportJob.objects.get(pk=response.url.rstrip('/').split('/')[-1])
+
+    def test_upload_is_queued_and_processed_by_worker(self):
+        job = self.upload('nome;preco\nArroz;5\n;5\n')
+        self.assertEqual(job.status, 'pending')
+        self.assertFalse(Product.objects.exists())
+
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total_rows, job.created_count, job.error_count), ('done', 2, 1, 1))
+        self.assertEqual(run_pending_jobs(), 0)
+
+        response = self.client.get(reverse('inventory:product_import_errors', kwargs={'pk': job.pk}))
+        report = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertEqual(report.splitlines()[1], '3;name: Este campo é obrigatório.;;5')
+
+    def test_other_company_cannot_download_report(self):
+        job = self.upload('nome;preco\n;5\n')
+        run_pending_jobs()
+        _, other = create_tenant(name='Outra', email='outra@teste.com')
+        self.client.force_login(other)
+        response = self.client.get(reverse('inventory:product_import_errors', kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_stale_running_jobs_fail(self):
+        stale = self.upload('nome;preco\nArroz;5\n')
+        alive = self.upload('nome;preco\nFeijão;5\n')
+        ImportJob.objects.filter(pk__in=(stale.pk, alive.pk)).update(status='running')
+        ImportJob.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - STALE_AFTER - timedelta(minutes=1))
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+        self.assertTrue(stale.is_finished)
+        self.assertEqual(ImportJob.objects.get(pk=alive.pk).status, 'running')
+        # A importação travada não volta para a fila
+        self.assertEqual(run_pending_jobs(), 0)
+
+    def test_claim_takes_each_job_once(self):
+        first = self.upload('nome;preco\nArroz;5\n')
+        second = self.upload('nome;preco\nFeijão;5\n')
+        self.assertEqual(claim_next_job().pk, first.pk)
+        self.assertEqual(claim_next_job().pk, second.pk)
+        self.assertIsNone(claim_next_job())
+
+
+def nfe_xml(number, cnpj='12345678000199', name='Fornecedor XML', trading_name='Fantasia XML', items=()):
+    """procNFe mínima com os itens `(código, EAN, descrição, NCM, CFOP, preço)`."""
+    dets = ''.join(
+        f'<det nItem="{index}"><prod><cProd>{code}</cProd><cEAN>{ean}</cEAN><xProd>{description}</xProd>'
+        f'<NCM>{ncm}</NCM><CFOP>{cfop}</CFOP><uCom>UN</uCom><qCom>2.0000</qCom><vUnCom>{price}</vUnCom></prod>'
+        f'<imposto><ICMS><ICMSSN102><orig>0</orig><CSOSN>102</CSOSN></ICMSSN102></ICMS>'
+        f'<PIS><PISAliq><CST>01</CST><pPIS>1.65</pPIS></PISAliq></PIS>'
+        f'<COFINS><COFINSAliq><CST>01</CST><pCOFINS>7.60</pCOFINS></COFINSAliq></COFINS></imposto></det>'
+        for index, (code, ean, description, ncm, cfop, price) in enumerate(items, start=1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<nfeProc xmlns="http://www.portalfiscal.inf.br/nfe" versao="4.00"><NFe>'
+        f'<infNFe Id="NFe3526010000000000000055001000000{number:03d}1000000001" versao="4.00">'
+        f'<ide><nNF>{number}</nNF></ide>'
+        f'<emit><CNPJ>{cnpj}</CNPJ><xNome>{name}</xNome><xFant>{trading_name}</xFant>'
+        '<enderEmit><xLgr>Rua A</xLgr><nro>10</nro><xBairro>Centro</xBairro><cMun>3550308</cMun>'
+        '<xMun>São Paulo</xMun><UF>SP</UF><CEP>01001000</CEP><fone>1133334444</fone></enderEmit>'
+        '<IE>123456</IE><CRT>1</CRT></emit>'
+        f'<dest><CNPJ>99999999000199</CNPJ></dest>{dets}'
+        '</infNFe></NFe></nfeProc>'
+    ).encode()
+
+
+RICE = ('A1', '7891000000001', 'Arroz 5kg', '10063021', '5102', '20.50')
+BEANS = ('F1', 'SEM GTIN', 'Feijão 1kg', '07133399', '5102', '8.00')
+
+
+class NFeParserTests(SimpleTestCase):
+
+    def test_parse_document(self):
+        document = parse_nfe(io.BytesIO(nfe_xml(7, items=[RICE, BEANS])))
+        self.assertEqual(document['number'], '7')
+        self.assertTrue(document['key'].startswith('3526'))
+        emitter = document['emitter']
+        self.assertEqual(
+            (emitter['cpf_cnpj'], emitter['name'], emitter['tax_regime'], emitter['address']['city_ibge_code']),
+            ('12345678000199', 'Fornecedor XML', 'simples', '3550308'),
+        )
+        rice, beans = document['items']
+        self.assertEqual((rice['code'], rice['barcode'], rice['unit_price']), ('A1', '7891000000001', Decimal('20.50')))
+        self.assertEqual((rice['cst_icms'], rice['origin'], rice['pis_aliquota']), ('102', '0', Decimal('1.65')))
+        # "SEM GTIN" não é código de barras
+        self.assertIsNone(beans['barcode'])
+
+    def test_invalid_documents(self):
+        name, document, error = parse_nfe_document(('ruim.xml', b'<nfeProc>'))
+        self.assertTrue(error.startswith('XML inválido'))
+        name, document, error = parse_nfe_document(('sem_emit.xml', b'<NFe><infNFe><ide/></infNFe></NFe>'))
+        self.assertIsNone(document)
+        self.assertEqual(error, 'Emitente (<emit>) não encontrado.')
+        with self.assertRaises(NFeParseError):
+            parse_nfe(io.BytesIO(b'nada'))
+
+    def test_sources_from_zip(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'notas.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('1.xml', nfe_xml(1, items=[RICE]))
+            archive.writestr('leia-me.txt', 'ignorado')
+            archive.writestr('grande.xml', b'x' * 5000)
+        with mock.patch('inventory.services.nfe.MAX_XML_SIZE', 4000):
+            sources = dict(iter_nfe_sources(directory))
+        self.assertEqual(sorted(sources), ['1.xml', 'grande.xml'])
+        self.assertIsNone(sources['grande.xml'])
+        self.assertEqual(sources['1.xml'], nfe_xml(1, items=[RICE]))
+
+
+class NFeIngestorTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company, _ = create_tenant()
+
+    def ingest(self, *documents):
+        ingestor = NFeIngestor(self.company.pk, workers=1)
+        ingestor.run((f'{index}.xml', data) for index, data in enumerate(documents))
+        return ingestor
+
+    def test_creates_supplier_products_and_fiscal_data(self):
+        ingestor = self.ingest(nfe_xml(1, items=[RICE, BEANS]))
+        self.assertEqual((ingestor.documents, ingestor.items, ingestor.created, ingestor.updated), (1, 2, 2, 0))
+        self.assertEqual(ingestor.errors, [])
+
+        supplier = Supplier.objects.get(company=self.company, cpf_cnpj='12345678000199')
+        self.assertEqual((supplier.name, supplier.tax_regime, supplier.address.city_ibge_code), ('Fornecedor XML', 'simples', '3550308'))
+        rice = Product.objects.get(company=self.company, barcode='7891000000001')
+        self.assertEqual((rice.supplier, rice.cost_price, rice.fiscal_data.ncm), (supplier, Decimal('20.50'), '10063021'))
+        beans = Product.objects.get(company=self.company, sku='F1')
+        self.assertEqual(beans.fiscal_data.cst_pis, '01')
+        self.assertEqual(recount(self.company.pk, Product), 2)
+
+        ingestor = self.ingest(nfe_xml(2, items=[RICE[:5] + ('22.00',), BEANS]))
+        self.assertEqual((ingestor.created, ingestor.updated), (0, 2))
+        rice.refresh_from_db()
+        self.assertEqual(rice.cost_price, Decimal('22.00'))
+
+    def test_item_with_invalid_fiscal_data_is_skipped(self):
+        invalid = ('B1', '7891000000002', 'Sem NCM', '123', '5102', '3.00')
+        ingestor = self.ingest(nfe_xml(3, items=[RICE, invalid]))
+        self.assertEqual((ingestor.created, ingestor.updated), (1, 0))
+        self.assertEqual(len(ingestor.errors), 1)
+        self.assertIn('item 2: NCM deve conter 8 dígitos.', ingestor.errors[0])
+        self.assertFalse(Product.objects.filter(barcode='7891000000002').exists())
+
+        # Também não altera um produto já cadastrado
+        existing = Product.objects.get(barcode=RICE[1])
+        self.ingest(nfe_xml(4, items=[RICE[:3] + ('', '5102', '99.00')]))
+        existing.refresh_from_db()
+        self.assertEqual(existing.cost_price, Decimal('20.50'))
+
+    def test_existing_supplier_only_gets_blank_fields(self):
+        supplier = Supplier.objects.create(
+            company=self.company, name='Nome Cadastrado', cpf_cnpj='12345678000199', phone='1199998888',
+        )
+        self.ingest(nfe_xml(5, items=[RICE]))
+        supplier.refresh_from_db()
+        self.assertEqual((supplier.name, supplier.phone), ('Nome Cadastrado', '1199998888'))
+        self.assertEqual((supplier.trading_name, supplier.state_registration), ('Fantasia XML', '123456'))
+        self.assertIsNotNone(supplier.address_id)
+        self.assertIn('fantasia xml', supplier.search_text)
+        self.assertEqual(Supplier.objects.filter(company=self.company).count(), 1)
+
+    def test_ingest_zip_with_bad_entries(self):
+        path = os.path.join(tempfile.mkdtemp(), 'notas.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr('1.xml', nfe_xml(1, items=[RICE]))
+            archive.writestr('2.xml', b'<nfeProc>')
+        ingestor = NFeIngestor(self.company.pk, workers=1)
+        ingestor.run(iter_nfe_sources(path))
+        self.assertEqual((ingestor.documents, ingestor.created), (1, 1))
+        self.assertEqual(len(ingestor.errors), 1)
+        self.assertTrue(ingestor.errors[0].startswith('2.xml: XML inválido'))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Concorrência real exige PostgreSQL')
+class StockConcurrencyTests(TransactionTestCase):
+    """Lançadores em paralelo sobre os mesmos produtos (ver também o comando `stress_stock`)."""
+    workers = 8
+    batches = 10
+    batch_size = 50
+
+    def setUp(self):
+        cache.clear()
+        self.company, _ = create_tenant()
+        self.products = [
+            Product.objects.create(company=self.company, name=f'Produto {index}', sale_price=1, cost_price=1)
+            for index in range(5)
+        ]
+
+    def test_parallel_posters_keep_balance_equal_to_ledger(self):
+        expected = {product.pk: 0 for product in self.products}
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.workers)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                barrier.wait()
+                for _ in range(self.batches):
+                    movements = [
+                        movement(
+                            rng.choice(self.products),
+                            rng.choice((StockMovement.Kind.IN, StockMovement.Kind.OUT)),
+                            rng.randint(1, 10),
+                        )
+                        for _ in range(self.batch_size)
+                    ]
+                    posted = post_movements(self.company.pk, movements)
+                    with lock:
+                        for item in posted:
+                            expected[item.product_id] += item.quantity
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for product in self.products:
+            product.refresh_from_db()
+            self.assertEqual(product.stock_quantity, ledger_balance(product))
+            self.assertEqual(product.stock_quantity, expected[product.pk])
+        self.assertEqual(
+            StockMovement.objects.filter(company=self.company).count(),
+            self.workers * self.batches * self.batch_size,
+        )
@@ -1,23 +1,35 @@
 from django.urls import path
-from inventory.views import category, product, unit
+from core.async_views import select_view
+from inventory.views import category, imports, product, unit, valuation
 
 app_name = 'inventory'
 
 urlpatterns = [
-    path('categories/', category.CategoryListView.as_view(), name='category_list'),
+    path('categories/', select_view(category.CategoryListView, category.AsyncCategoryListView), name='category_list'),
     path('categories/create/', category.CategoryCreateView.as_view(), name='category_create'),
     path('categories/<int:pk>/update/', category.CategoryUpdateView.as_view(), name='category_update'),
     path('categories/<int:pk>/delete/', category.CategoryDeleteView.as_view(), name='category_delete'),
+    path('categories/bulk/', category.CategoryBulkActionView.as_view(), name='category_bulk'),
+    path('categories/autocomplete/', select_view(category.CategoryAutocompleteView, category.AsyncCategoryAutocompleteView), name='category_autocomplete'),
 
-    path('units/', unit.UnitListView.as_view(), name='unit_list'),
+    path('units/', select_view(unit.UnitListView, unit.AsyncUnitListView), name='unit_list'),
     path('units/create/', unit.UnitCreateView.as_view(), name='unit_create'),
     path('units/<int:pk>/update/', unit.UnitUpdateView.as_view(), name='unit_update'),
     path('units/<int:pk>/delete/', unit.UnitDeleteView.as_view(), name='unit_delete'),
+    path('units/bulk/', unit.UnitBulkActionView.as_view(), name='unit_bulk'),
+    path('units/autocomplete/', select_view(unit.UnitAutocompleteView, unit.AsyncUnitAutocompleteView), name='unit_autocomplete'),
 
     path('products/create/', product.ProductTemplateView.as_view(), name='product_base'),
-    path('products/', product.ProductListView.as_view(), name='product_list'),
+    path('products/', select_view(product.ProductListView, product.AsyncProductListView), name='product_list'),
     path('products/create/data/', product.ProductDataCreateView.as_view(), name='product_create'),
     path('products/<int:pk>/update/', product.ProductDataUpdateView.as_view(), name='product_update'),
     path('products/<int:pk>/tax/', product.ProductTaxUpdateView.as_view(), name='product_tax'),
     path('products/<int:pk>/delete/', product.ProductDeleteView.as_view(), name='product_delete'),
+    path('products/bulk/', product.ProductBulkActionView.as_view(), name='product_bulk'),
+    path('products/export/', product.ProductExportView.as_view(), name='product_export'),
+    path('products/import/', imports.ProductImportView.as_view(), name='product_import'),
+    path('products/import/<int:pk>/', imports.ProductImportDetailView.as_view(), name='product_import_detail'),
+    path('products/import/<int:pk>/errors/', imports.ProductImportErrorsView.as_view(), name='product_import_errors'),
+
+    path('valuation/', valuation.InventoryValuationView.as_view(), name='valuation_report'),
 ]
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Regras de validação de produtos compartilhadas entre os formulários
+(`inventory.forms.product`) e a importação em massa
+(`inventory.services.product_import`).
+"""
+from django.core.exceptions import ValidationError
+
+
+def only_digits(value):
+    return ''.join(filter(str.isdigit, str(value or '')))
+
+
+def clean_fixed_digits(value, length, label):
+    """Mantém só os dígitos e exige exatamente `length` deles."""
+    if value:
+        value = only_digits(value)
+        if len(value) != length:
+            raise ValidationError(f'{label} deve conter {length} dígitos.')
+    return value
+
+
+def clean_ncm(value):
+    return clean_fixed_digits(value, 8, 'NCM')
+
+
+def clean_cest(value):
+    return clean_fixed_digits(value, 7, 'CEST')
+
+
+def clean_cfop(value):
+    return clean_fixed_digits(value, 4, 'CFOP')
+
+
+def validate_sale_price(value):
+    if value and value <= 0:
+        raise ValidationError('O preço de venda deve ser maior que zero.')
+
+
+def validate_cost_price(value):
+    if value and value < 0:
+        raise ValidationError('O preço de custo não pode ser negativo.')
+
+
+def validate_stock_quantity(value):
+    if value and value < 0:
+        raise ValidationError('A quantidade em estoque não pode ser negativa.')
@@ -2,40 +2,40 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from inventory.forms.category import CategoryForm
 from inventory.models.category import Category
 from django.urls import reverse_lazy
-from django.shortcuts import render
 from django.http import HttpResponseRedirect
-from django.db.models import Q
+from core.async_views import AsyncListMixin
+from core.autocomplete import AsyncAutocompleteView, AutocompleteView
+from core.bulk_actions import BulkActionListMixin, BulkActionView
+from core.conditional import ConditionalListMixin
+from core.counters import RowCountMixin
+from core.pagination import KeysetPaginationMixin
+from core.queries import FetchProfileMixin
+from core.rows import RowResponseMixin
+from core.search import SearchMixin
 
 
-class CategoryListView(ListView):
+class CategoryListView(ConditionalListMixin, BulkActionListMixin, SearchMixin, RowCountMixin, KeysetPaginationMixin, FetchProfileMixin, ListView):
     """
         View para listar categorias de produtos.
     """
     model = Category
     template_name = 'category/list_view.html'
     partial_template_name = 'category/partials/category_table.html'
+    rows_template_name = 'category/partials/category_rows.html'
     paginate_by = 20
+    list_only = ('name', 'description')
+    query_budget = 8
     
     def get_queryset(self):
         company = self.request.user.company_active
-        queryset = Category.objects.filter(
-            company=company,
-            is_active=True
-        )
-        
-        search = self.request.GET.get('search', '')
-        
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search)
+        queryset = self.apply_fetch_profile(
+            Category.objects.filter(
+                company=company,
+                is_active=True
             )
-            
-        return queryset
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['current_search'] = self.request.GET.get('search', '')
-        return context
+        )
+
+        return self.apply_search(queryset)
     
     def render_to_response(self, context, **response_kwargs):
         if self.request.headers.get('Hx-Request'):
@@ -43,6 +43,12 @@ class CategoryListView(ListView):
         return super().render_to_response(context, **response_kwargs)
 
 
+class AsyncCategoryListView(AsyncListMixin, CategoryListView):
+    """
+        Variante assíncrona da listagem de categorias (ASGI).
+    """
+
+
 class CategoryCreateView(CreateView):
     """
         View para criar uma nova categoria de produto.
@@ -74,11 +80,13 @@ class CategoryUpdateView(UpdateView):
         )
 
 
-class CategoryDeleteView(DeleteView):
+class CategoryDeleteView(RowResponseMixin, DeleteView):
     """
         View para deleter uma categoria de produto.
     """
     model = Category
+    list_view_class = CategoryListView
+    count_element_id = 'categories-count'
     template_name = 'category/includes/delete_view.html'
     success_url = reverse_lazy('inventory:category_list')
 
@@ -96,10 +104,30 @@ class CategoryDeleteView(DeleteView):
         self.object.save()
         
         if request.headers.get('Hx-Request'):
-            queryset = self.get_queryset()
-            return render(request, 'category/partials/category_table.html', {
-                'object_list': queryset,
-                'page_obj': queryset
-            })
+            return self.render_row_response(self.object)
         
         return HttpResponseRedirect(self.success_url)
+
+
+class CategoryBulkActionView(BulkActionView):
+    """
+        View para as ações em massa da listagem de categorias.
+    """
+    model = Category
+    list_view_class = CategoryListView
+    container_element_id = 'categories-table-container'
+    result_element_id = 'categories-bulk-result'
+    success_url = reverse_lazy('inventory:category_list')
+
+
+class CategoryAutocompleteView(AutocompleteView):
+    """
+        Autocomplete de categorias para os campos Select2.
+    """
+    model = Category
+
+
+class AsyncCategoryAutocompleteView(AsyncAutocompleteView, CategoryAutocompleteView):
+    """
+        Variante assíncrona do autocomplete de categorias (ASGI).
+    """
@@ -0,0 +1,73 @@
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect
+from django.views.generic import DetailView, FormView
+from django.views.generic.detail import SingleObjectMixin
+from django.views import View
+
+from core.models.imports import ImportJob
+from inventory.forms.imports import ProductImportForm
+
+
+class ProductImportView(FormView):
+    """
+        View para enviar uma planilha de produtos. A importação entra na
+        fila do comando `import_products --pending` e o andamento é
+        acompanhado na página da importação.
+    """
+    form_class = ProductImportForm
+    template_name = 'product/import_view.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['recent_jobs'] = ImportJob.objects.filter(
+            company=self.request.user.company_active,
+            kind='products',
+        )[:5]
+        return context
+
+    def form_valid(self, form):
+        job = ImportJob.objects.create(
+            company=self.request.user.company_active,
+            created_by=self.request.user,
+            kind='products',
+            file=form.cleaned_data['file'],
+        )
+        return redirect('inventory:product_import_detail', pk=job.pk)
+
+
+class ProductImportDetailView(DetailView):
+    """
+        View com o andamento de uma importação. Enquanto ela roda, o
+        template se atualiza via HTMX.
+    """
+    template_name = 'product/import_detail.html'
+    partial_template_name = 'product/partials/import_status.html'
+    context_object_name = 'job'
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(company=self.request.user.company_active, kind='products')
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.headers.get('Hx-Request'):
+            self.template_name = self.partial_template_name
+        return super().render_to_response(context, **response_kwargs)
+
+
+class ProductImportErrorsView(SingleObjectMixin, View):
+    """
+        View para baixar o relatório CSV das linhas rejeitadas.
+    """
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(company=self.request.user.company_active, kind='products')
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        if not job.error_report:
+            raise Http404('Importação sem relatório de erros.')
+        return FileResponse(
+            job.error_report.open('rb'),
+            as_attachment=True,
+            filename=f'erros_importacao_{job.pk}.csv',
+            content_type='text/csv',
+        )
@@ -1,42 +1,45 @@
 from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView
 from inventory.models.product import Product, ProductFiscalData
-from inventory.forms.product import ProductDataForm, ProductTaxForm
+from inventory.forms.product import ProductBulkActionForm, ProductDataForm, ProductTaxForm
+from inventory.services.valuation import adjust_valuation_bulk, bulk_update_deltas
 from django.urls import reverse_lazy
-from django.shortcuts import render
-from django.db.models import Q
 from django.http import HttpResponseRedirect
-
-
-class ProductListView(ListView):
+from django.db.models import Q
+from core.async_views import AsyncListMixin
+from core.bulk_actions import BulkActionListMixin, BulkActionView
+from core.conditional import ConditionalListMixin
+from core.counters import RowCountMixin
+from core.exports import CSVExportMixin
+from core.pagination import KeysetPaginationMixin
+from core.queries import FetchProfileMixin
+from core.rows import RowResponseMixin
+from core.search import SearchMixin
+
+
+class ProductListView(ConditionalListMixin, BulkActionListMixin, SearchMixin, RowCountMixin, KeysetPaginationMixin, FetchProfileMixin, ListView):
     """
         View para listar produtos da Empresa.
     """
     model = Product
     template_name = 'product/list_view.html'
     partial_template_name = 'product/partials/product_table.html'
+    rows_template_name = 'product/partials/product_rows.html'
+    infinite_scroll = True
     paginate_by = 20
+    list_select_related = ('category', 'unit', 'supplier')
+    list_only = ('name', 'sku', 'sale_price', 'stock_quantity', 'category__name', 'unit__abbreviation', 'supplier__name')
+    query_budget = 8
+    conditional_models = ('inventory.category', 'inventory.unit', 'partners.supplier', 'inventory.stockmovement')
+    bulk_form_class = ProductBulkActionForm
 
     def get_queryset(self):
         company = self.request.user.company_active
-        queryset = Product.objects.filter(company=company, is_active=True)
+        queryset = self.apply_fetch_profile(
+            Product.objects.filter(company=company, is_active=True)
+        )
 
-        # Aplicar filtros
-        search = self.request.GET.get('search', '')
-        
         # Busca por nome, SKU ou código de barras
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(sku__icontains=search) |
-                Q(barcode__icontains=search)
-            )
-            
-        return queryset
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['current_search'] = self.request.GET.get('search', '')
-        return context
+        return self.apply_search(queryset)
     
     def render_to_response(self, context, **response_kwargs):
         if self.request.headers.get('Hx-Request'):
@@ -44,6 +47,12 @@ class ProductListView(ListView):
         return super().render_to_response(context, **response_kwargs)
 
 
+class AsyncProductListView(AsyncListMixin, ProductListView):
+    """
+        Variante assíncrona da listagem de produtos (ASGI).
+    """
+
+
 class ProductTemplateView(TemplateView):
     """
         View para renderizar o template base do produto.
@@ -52,7 +61,7 @@ class ProductTemplateView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['basic_form'] = ProductDataForm()
+        context['basic_form'] = ProductDataForm(company=self.request.user.company_active)
         return context
     
 
@@ -75,6 +84,7 @@ class ProductDataCreateView(CreateView):
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs['company'] = self.request.user.company_active
+        kwargs['user'] = self.request.user
         return kwargs
 
     def form_valid(self, form):
@@ -99,6 +109,7 @@ class ProductDataUpdateView(UpdateView):
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs['company'] = self.request.user.company_active
+        kwargs['user'] = self.request.user
         return kwargs
 
 
@@ -133,11 +144,13 @@ class ProductTaxUpdateView(UpdateView):
         return context
 
 
-class ProductDeleteView(DeleteView):
+class ProductDeleteView(RowResponseMixin, DeleteView):
     """
         View para deletar um produto.
     """
     model = Product
+    list_view_class = ProductListView
+    count_element_id = 'products-count'
     template_name = 'product/includes/delete_view.html'
     success_url = reverse_lazy('inventory:product_list')
 
@@ -151,10 +164,74 @@ class ProductDeleteView(DeleteView):
         self.object.save()
         
         if request.headers.get('Hx-Request'):
-            queryset = self.get_queryset()
-            return render(request, 'product/partials/product_table.html', {
-                'object_list': queryset,
-                'page_obj': queryset
-            })
+            return self.render_row_response(self.object)
         
-        return HttpResponseRedirect(self.success_url)
\ No newline at end of file
+        return HttpResponseRedirect(self.success_url)
+
+
+class ProductBulkActionView(BulkActionView):
+    """
+        View para as ações em massa da listagem de produtos.
+    """
+    model = Product
+    list_view_class = ProductListView
+    container_element_id = 'products-table-container'
+    result_element_id = 'products-bulk-result'
+    success_url = reverse_lazy('inventory:product_list')
+    success_messages = {
+        **BulkActionView.success_messages,
+        'set_category': '{count} produto(s) movido(s) para a categoria {value}.',
+        'set_supplier': '{count} produto(s) atribuído(s) ao fornecedor {value}.',
+    }
+
+    def get_action_update(self, action, data):
+        if action == 'set_category':
+            return Q(is_active=True) & ~Q(category_id=data['category'].pk), {'category_id': data['category'].pk}
+        if action == 'set_supplier':
+            return Q(is_active=True) & ~Q(supplier_id=data['supplier'].pk), {'supplier_id': data['supplier'].pk}
+        return super().get_action_update(action, data)
+
+    def get_success_message(self, data, count):
+        value = data.get('category') if data['action'] == 'set_category' else data.get('supplier')
+        return self.success_messages[data['action']].format(count=count, value=value)
+
+    def perform_update(self, queryset, values):
+        # Os sinais de save não rodam no UPDATE: a valorização recebe os
+        # deltas calculados antes, com um GROUP BY pelos grupos atuais
+        deltas = bulk_update_deltas(queryset, values)
+        count = super().perform_update(queryset, values)
+        if deltas:
+            adjust_valuation_bulk(self.request.user.company_active_id, deltas)
+        return count
+
+
+class ProductExportView(CSVExportMixin, ProductListView):
+    """
+        View para exportar os produtos (com os dados fiscais) em CSV,
+        respeitando a busca da listagem. Os cabeçalhos são aceitos pela
+        importação de produtos.
+    """
+    export_filename = 'produtos'
+    export_columns = (
+        ('Nome', 'name'),
+        ('SKU', 'sku'),
+        ('Código de Barras', 'barcode'),
+        ('Descrição', 'description'),
+        ('Categoria', 'category__name'),
+        ('Unidade', 'unit__abbreviation'),
+        ('Fornecedor', 'supplier__name'),
+        ('CNPJ Fornecedor', 'supplier__cpf_cnpj'),
+        ('Preço de Custo', 'cost_price'),
+        ('Preço de Venda', 'sale_price'),
+        ('Estoque', 'stock_quantity'),
+        ('NCM', 'fiscal_data__ncm'),
+        ('CEST', 'fiscal_data__cest'),
+        ('CFOP', 'fiscal_data__cfop'),
+        ('Origem', 'fiscal_data__origin'),
+        ('CST ICMS', 'fiscal_data__cst_icms'),
+        ('CST PIS', 'fiscal_data__cst_pis'),
+        ('CST COFINS', 'fiscal_data__cst_cofins'),
+        ('Alíquota ICMS', 'fiscal_data__icms_aliquota'),
+        ('Alíquota PIS', 'fiscal_data__pis_aliquota'),
+        ('Alíquota COFINS', 'fiscal_data__cofins_aliquota'),
+    )
@@ -2,41 +2,40 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from inventory.forms.unit import UnitForm
 from inventory.models.units import Unit
 from django.urls import reverse_lazy
-from django.shortcuts import render
 from django.http import HttpResponseRedirect
-from django.db.models import Q
+from core.async_views import AsyncListMixin
+from core.autocomplete import AsyncAutocompleteView, AutocompleteView
+from core.bulk_actions import BulkActionListMixin, BulkActionView
+from core.conditional import ConditionalListMixin
+from core.counters import RowCountMixin
+from core.pagination import KeysetPaginationMixin
+from core.queries import FetchProfileMixin
+from core.rows import RowResponseMixin
+from core.search import SearchMixin
 
 
-class UnitListView(ListView):
+class UnitListView(ConditionalListMixin, BulkActionListMixin, SearchMixin, RowCountMixin, KeysetPaginationMixin, FetchProfileMixin, ListView):
     """
         View para listar unidades de medida.
     """
     model = Unit
     template_name = 'unit/list_view.html'
     partial_template_name = 'unit/partials/unit_table.html'
+    rows_template_name = 'unit/partials/unit_rows.html'
     paginate_by = 20
+    list_only = ('name', 'abbreviation')
+    query_budget = 8
     
     def get_queryset(self):
         company = self.request.user.company_active
-
-        queryset = Unit.objects.filter(
-            company=company,
-            is_active=True
-        )
-        
-        search = self.request.GET.get('search', '')
-        
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(abbreviation__icontains=search)
+        queryset = self.apply_fetch_profile(
+            Unit.objects.filter(
+                company=company,
+                is_active=True
             )
-            
-        return queryset
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['current_search'] = self.request.GET.get('search', '')
-        return context
+        )
+
+        return self.apply_search(queryset)
     
     def render_to_response(self, context, **response_kwargs):
         if self.request.headers.get('Hx-Request'):
@@ -44,6 +43,12 @@ class UnitListView(ListView):
         return super().render_to_response(context, **response_kwargs)
 
 
+class AsyncUnitListView(AsyncListMixin, UnitListView):
+    """
+        Variante assíncrona da listagem de unidades de medida (ASGI).
+    """
+
+
 class UnitCreateView(CreateView):
     """
         View para criar uma nova unidade de medida.
@@ -53,6 +58,12 @@ class UnitCreateView(CreateView):
     template_name = 'unit/create_view.html'
     success_url = reverse_lazy('inventory:unit_list')
 
+    def get_form_kwargs(self):
+        # A empresa já vem na instância para a validação da abreviação
+        kwargs = super().get_form_kwargs()
+        kwargs['instance'] = Unit(company=self.request.user.company_active)
+        return kwargs
+
     def form_valid(self, form):
         form.instance.company = self.request.user.company_active
         return super().form_valid(form)
@@ -75,11 +86,13 @@ class UnitUpdateView(UpdateView):
         )
 
 
-class UnitDeleteView(DeleteView):
+class UnitDeleteView(RowResponseMixin, DeleteView):
     """
         View para deletar uma unidade de medida existente.
     """
     model = Unit
+    list_view_class = UnitListView
+    count_element_id = 'units-count'
     template_name = 'unit/includes/delete_view.html'
     success_url = reverse_lazy('inventory:unit_list')
 
@@ -96,10 +109,34 @@ class UnitDeleteView(DeleteView):
         self.object.save()
         
         if request.headers.get('Hx-Request'):
-            queryset = self.get_queryset()
-            return render(request, 'unit/partials/unit_table.html', {
-                'object_list': queryset,
-                'page_obj': queryset
-            })
+            return self.render_row_response(self.object)
         
         return HttpResponseRedirect(self.success_url)
+
+
+class UnitBulkActionView(BulkActionView):
+    """
+        View para as ações em massa da listagem de unidades de medida.
+    """
+    model = Unit
+    list_view_class = UnitListView
+    container_element_id = 'units-table-container'
+    result_element_id = 'units-bulk-result'
+    success_url = reverse_lazy('inventory:unit_list')
+
+
+class UnitAutocompleteView(AutocompleteView):
+    """
+        Autocomplete de unidades de medida para os campos Select2.
+    """
+    model = Unit
+    label_fields = ('name', 'abbreviation')
+
+    def get_label(self, values):
+        return f"{values['name']} ({values['abbreviation']})"
+
+
+class AsyncUnitAutocompleteView(AsyncAutocompleteView, UnitAutocompleteView):
+    """
+        Variante assíncrona do autocomplete de unidades de medida (ASGI).
+    """
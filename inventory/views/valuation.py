@@ -0,0 +1,61 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.views.generic import TemplateView
+
+from inventory.models.valuation import InventoryValuation
+
+
+class InventoryValuationView(LoginRequiredMixin, TemplateView):
+    """
+        Relatório de valorização do estoque por categoria e/ou fornecedor.
+        Lê apenas a tabela de resumo (`InventoryValuation`), nunca os produtos.
+    """
+    template_name = 'valuation/report.html'
+    groupings = {
+        'both': ('Categoria e Fornecedor', ('category', 'supplier')),
+        'category': ('Categoria', ('category',)),
+        'supplier': ('Fornecedor', ('supplier',)),
+    }
+
+    def get_grouping(self):
+        group = self.request.GET.get('group')
+        return group if group in self.groupings else 'both'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        group = self.get_grouping()
+        valuations = (
+            InventoryValuation.objects
+            .filter(company=self.request.user.company_active, product_count__gt=0)
+            .select_related('category', 'supplier')
+        )
+
+        # Os grupos (categoria, fornecedor) são somados em Python quando o
+        # relatório é só por categoria ou só por fornecedor
+        dimensions = self.groupings[group][1]
+        rows = defaultdict(lambda: {'product_count': 0, 'stock_quantity': 0, 'total_cost': Decimal('0.00')})
+        for valuation in valuations:
+            key = tuple(getattr(valuation, dimension) for dimension in dimensions)
+            row = rows[key]
+            row['category'] = valuation.category if 'category' in dimensions else None
+            row['supplier'] = valuation.supplier if 'supplier' in dimensions else None
+            row['product_count'] += valuation.product_count
+            row['stock_quantity'] += valuation.stock_quantity
+            row['total_cost'] += valuation.total_cost
+
+        rows = sorted(rows.values(), key=lambda row: row['total_cost'], reverse=True)
+        context.update({
+            'rows': rows,
+            'group': group,
+            'groupings': [(value, label) for value, (label, _) in self.groupings.items()],
+            'show_category': 'category' in dimensions,
+            'show_supplier': 'supplier' in dimensions,
+            'totals': {
+                'product_count': sum(row['product_count'] for row in rows),
+                'stock_quantity': sum(row['stock_quantity'] for row in rows),
+                'total_cost': sum((row['total_cost'] for row in rows), Decimal('0.00')),
+            },
+        })
+        return context
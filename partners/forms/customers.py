@@ -2,6 +2,8 @@ from django import forms
 from partners.models.customers import Customer
 from core.models.address import Address
 from core import widgets
+from core.cep import CEPAutofillMixin
+from core.ibge import STATES, MunicipalityFormMixin
 
 
 class CustomerBasicForm(forms.ModelForm):
@@ -153,11 +155,11 @@ class CustomerAdvancedForm(forms.ModelForm):
         return credit_limit
 
 
-class CustomerAddressForm(forms.ModelForm):
+class CustomerAddressForm(CEPAutofillMixin, MunicipalityFormMixin, forms.ModelForm):
     postal_code = forms.CharField(
         max_length=9,
         label='CEP',
-        widget=forms.TextInput(attrs={
+        widget=widgets.CEPInput(attrs={
             'class': 'form-control form-control-user',
             'placeholder': '00000-000',
         }),
@@ -271,20 +273,14 @@ class CustomerAddressForm(forms.ModelForm):
         state = self.cleaned_data.get('state')
         if state:
             state = state.upper()
-            valid_states = [
-                'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 
-                'MA', 'MT', 'MS', 'MG', 'PA', 'PB', 'PR', 'PE', 'PI', 
-                'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO'
-            ]
-            if state not in valid_states:
+            if state not in STATES:
                 raise forms.ValidationError('Estado inválido. Use a sigla do estado (ex: SP, RJ).')
         return state
 
     def save(self, commit=True):
-        address = super().save(commit=True)
-        
-        if self.customer and not self.customer.address:
-            self.customer.address = address
-            self.customer.save()
-            
-        return address
+        # Endereços são compartilhados: o conteúdo do formulário aponta para
+        # um endereço igual já existente ou cria outro, sem alterar o atual
+        values = {field: getattr(self.instance, field) for field in Address.CONTENT_FIELDS}
+        if self.customer:
+            return Address.objects.assign(self.customer, **values)
+        return Address.objects.get_or_create_by_content(**values)
@@ -2,6 +2,8 @@ from django import forms
 from partners.models.suppliers import Supplier
 from core.models.address import Address
 from core import widgets
+from core.cep import CEPAutofillMixin
+from core.ibge import STATES, MunicipalityFormMixin
 
 class SupplierBasicForm(forms.ModelForm):
     """Formulário com informações essenciais para criação do fornecedor"""
@@ -151,11 +153,11 @@ class SupplierAdvancedForm(forms.ModelForm):
         return credit_limit
 
 
-class SupplierAddressForm(forms.ModelForm):
+class SupplierAddressForm(CEPAutofillMixin, MunicipalityFormMixin, forms.ModelForm):
     postal_code = forms.CharField(
         max_length=9,
         label='CEP',
-        widget=forms.TextInput(attrs={
+        widget=widgets.CEPInput(attrs={
             'class': 'form-control form-control-user',
             'placeholder': '00000-000',
         }),
@@ -269,20 +271,14 @@ class SupplierAddressForm(forms.ModelForm):
         state = self.cleaned_data.get('state')
         if state:
             state = state.upper()
-            valid_states = [
-                'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 
-                'MA', 'MT', 'MS', 'MG', 'PA', 'PB', 'PR', 'PE', 'PI', 
-                'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO'
-            ]
-            if state not in valid_states:
+            if state not in STATES:
                 raise forms.ValidationError('Estado inválido. Use a sigla do estado (ex: SP, RJ).')
         return state
 
     def save(self, commit=True):
-        address = super().save(commit=True)
-        
-        if self.supplier and not self.supplier.address:
-            self.supplier.address = address
-            self.supplier.save()
-            
-        return address
+        # Endereços são compartilhados: o conteúdo do formulário aponta para
+        # um endereço igual já existente ou cria outro, sem alterar o atual
+        values = {field: getattr(self.instance, field) for field in Address.CONTENT_FIELDS}
+        if self.supplier:
+            return Address.objects.assign(self.supplier, **values)
+        return Address.objects.get_or_create_by_content(**values)
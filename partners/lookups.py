@@ -0,0 +1,5 @@
+from core.lookups import TenantLookup
+from partners.models.suppliers import Supplier
+
+
+supplier_lookup = TenantLookup(Supplier)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_permission_bits'),
+        ('core', '0006_importjob_updated_at'),
+        ('partners', '0008_customer_search_text_supplier_search_text'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='partners_cu_company_6375c5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='supplier',
+            name='partners_su_company_235322_idx',
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['company', 'name', 'id'], name='partners_cu_company_a83c8a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['company', 'name', 'id'], name='partners_su_company_a54c4f_idx'),
+        ),
+    ]
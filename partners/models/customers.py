@@ -16,7 +16,8 @@ class Customer(PartnerBaseModel):
             models.Index(
                 fields=[
                     'company',
-                    'name'
+                    'name',
+                    'id'
                 ]
             ),
         ]
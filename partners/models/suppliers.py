@@ -20,7 +20,8 @@ class Supplier(PartnerBaseModel):
             models.Index(
                 fields=[
                     'company',
-                    'name'
+                    'name',
+                    'id'
                 ]
             ),
         ]
@@ -1,23 +1,30 @@
 from django.urls import path
+from core.async_views import select_view
 from partners.views import customers, suppliers
 
 app_name = 'partners'
 
 urlpatterns = [
-    path('customers/', customers.CustomerListView.as_view(), name='customer_list'),
+    path('customers/', select_view(customers.CustomerListView, customers.AsyncCustomerListView), name='customer_list'),
     path('customers/create/', customers.CustomerTemplateView.as_view(), name='customer_base'),
     path('customers/create/basic/', customers.CustomerBasicCreateView.as_view(), name='customer_create_basic'),
     path('customers/<int:pk>/edit/', customers.CustomerUpdateView.as_view(), name='customer_update'),
     path('customers/<int:pk>/edit/advanced/', customers.CustomerAdvancedUpdateView.as_view(), name='customer_advanced'),
     path('customers/<int:pk>/edit/address/', customers.CustomerAddressUpdateView.as_view(), name='customer_address'),
     path('customers/<int:pk>/delete/', customers.CustomerDeleteView.as_view(), name='customer_delete'),
+    path('customers/bulk/', customers.CustomerBulkActionView.as_view(), name='customer_bulk'),
+    path('customers/export/', customers.CustomerExportView.as_view(), name='customer_export'),
+    path('customers/autocomplete/', select_view(customers.CustomerAutocompleteView, customers.AsyncCustomerAutocompleteView), name='customer_autocomplete'),
 
-    path('suppliers/', suppliers.SupplierListView.as_view(), name='supplier_list'),
+    path('suppliers/', select_view(suppliers.SupplierListView, suppliers.AsyncSupplierListView), name='supplier_list'),
     path('suppliers/create/', suppliers.SupplierTemplateView.as_view(), name='supplier_base'),
     path('suppliers/create/basic/', suppliers.SupplierBasicCreateView.as_view(), name='supplier_create_basic'),
     path('suppliers/<int:pk>/edit/', suppliers.SupplierUpdateView.as_view(), name='supplier_update'),
     path('suppliers/<int:pk>/edit/advanced/', suppliers.SupplierAdvancedUpdateView.as_view(), name='supplier_advanced'),
     path('suppliers/<int:pk>/edit/address/', suppliers.SupplierAddressUpdateView.as_view(), name='supplier_address'),
     path('suppliers/<int:pk>/delete/', suppliers.SupplierDeleteView.as_view(), name='supplier_delete'),
+    path('suppliers/bulk/', suppliers.SupplierBulkActionView.as_view(), name='supplier_bulk'),
+    path('suppliers/export/', suppliers.SupplierExportView.as_view(), name='supplier_export'),
+    path('suppliers/autocomplete/', select_view(suppliers.SupplierAutocompleteView, suppliers.AsyncSupplierAutocompleteView), name='supplier_autocomplete'),
     
 ]
\ No newline at end of file
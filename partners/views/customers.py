@@ -1,43 +1,41 @@
 from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView
 from django.http import HttpResponseRedirect
-from django.shortcuts import render
 from partners.models.customers import Customer
 from core.models.address import Address
 from partners.forms.customers import CustomerAddressForm, CustomerAdvancedForm, CustomerBasicForm
 from django.urls import reverse_lazy
-from django.db.models import Q
-
-
-class CustomerListView(ListView):
+from core.async_views import AsyncListMixin
+from core.autocomplete import AsyncAutocompleteView, AutocompleteView
+from core.bulk_actions import BulkActionListMixin, BulkActionView
+from core.conditional import ConditionalListMixin
+from core.counters import RowCountMixin
+from core.exports import CSVExportMixin
+from core.pagination import KeysetPaginationMixin
+from core.queries import FetchProfileMixin
+from core.rows import RowResponseMixin
+from core.search import SearchMixin
+
+
+class CustomerListView(ConditionalListMixin, BulkActionListMixin, SearchMixin, RowCountMixin, KeysetPaginationMixin, FetchProfileMixin, ListView):
     """
         View para listar clientes da Empresa.
     """
     model = Customer
     template_name = 'customers/list_view.html'
     partial_template_name = 'customers/partials/customer_table.html'
+    rows_template_name = 'customers/partials/customer_rows.html'
     paginate_by = 20
+    list_only = ('name', 'trading_name', 'cpf_cnpj', 'email', 'phone', 'cellphone')
+    query_budget = 8
 
     def get_queryset(self):
         company = self.request.user.company_active
-        queryset = Customer.objects.filter(company=company, is_active=True)
+        queryset = self.apply_fetch_profile(
+            Customer.objects.filter(company=company, is_active=True)
+        )
 
-        # Aplicar filtros
-        search = self.request.GET.get('search', '')
-        
         # Busca por nome, nome fantasia ou CPF/CNPJ
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(trading_name__icontains=search) |
-                Q(cpf_cnpj__icontains=search)
-            )
-            
-        return queryset
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['current_search'] = self.request.GET.get('search', '')
-        return context
+        return self.apply_search(queryset)
     
     def render_to_response(self, context, **response_kwargs):
         if self.request.headers.get('Hx-Request'):
@@ -45,6 +43,12 @@ class CustomerListView(ListView):
         return super().render_to_response(context, **response_kwargs)
 
 
+class AsyncCustomerListView(AsyncListMixin, CustomerListView):
+    """
+        Variante assíncrona da listagem de clientes (ASGI).
+    """
+
+
 class CustomerTemplateView(TemplateView):
     """
         View para renderizar o template base do cadastro de clientes.
@@ -134,7 +138,7 @@ class CustomerAddressUpdateView(UpdateView):
     template_name = 'customers/create_view_address_form.html'
 
     def get_success_url(self):
-        return reverse_lazy('partners:customer_address', kwargs={'pk': self.object.pk})
+        return reverse_lazy('partners:customer_address', kwargs={'pk': self.customer.pk})
 
     def get_object(self, queryset=None):
         customer = super().get_object(queryset)
@@ -160,11 +164,13 @@ class CustomerAddressUpdateView(UpdateView):
         return context
 
 
-class CustomerDeleteView(DeleteView):
+class CustomerDeleteView(RowResponseMixin, DeleteView):
     """
         View para deletar um cliente.
     """
     model = Customer
+    list_view_class = CustomerListView
+    count_element_id = 'customers-count'
     success_url = reverse_lazy('partners:customer_list')
 
     def get_queryset(self):
@@ -177,10 +183,61 @@ class CustomerDeleteView(DeleteView):
         self.object.save()
         
         if request.headers.get('Hx-Request'):
-            queryset = self.get_queryset()
-            return render(request, 'customers/partials/customer_table.html', {
-                'object_list': queryset,
-                'page_obj': queryset
-            })
+            return self.render_row_response(self.object)
         
         return HttpResponseRedirect(self.success_url)
+
+
+class CustomerBulkActionView(BulkActionView):
+    """
+        View para as ações em massa da listagem de clientes.
+    """
+    model = Customer
+    list_view_class = CustomerListView
+    container_element_id = 'customers-table-container'
+    result_element_id = 'customers-bulk-result'
+    success_url = reverse_lazy('partners:customer_list')
+
+
+class CustomerAutocompleteView(AutocompleteView):
+    """
+        Autocomplete de clientes para os campos Select2.
+    """
+    model = Customer
+
+
+class AsyncCustomerAutocompleteView(AsyncAutocompleteView, CustomerAutocompleteView):
+    """
+        Variante assíncrona do autocomplete de clientes (ASGI).
+    """
+
+
+class CustomerExportView(CSVExportMixin, CustomerListView):
+    """
+        View para exportar os clientes (com endereço) em CSV, respeitando
+        a busca da listagem.
+    """
+    export_filename = 'clientes'
+    export_columns = (
+        ('Nome/Razão Social', 'name'),
+        ('Nome Fantasia', 'trading_name'),
+        ('CPF/CNPJ', 'cpf_cnpj'),
+        ('Tipo de Pessoa', 'person_type'),
+        ('Regime Tributário', 'tax_regime'),
+        ('Tipo de Contribuinte', 'tax_payer_type'),
+        ('Inscrição Estadual', 'state_registration'),
+        ('Inscrição Municipal', 'municipal_registration'),
+        ('Email', 'email'),
+        ('Telefone', 'phone'),
+        ('Celular', 'cellphone'),
+        ('Limite de Crédito', 'credit_limit'),
+        ('Isento de Impostos', 'is_exempt'),
+        ('Logradouro', 'address__street'),
+        ('Número', 'address__number'),
+        ('Complemento', 'address__complement'),
+        ('Bairro', 'address__district'),
+        ('Cidade', 'address__city_name'),
+        ('Código IBGE', 'address__city_ibge_code'),
+        ('UF', 'address__state'),
+        ('CEP', 'address__postal_code'),
+    )
@@ -1,42 +1,40 @@
 from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView
 from django.http import HttpResponseRedirect
-from django.shortcuts import render
 from partners.forms.suppliers import SupplierAddressForm, SupplierAdvancedForm, SupplierBasicForm
 from partners.models.suppliers import Supplier
 from django.urls import reverse_lazy
-from django.db.models import Q
-
-
-class SupplierListView(ListView):
+from core.async_views import AsyncListMixin
+from core.autocomplete import AsyncAutocompleteView, AutocompleteView
+from core.bulk_actions import BulkActionListMixin, BulkActionView
+from core.conditional import ConditionalListMixin
+from core.counters import RowCountMixin
+from core.exports import CSVExportMixin
+from core.pagination import KeysetPaginationMixin
+from core.queries import FetchProfileMixin
+from core.rows import RowResponseMixin
+from core.search import SearchMixin
+
+
+class SupplierListView(ConditionalListMixin, BulkActionListMixin, SearchMixin, RowCountMixin, KeysetPaginationMixin, FetchProfileMixin, ListView):
     """
         View para listar fornecedores da Empresa.
     """
     model = Supplier
     template_name = 'suppliers/list_view.html'
     partial_template_name = 'suppliers/partials/supplier_table.html'
+    rows_template_name = 'suppliers/partials/supplier_rows.html'
     paginate_by = 20
+    list_only = ('name', 'trading_name', 'cpf_cnpj', 'email', 'phone')
+    query_budget = 8
 
     def get_queryset(self):
         company = self.request.user.company_active
-        queryset = Supplier.objects.filter(company=company, is_active=True)
+        queryset = self.apply_fetch_profile(
+            Supplier.objects.filter(company=company, is_active=True)
+        )
 
-        # Aplicar filtros
-        search = self.request.GET.get('search', '')
-        
         # Busca por nome, nome fantasia ou CPF/CNPJ
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(trading_name__icontains=search) |
-                Q(cpf_cnpj__icontains=search)
-            )
-            
-        return queryset
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['current_search'] = self.request.GET.get('search', '')
-        return context
+        return self.apply_search(queryset)
     
     def render_to_response(self, context, **response_kwargs):
         if self.request.headers.get('Hx-Request'):
@@ -44,6 +42,12 @@ class SupplierListView(ListView):
         return super().render_to_response(context, **response_kwargs)
 
 
+class AsyncSupplierListView(AsyncListMixin, SupplierListView):
+    """
+        Variante assíncrona da listagem de fornecedores (ASGI).
+    """
+
+
 class SupplierTemplateView(TemplateView):
     """
         View para renderizar o template base do cadastro de Fornecedores.
@@ -138,7 +142,7 @@ class SupplierAddressUpdateView(UpdateView):
         return context
 
     def get_success_url(self):
-        return reverse_lazy('partners:supplier_address', kwargs={'pk': self.object.pk})
+        return reverse_lazy('partners:supplier_address', kwargs={'pk': self.supplier.pk})
 
     def get_object(self, queryset=None):
         supplier = super().get_object(queryset)
@@ -163,11 +167,13 @@ class SupplierAddressUpdateView(UpdateView):
         return context
 
 
-class SupplierDeleteView(DeleteView):
+class SupplierDeleteView(RowResponseMixin, DeleteView):
     """
         View para deletar um fornecedor.
     """
     model = Supplier
+    list_view_class = SupplierListView
+    count_element_id = 'suppliers-count'
     success_url = reverse_lazy('partners:supplier_list')
 
     def get_queryset(self):
@@ -180,10 +186,59 @@ class SupplierDeleteView(DeleteView):
         self.object.save()
         
         if request.headers.get('Hx-Request'):
-            queryset = self.get_queryset()
-            return render(request, 'suppliers/partials/supplier_table.html', {
-                'object_list': queryset,
-                'page_obj': queryset
-            })
+            return self.render_row_response(self.object)
         
-        return HttpResponseRedirect(self.success_url)
\ No newline at end of file
+        return HttpResponseRedirect(self.success_url)
+
+
+class SupplierBulkActionView(BulkActionView):
+    """
+        View para as ações em massa da listagem de fornecedores.
+    """
+    model = Supplier
+    list_view_class = SupplierListView
+    container_element_id = 'suppliers-table-container'
+    result_element_id = 'suppliers-bulk-result'
+    success_url = reverse_lazy('partners:supplier_list')
+
+
+class SupplierAutocompleteView(AutocompleteView):
+    """
+        Autocomplete de fornecedores para os campos Select2.
+    """
+    model = Supplier
+
+
+class AsyncSupplierAutocompleteView(AsyncAutocompleteView, SupplierAutocompleteView):
+    """
+        Variante assíncrona do autocomplete de fornecedores (ASGI).
+    """
+
+
+class SupplierExportView(CSVExportMixin, SupplierListView):
+    """
+        View para exportar os fornecedores (com endereço) em CSV,
+        respeitando a busca da listagem.
+    """
+    export_filename = 'fornecedores'
+    export_columns = (
+        ('Nome/Razão Social', 'name'),
+        ('Nome Fantasia', 'trading_name'),
+        ('CPF/CNPJ', 'cpf_cnpj'),
+        ('Tipo de Pessoa', 'person_type'),
+        ('Regime Tributário', 'tax_regime'),
+        ('Tipo de Contribuinte', 'tax_payer_type'),
+        ('Inscrição Estadual', 'state_registration'),
+        ('Inscrição Municipal', 'municipal_registration'),
+        ('Email', 'email'),
+        ('Telefone', 'phone'),
+        ('Celular', 'cellphone'),
+        ('Logradouro', 'address__street'),
+        ('Número', 'address__number'),
+        ('Complemento', 'address__complement'),
+        ('Bairro', 'address__district'),
+        ('Cidade', 'address__city_name'),
+        ('Código IBGE', 'address__city_ibge_code'),
+        ('UF', 'address__state'),
+        ('CEP', 'address__postal_code'),
+    )